@@ -355,6 +355,8 @@ class BaseAgent(BaseModel, ABC):
         finally:
             self._active_operations.discard(operation_id)
 
+            await self._flush_long_term_memory()
+
             # Always reset to IDLE state safely
             async with self._state_lock:
                 if self.state != AgentState.IDLE:
@@ -362,6 +364,15 @@ class BaseAgent(BaseModel, ABC):
                     self.state = AgentState.IDLE
                     self.current_step = 0
 
+    async def _flush_long_term_memory(self) -> None:
+        """Persist memories queued by a write-behind Mem0 client during a run."""
+        if not isinstance(self.llm, ChatBot):
+            return
+        try:
+            await self.llm.aflush()
+        except Exception as exc:
+            logger.warning("Failed to flush long-term memory for agent %s: %s", self.name, exc)
+
     async def step(self, run_id: Optional[uuid.UUID] = None) -> str:
         """Override this method in subclasses - now with step-level locking and callback support."""
         async with self._step_lock:
@@ -616,6 +627,13 @@ class BaseAgent(BaseModel, ABC):
         if self._active_operations:
             logger.warning(f"Agent {self.name} shutdown with {len(self._active_operations)} operations still active")
 
+        # Finish the LLM's background work (summaries, queued Mem0 writes)
+        if isinstance(self.llm, ChatBot):
+            try:
+                await self.llm.aclose()
+            except Exception as exc:
+                logger.warning("Failed to close LLM client for agent %s: %s", self.name, exc)
+
         # Final state cleanup
         async with self._state_lock:
             self.state = AgentState.IDLE
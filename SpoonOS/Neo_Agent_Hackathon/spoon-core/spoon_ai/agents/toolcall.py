@@ -276,6 +276,8 @@ class ToolCallAgent(ReActAgent):
             logger.error(f"Error during agent run: {e}")
             raise
         finally:
+            await self._flush_long_term_memory()
+
             # Always reset to IDLE state after run completes or fails
             if self.state != AgentState.IDLE:
                 logger.info(f"Resetting agent {self.name} state from {self.state} to IDLE")
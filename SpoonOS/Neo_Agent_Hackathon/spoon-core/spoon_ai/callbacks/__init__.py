@@ -24,6 +24,11 @@ from spoon_ai.callbacks.streaming_stdout import (
 )
 from spoon_ai.callbacks.stream_event import StreamEventCallbackHandler
 from spoon_ai.callbacks.statistics import StreamingStatisticsCallback
+from spoon_ai.callbacks.stream_writer import (
+    bind_stream_writer,
+    get_stream_writer,
+    reset_stream_writer,
+)
 
 __all__ = [
     # Base handlers
@@ -45,4 +50,9 @@ __all__ = [
     "StreamingStdOutCallbackHandler",
     "StreamEventCallbackHandler",
     "StreamingStatisticsCallback",
+
+    # Context-local chunk forwarding
+    "bind_stream_writer",
+    "get_stream_writer",
+    "reset_stream_writer",
 ]
@@ -0,0 +1,28 @@
+"""
+Context-local sink for forwarding streamed LLM chunks to an enclosing consumer.
+
+``CompiledGraph.stream(stream_mode="messages")`` binds a writer for the
+duration of a run; ``LLMManager.chat_stream`` passes every chunk it yields to
+the bound writer, so token streams from inside graph nodes reach the graph's
+stream without the nodes having to wire callbacks themselves.
+"""
+import contextvars
+from typing import Any, Awaitable, Callable, Optional
+
+StreamWriter = Callable[[Any], Awaitable[None]]
+
+_stream_writer: contextvars.ContextVar[Optional[StreamWriter]] = contextvars.ContextVar("spoon_stream_writer", default=None)
+
+
+def get_stream_writer() -> Optional[StreamWriter]:
+    """Return the writer bound in the current context, if any."""
+    return _stream_writer.get()
+
+
+def bind_stream_writer(writer: Optional[StreamWriter]) -> contextvars.Token:
+    """Bind ``writer`` for the current context; pass the token to ``reset_stream_writer``."""
+    return _stream_writer.set(writer)
+
+
+def reset_stream_writer(token: contextvars.Token) -> None:
+    _stream_writer.reset(token)
@@ -11,6 +11,7 @@ from spoon_ai.memory.short_term_manager import (
     ShortTermMemoryManager,
     TrimStrategy,
     MessageTokenCounter,
+    SummaryWatermark,
 )
 from spoon_ai.memory.mem0_client import SpoonMem0
 from spoon_ai.memory.remove_message import (
@@ -60,6 +61,15 @@ class ShortTermMemoryConfig(BaseModel):
     summary_model: Optional[str] = None
     """Model to use for summarization (defaults to ChatBot's model)."""
 
+    incremental_summary: bool = False
+    """Summarize only the messages added since the last summary instead of the whole history."""
+
+    background_summary: bool = False
+    """Extend the summary in a background task so requests never wait on it (implies incremental)."""
+
+    summary_trigger_ratio: float = 0.8
+    """Fraction of max_tokens at which a background summary is started."""
+
 
 class Memory(BaseModel):
 
@@ -131,7 +141,11 @@ class ChatBot:
             short_term_memory_config: Configuration dict or ShortTermMemoryConfig instance
             token_counter: Optional custom token counter instance
             enable_long_term_memory: Enable Mem0-backed long-term memory retrieval/storage
-            mem0_config: Configuration dict for Mem0 (api_key, user_id/agent_id, collection, etc.)
+            mem0_config: Configuration dict for Mem0 (api_key, user_id/agent_id, collection, prefetch, etc.).
+                Set ``write_behind`` to queue memory writes in the background instead of
+                waiting on Mem0; ``write_batch_size``, ``write_flush_interval``,
+                ``write_queue_size`` and ``write_overflow`` tune the queue (see ``SpoonMem0``).
+                Queued writes are flushed by ``aflush()`` and ``aclose()``.
             callbacks: Optional list of callback handlers for monitoring
             **kwargs: Additional parameters
         """
@@ -144,10 +158,13 @@ class ChatBot:
         self.callbacks = callbacks or []
         self._latest_summary_text: Optional[str] = None
         self._latest_removals: List[RemoveMessage] = []
+        self._summary_watermark: Optional[SummaryWatermark] = None
+        self._summary_task: Optional[asyncio.Task] = None
         self.long_term_memory_enabled = enable_long_term_memory or bool(mem0_config)
         self.mem0_config = mem0_config or {}
         self.mem0_user_id = self.mem0_config.get("user_id") or self.mem0_config.get("agent_id")
         self.mem0_client: Optional[SpoonMem0] = None
+        self._background_tasks: set = set()
 
         # Store original parameters for priority mode detection
         self._original_llm_provider = llm_provider
@@ -424,6 +441,7 @@ class ChatBot:
             self.mem0_client = None
             return
 
+        self._retire_mem0_client()
         self.mem0_user_id = self.mem0_config.get("user_id") or self.mem0_config.get("agent_id")
         client = SpoonMem0(self.mem0_config)
 
@@ -449,11 +467,40 @@ class ChatBot:
             self.long_term_memory_enabled = self.long_term_memory_enabled or bool(self.mem0_config)
 
         if not self.long_term_memory_enabled:
+            self._retire_mem0_client()
             self.mem0_client = None
             return
 
         self._initialize_long_term_memory()
 
+    def _retire_mem0_client(self) -> None:
+        """Flush and stop a Mem0 client that is being replaced."""
+        client = self.mem0_client
+        if client is None or client.write_queue is None:
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(client.aclose())
+        except RuntimeError:
+            if client.write_queue.pending:
+                logger.warning("Dropping %d queued Mem0 writes; no running event loop", client.write_queue.pending)
+            return
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def aflush(self) -> None:
+        """Write queued Mem0 memories now, keeping the background writer running."""
+        if self.mem0_client is not None:
+            await self.mem0_client.aflush()
+
+    async def aclose(self) -> None:
+        """Finish background work: pending summaries and queued Mem0 writes."""
+        if self._summary_task is not None:
+            await asyncio.gather(self._summary_task, return_exceptions=True)
+        if self.mem0_client is not None:
+            await self.mem0_client.aclose()
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+
     async def _apply_short_term_memory_strategy(
         self,
         messages: List[Message],
@@ -495,7 +542,10 @@ class ChatBot:
         
         # Apply strategy based on configuration
         try:
-            if config.strategy == "summarize":
+            if config.strategy == "summarize" and (config.incremental_summary or config.background_summary):
+                processed_messages = await self._apply_incremental_summary(messages, config, token_model)
+
+            elif config.strategy == "summarize":
                 llm_ready_messages, removals, summary = await self.short_term_memory_manager.summarize_messages(
                     messages=messages,
                     max_tokens_before_summary=config.max_tokens,
@@ -538,6 +588,95 @@ class ChatBot:
             # Return original messages on error to avoid breaking the flow
             return messages
 
+    async def _apply_incremental_summary(
+        self,
+        messages: List[Message],
+        config: ShortTermMemoryConfig,
+        token_model: Optional[str],
+    ) -> List[Message]:
+        """Send the rolling summary plus the unsummarized tail of ``messages``.
+
+        Inline mode extends the summary when the tail crosses ``max_tokens``.
+        Background mode starts extending it once the tail reaches
+        ``summary_trigger_ratio`` of the limit and never waits for it: if the
+        limit is crossed before the summary is ready, the tail is trimmed for
+        this request instead.
+        """
+        manager = self.short_term_memory_manager
+        watermark = manager.resolve_watermark(messages, self._summary_watermark)
+        llm_ready_messages, removals = manager.apply_summary(messages, watermark)
+        tokens = await manager.token_counter.count_tokens(llm_ready_messages, token_model)
+
+        if config.background_summary:
+            if tokens > config.max_tokens * config.summary_trigger_ratio:
+                self._schedule_background_summary(messages, watermark, config, token_model)
+            if tokens > config.max_tokens:
+                llm_ready_messages = await manager.trim_messages(
+                    messages=llm_ready_messages,
+                    max_tokens=config.max_tokens,
+                    strategy=TrimStrategy.FROM_END,
+                    keep_system=config.keep_system_messages,
+                    model=token_model,
+                )
+                logger.info("Short-term memory: Summary not ready, trimmed to %d messages", len(llm_ready_messages))
+        elif tokens > config.max_tokens:
+            watermark = await manager.summarize_incremental(
+                messages,
+                watermark,
+                messages_to_keep=config.messages_to_keep,
+                summary_model=token_model,
+                llm_manager=self.llm_manager,
+            )
+            self._summary_watermark = watermark
+            llm_ready_messages, removals = manager.apply_summary(messages, watermark)
+
+        if watermark:
+            self._latest_summary_text = watermark.summary
+        self._latest_removals = removals
+        return llm_ready_messages
+
+    def _schedule_background_summary(
+        self,
+        messages: List[Message],
+        watermark: Optional[SummaryWatermark],
+        config: ShortTermMemoryConfig,
+        token_model: Optional[str],
+    ) -> None:
+        if self._summary_task is not None and not self._summary_task.done():
+            return
+        self._summary_task = asyncio.create_task(
+            self._run_background_summary(list(messages), watermark, config, token_model)
+        )
+
+    async def _run_background_summary(
+        self,
+        messages: List[Message],
+        watermark: Optional[SummaryWatermark],
+        config: ShortTermMemoryConfig,
+        token_model: Optional[str],
+    ) -> None:
+        try:
+            updated = await self.short_term_memory_manager.summarize_incremental(
+                messages,
+                watermark,
+                messages_to_keep=config.messages_to_keep,
+                summary_model=token_model,
+                llm_manager=self.llm_manager,
+                priority="batch",
+            )
+        except Exception as e:
+            logger.warning(f"Background summarization failed: {e}")
+            return
+        if updated is not None and updated is not watermark:
+            self._summary_watermark = updated
+            self._latest_summary_text = updated.summary
+
+    async def wait_for_background_summary(self) -> Optional[str]:
+        """Wait for an in-flight background summary and return the latest summary text."""
+        if self._summary_task is not None:
+            await self._summary_task
+        return self._latest_summary_text
+
     def _format_messages(
         self, messages: List[Union[dict, Message]], system_msg: Optional[str] = None
     ) -> List[Message]:
@@ -566,26 +705,19 @@ class ChatBot:
             None,
         )
 
-    async def _inject_long_term_context(
-        self, messages: List[Message]
-    ) -> Tuple[List[Message], Optional[str]]:
-        if not self.mem0_client:
-            return messages, None
-
-        user_query = self._extract_user_query(messages)
-        if not user_query:
-            return messages, None
-
+    async def _search_long_term_memory(self, user_query: str) -> List[str]:
         try:
-            memories = await self.mem0_client.asearch_memory(
+            return await self.mem0_client.asearch_memory(
                 user_query, user_id=self.mem0_user_id
             )
         except Exception as exc:
             logger.warning("Mem0 search failed: %s", exc)
-            return messages, user_query
+            return []
 
+    @staticmethod
+    def _insert_long_term_context(messages: List[Message], memories: List[str]) -> List[Message]:
         if not memories:
-            return messages, user_query
+            return messages
 
         context_lines = "\n".join(f"- {memory}" for memory in memories)
         context_message = Message(
@@ -596,8 +728,52 @@ class ChatBot:
         prepared_messages = list(messages)
         insertion_index = 1 if prepared_messages and prepared_messages[0].role == "system" else 0
         prepared_messages.insert(insertion_index, context_message)
+        return prepared_messages
+
+    async def _inject_long_term_context(
+        self, messages: List[Message]
+    ) -> Tuple[List[Message], Optional[str]]:
+        if not self.mem0_client:
+            return messages, None
+
+        user_query = self._extract_user_query(messages)
+        if not user_query:
+            return messages, None
+
+        memories = await self._search_long_term_memory(user_query)
+        return self._insert_long_term_context(messages, memories), user_query
+
+    async def _prepare_messages(
+        self, messages: List[Union[dict, Message]], system_msg: Optional[str]
+    ) -> Tuple[List[Message], Optional[str]]:
+        """Format messages, add long-term context and apply short-term memory.
+
+        With ``mem0_config["prefetch"]`` the Mem0 search runs concurrently
+        with short-term memory processing and its context is inserted into
+        the processed messages, instead of being searched first and then
+        processed along with the history.
+        """
+        formatted_messages = self._format_messages(messages, system_msg)
+        if not (self.mem0_client and self.mem0_config.get("prefetch")):
+            messages_with_long_term, user_query = await self._inject_long_term_context(formatted_messages)
+            processed_messages = await self._apply_short_term_memory_strategy(
+                messages_with_long_term,
+                model=self.model_name,
+            )
+            return processed_messages, user_query
 
-        return prepared_messages, user_query
+        user_query = self._extract_user_query(formatted_messages)
+        search = asyncio.create_task(self._search_long_term_memory(user_query)) if user_query else None
+        try:
+            processed_messages = await self._apply_short_term_memory_strategy(
+                formatted_messages,
+                model=self.model_name,
+            )
+            memories = await search if search else []
+        finally:
+            if search and not search.done():
+                search.cancel()
+        return self._insert_long_term_context(processed_messages, memories), user_query
 
     async def _store_long_term_memory(
         self, user_query: Optional[str], assistant_response: Optional[str]
@@ -619,12 +795,7 @@ class ChatBot:
         
         Automatically applies short-term memory strategy if enabled.
         """
-        formatted_messages = self._format_messages(messages, system_msg)
-        messages_with_long_term, user_query = await self._inject_long_term_context(formatted_messages)
-        processed_messages = await self._apply_short_term_memory_strategy(
-            messages_with_long_term,
-            model=self.model_name,
-        )
+        processed_messages, user_query = await self._prepare_messages(messages, system_msg)
 
         response = await self.llm_manager.chat(
             messages=processed_messages,
@@ -640,12 +811,7 @@ class ChatBot:
         
         Automatically applies short-term memory strategy if enabled.
         """
-        formatted_messages = self._format_messages(messages, system_msg)
-        messages_with_long_term, user_query = await self._inject_long_term_context(formatted_messages)
-        processed_messages = await self._apply_short_term_memory_strategy(
-            messages_with_long_term,
-            model=self.model_name,
-        )
+        processed_messages, user_query = await self._prepare_messages(messages, system_msg)
 
         response = await self.llm_manager.chat_with_tools(
             messages=processed_messages,
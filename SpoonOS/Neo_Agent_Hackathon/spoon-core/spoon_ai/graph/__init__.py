@@ -34,7 +34,9 @@ from .decorators import (
     node_decorator,
     router_decorator,
 )
-from .checkpointer import InMemoryCheckpointer
+from .checkpointer import InMemoryCheckpointer, SQLiteCheckpointer
+from .state import CopyOnWriteState, FrozenState
+from .config import NodeCacheConfig
 
 # Engine and agent implementations (now within this package)
 from .engine import (
@@ -46,6 +48,7 @@ from .engine import (
     ConditionNode,
     START,
     END,
-    interrupt
+    interrupt,
+    checkpoint_thread_key,
 )
 from .agent import GraphAgent, AgentStateCheckpoint, MockMemory, Memory
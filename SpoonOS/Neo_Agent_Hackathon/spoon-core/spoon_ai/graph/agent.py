@@ -2,6 +2,7 @@
 GraphAgent implementation for the graph package.
 """
 import asyncio
+import bisect
 import time
 import json
 import os
@@ -23,47 +24,165 @@ class AgentStateCheckpoint:
     created_at: datetime = field(default_factory=datetime.now)
 
 
+def _trigrams(text: str):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _MessageIndex:
+    """Timestamp and trigram indexes over a message list.
+
+    The trigram index narrows a substring search to messages that contain
+    every trigram of the query; matches are then confirmed against the
+    lowercased content, so results are identical to a linear scan.
+    """
+
+    def __init__(self):
+        self.reset(None)
+
+    def reset(self, messages: Optional[List[Dict[str, Any]]]) -> None:
+        self.messages = messages
+        self.lowered: List[str] = []
+        self.postings: Dict[str, set] = {}
+        self.timestamps: List[Any] = []  # sorted (timestamp, position)
+        self.untimed: List[int] = []  # positions without a parseable timestamp
+
+    def sync(self, messages: List[Dict[str, Any]]) -> None:
+        """Index messages appended since the last sync; rebuild if the list was replaced or shrunk."""
+        if messages is not self.messages or len(messages) < len(self.lowered):
+            self.reset(messages)
+        for position in range(len(self.lowered), len(messages)):
+            self._add(position, messages[position])
+
+    def _add(self, position: int, msg: Dict[str, Any]) -> None:
+        lowered = str(msg.get('content', '')).lower()
+        self.lowered.append(lowered)
+        for trigram in _trigrams(lowered):
+            self.postings.setdefault(trigram, set()).add(position)
+        try:
+            entry = (datetime.fromisoformat(msg['timestamp']).timestamp(), position)
+        except Exception:
+            self.untimed.append(position)
+            return
+        if not self.timestamps or entry >= self.timestamps[-1]:
+            self.timestamps.append(entry)
+        else:
+            bisect.insort(self.timestamps, entry)
+
+    def since(self, cutoff: float) -> List[int]:
+        start = bisect.bisect_left(self.timestamps, (cutoff, -1))
+        positions = [position for _, position in self.timestamps[start:]]
+        return sorted(positions + self.untimed)
+
+    def search(self, query_lower: str, limit: int) -> List[int]:
+        trigrams = _trigrams(query_lower)
+        if trigrams:
+            postings = sorted((self.postings.get(t, set()) for t in trigrams), key=len)
+            candidates = sorted(postings[0].intersection(*postings[1:]), reverse=True)
+        else:
+            candidates = range(len(self.lowered) - 1, -1, -1)
+        matches = []
+        for position in candidates:
+            if query_lower in self.lowered[position]:
+                matches.append(position)
+                if len(matches) >= limit:
+                    break
+        return matches
+
+
 class Memory:
-    """Memory implementation with persistent storage"""
+    """Memory implementation with persistent storage
+
+    Sessions are stored as an append-only JSON Lines log: a header record
+    followed by one record per added message or metadata update, so adding
+    a message costs one appended line. The log is compacted (rewritten as
+    a header plus the live messages) on ``clear`` and once superseded
+    metadata records outnumber the live ones. Sessions saved by earlier
+    versions as a single ``<session_id>.json`` file are migrated on load.
+    """
+
+    COMPACT_MIN_GARBAGE = 100
 
     def __init__(self, storage_path: Optional[str] = None, session_id: Optional[str] = None):
         self.session_id = session_id or f"session_{int(time.time())}"
         self.storage_path = Path(storage_path) if storage_path else Path.home() / ".spoon_ai" / "memory"
         self.storage_path.mkdir(parents=True, exist_ok=True)
-        self.session_file = self.storage_path / f"{self.session_id}.json"
+        self.session_file = self.storage_path / f"{self.session_id}.jsonl"
+        self.legacy_session_file = self.storage_path / f"{self.session_id}.json"
 
         # Load existing data
         self.messages = []
         self.metadata = {}
+        self._garbage_records = 0
+        self._index = _MessageIndex()
         self._load_from_disk()
 
     def _load_from_disk(self):
         """Load memory data from disk"""
         try:
             if self.session_file.exists():
-                with open(self.session_file, 'r', encoding='utf-8') as f:
+                self._replay_log()
+            elif self.legacy_session_file.exists():
+                with open(self.legacy_session_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     self.messages = data.get('messages', [])
                     self.metadata = data.get('metadata', {})
+                self._save_to_disk()
         except Exception as e:
             print(f"Warning: Failed to load memory from disk: {e}")
             self.messages = []
             self.metadata = {}
 
+    def _replay_log(self):
+        with open(self.session_file, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-append leaves at most one torn line
+                    print(f"Warning: Skipping corrupt memory record at line {line_number}")
+                    continue
+                kind = record.get('type')
+                if kind == 'message':
+                    self.messages.append(record['message'])
+                elif kind == 'metadata':
+                    if record['key'] in self.metadata:
+                        self._garbage_records += 1
+                    self.metadata[record['key']] = record['value']
+                elif kind == 'header':
+                    self.metadata.update(record.get('metadata', {}))
+
+    def _append_record(self, record: Dict[str, Any]):
+        try:
+            with open(self.session_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        except Exception as e:
+            print(f"Warning: Failed to save memory to disk: {e}")
+
     def _save_to_disk(self):
-        """Save memory data to disk"""
+        """Save memory data to disk, compacting the log"""
         try:
-            data = {
-                'messages': self.messages,
+            header = {
+                'type': 'header',
+                'session_id': self.session_id,
                 'metadata': self.metadata,
                 'last_updated': datetime.now().isoformat(),
-                'session_id': self.session_id
             }
-            with open(self.session_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            tmp_file = self.session_file.with_suffix('.jsonl.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(header, ensure_ascii=False, default=str) + "\n")
+                for msg in self.messages:
+                    f.write(json.dumps({'type': 'message', 'message': msg}, ensure_ascii=False, default=str) + "\n")
+            os.replace(tmp_file, self.session_file)
+            self._garbage_records = 0
         except Exception as e:
             print(f"Warning: Failed to save memory to disk: {e}")
 
+    def compact(self):
+        """Rewrite the session log with only live records"""
+        self._save_to_disk()
+
     def clear(self):
         """Clear all messages and reset memory"""
         self.messages = []
@@ -85,7 +204,7 @@ class Memory:
             msg_dict['timestamp'] = datetime.now().isoformat()
 
         self.messages.append(msg_dict)
-        self._save_to_disk()
+        self._append_record({'type': 'message', 'message': msg_dict})
 
     def get_messages(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get messages from memory"""
@@ -96,34 +215,14 @@ class Memory:
     def get_recent_messages(self, hours: int = 24) -> List[Dict[str, Any]]:
         """Get messages from the last N hours"""
         cutoff_time = datetime.now().timestamp() - (hours * 3600)
-        recent_messages = []
-
-        for msg in self.messages:
-            if 'timestamp' in msg:
-                try:
-                    msg_time = datetime.fromisoformat(msg['timestamp']).timestamp()
-                    if msg_time >= cutoff_time:
-                        recent_messages.append(msg)
-                except:
-                    recent_messages.append(msg)
-            else:
-                recent_messages.append(msg)
-
-        return recent_messages
+        self._index.sync(self.messages)
+        return [self.messages[i] for i in self._index.since(cutoff_time)]
 
     def search_messages(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search messages containing the query"""
-        query_lower = query.lower()
-        matching_messages = []
-
-        for msg in reversed(self.messages):  # Search from most recent
-            content = str(msg.get('content', '')).lower()
-            if query_lower in content:
-                matching_messages.append(msg)
-                if len(matching_messages) >= limit:
-                    break
-
-        return matching_messages
+        self._index.sync(self.messages)
+        # Search from most recent
+        return [self.messages[i] for i in self._index.search(query.lower(), limit)]
 
     def get_statistics(self) -> Dict[str, Any]:
         """Get memory statistics"""
@@ -137,8 +236,13 @@ class Memory:
 
     def set_metadata(self, key: str, value: Any):
         """Set metadata"""
+        if key in self.metadata:
+            self._garbage_records += 1
         self.metadata[key] = value
-        self._save_to_disk()
+        if self._garbage_records > max(self.COMPACT_MIN_GARBAGE, len(self.messages) + len(self.metadata)):
+            self._save_to_disk()
+        else:
+            self._append_record({'type': 'metadata', 'key': key, 'value': value})
 
     def get_metadata(self, key: str, default: Any = None) -> Any:
         """Get metadata"""
@@ -0,0 +1,359 @@
+"""
+Caches used by the graph engine.
+"""
+import copy
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, Optional, Tuple, Union
+
+from .config import NodeCacheConfig
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded LRU cache with per-entry expiry and hit/miss counters.
+
+    All operations are O(1). Expired entries are dropped lazily when read and
+    from the LRU end when room is needed.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = 300.0):
+        self.max_size = max(1, int(max_size))
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            self._stats["misses"] += 1
+            return default
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            return default
+        self._data.move_to_end(key)
+        self._stats["hits"] += 1
+        return value
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        if key in self._data:
+            self._data.move_to_end(key)
+        self._data[key] = (value, expires_at)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            return False
+        expires_at = item[1]
+        return expires_at is None or expires_at > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "total_requests": total,
+            "hit_rate": self._stats["hits"] / total if total else 0.0,
+        }
+
+
+def normalize_query(query: Any) -> str:
+    """Case- and whitespace-insensitive form of a routing query."""
+    return " ".join(str(query or "").lower().split())
+
+
+class RouterDecisionCache:
+    """Caches LLM routing decisions keyed by node, allowed targets and query.
+
+    ``key_fn(state, query)`` may be supplied to fingerprint the parts of the
+    state that influence routing; by default only the normalized query is used.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: Optional[float] = 300.0,
+        key_fn: Optional[Callable[[Dict[str, Any], str], Hashable]] = None,
+    ):
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+        self.key_fn = key_fn
+
+    def make_key(
+        self,
+        current_node: str,
+        allowed_targets: Optional[Iterable[str]],
+        state: Dict[str, Any],
+        query: str,
+        graph_version: int = 0,
+    ) -> Hashable:
+        fingerprint = self.key_fn(state, query) if self.key_fn else normalize_query(query)
+        targets = tuple(sorted(allowed_targets)) if allowed_targets else None
+        return (graph_version, current_node, targets, fingerprint)
+
+    def get(self, key: Hashable) -> Optional[str]:
+        return self._cache.get(key)
+
+    def put(self, key: Hashable, next_node: str) -> None:
+        self._cache.put(key, next_node)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self._cache.get_stats()
+
+
+class SQLiteCache:
+    """On-disk LRU cache with the same interface as ``TTLCache``.
+
+    Keys must be strings and values picklable. Expiry uses wall-clock time so
+    entries stay valid across processes sharing the file. Several caches can
+    share one file: each ``namespace`` has its own entries, size limit and
+    stats, with per-namespace row counts kept exact by triggers.
+    """
+
+    _SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value BLOB NOT NULL,
+            expires_at REAL,
+            accessed_at REAL NOT NULL,
+            PRIMARY KEY (namespace, key)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS cache_entries_accessed ON cache_entries (namespace, accessed_at)",
+        """
+        CREATE TABLE IF NOT EXISTS cache_counts (
+            namespace TEXT PRIMARY KEY,
+            entries INTEGER NOT NULL
+        )
+        """,
+        "INSERT OR IGNORE INTO cache_counts (namespace, entries) "
+        "SELECT namespace, COUNT(*) FROM cache_entries GROUP BY namespace",
+        """
+        CREATE TRIGGER IF NOT EXISTS cache_counts_insert AFTER INSERT ON cache_entries BEGIN
+            INSERT INTO cache_counts (namespace, entries) VALUES (NEW.namespace, 1)
+                ON CONFLICT(namespace) DO UPDATE SET entries = entries + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS cache_counts_delete AFTER DELETE ON cache_entries BEGIN
+            UPDATE cache_counts SET entries = entries - 1 WHERE namespace = OLD.namespace;
+        END
+        """,
+    )
+
+    def __init__(
+        self,
+        path: Union[str, Path] = ":memory:",
+        max_size: int = 1024,
+        ttl: Optional[float] = 300.0,
+        namespace: str = "",
+    ):
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_size = max(1, int(max_size))
+        self.ttl = ttl
+        self.namespace = namespace
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._transaction():
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(cache_entries)")}
+            if columns and "namespace" not in columns:
+                # Pre-namespace layout; it only holds cached results, so start over
+                self._conn.execute("DROP TABLE cache_entries")
+            for statement in self._SCHEMA:
+                self._conn.execute(statement)
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _entries(self) -> int:
+        row = self._conn.execute(
+            "SELECT entries FROM cache_counts WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            now = time.time()
+            if row is None:
+                self._stats["misses"] += 1
+                return default
+            if row[1] is not None and row[1] <= now:
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+                )
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return default
+            self._conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+            self._stats["hits"] += 1
+        return pickle.loads(row[0])
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._transaction():
+            self._conn.execute(
+                "INSERT INTO cache_entries (namespace, key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value, "
+                "expires_at = excluded.expires_at, accessed_at = excluded.accessed_at",
+                (self.namespace, key, payload, expires_at, now),
+            )
+            overflow = self._entries() - self.max_size
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key IN "
+                    "(SELECT key FROM cache_entries WHERE namespace = ? ORDER BY accessed_at LIMIT ?)",
+                    (self.namespace, self.namespace, overflow),
+                )
+                self._stats["evictions"] += overflow
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+            ).fetchone()
+        return row is not None and (row[0] is None or row[0] > time.time())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._entries()
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "size": len(self),
+            "max_size": self.max_size,
+            "total_requests": total,
+            "hit_rate": self._stats["hits"] / total if total else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class NodeResultCache:
+    """Memoizes node updates keyed by the node name and selected state values.
+
+    States whose key values cannot be pickled are treated as uncacheable and
+    simply run the node. Values are copied in and out of the in-process
+    backend so reducers never mutate a cached result.
+    """
+
+    def __init__(self, node_name: str, config: NodeCacheConfig):
+        self.node_name = node_name
+        self.config = config
+        if config.backend == "disk":
+            self._backend: Union[TTLCache, SQLiteCache] = SQLiteCache(
+                config.path, config.max_size, config.ttl, namespace=node_name
+            )
+        else:
+            self._backend = TTLCache(max_size=config.max_size, ttl=config.ttl)
+
+    def make_key(self, state: Dict[str, Any]) -> Optional[str]:
+        config = self.config
+        if config.key_fn is not None:
+            material = config.key_fn(state)
+        elif config.keys is not None:
+            material = tuple((key, state.get(key)) for key in config.keys)
+        else:
+            material = tuple(sorted(dict(state).items()))
+        try:
+            payload = pickle.dumps((self.node_name, material), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return None
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._backend.get(key)
+        if value is None or isinstance(self._backend, SQLiteCache):
+            return value
+        return copy.deepcopy(value)
+
+    def put(self, key: str, updates: Dict[str, Any]) -> None:
+        try:
+            value = updates if isinstance(self._backend, SQLiteCache) else copy.deepcopy(updates)
+            self._backend.put(key, value)
+        except Exception:
+            pass  # uncacheable result; the node simply runs again next time
+
+    def clear(self) -> None:
+        self._backend.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self._backend.get_stats()
+
+
+def node_cache_from_spec(node_name: str, spec: Any) -> Optional[NodeResultCache]:
+    """Build a node cache from ``cache=`` (a config, a dict of its fields or True)."""
+    if spec is None or spec is False:
+        return None
+    if spec is True:
+        spec = NodeCacheConfig()
+    elif isinstance(spec, dict):
+        spec = NodeCacheConfig(**spec)
+    elif not isinstance(spec, NodeCacheConfig):
+        raise TypeError("cache must be a NodeCacheConfig, a dict of its fields or True")
+    return NodeResultCache(node_name, spec)
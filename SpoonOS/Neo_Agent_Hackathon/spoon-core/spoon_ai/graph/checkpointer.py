@@ -1,10 +1,32 @@
 """
-In-memory checkpointer for the graph package.
+Checkpointers for the graph package.
+
+``InMemoryCheckpointer`` keeps snapshots in process memory. ``SQLiteCheckpointer``
+persists them to disk and stores only the keys that changed since the parent
+checkpoint, rebuilding full state on read.
 """
-from typing import Any, Dict, Iterable, List, Optional
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 from datetime import datetime
 from .types import StateSnapshot, CheckpointTuple
 from .exceptions import CheckpointError
+from .state import FrozenState
+
+_IMMUTABLE_TYPES = (type(None), bool, int, float, complex, str, bytes)
+
+
+def _is_immutable(value: Any) -> bool:
+    """True if ``value`` cannot change in place (scalars and tuples/frozensets of them)."""
+    if isinstance(value, _IMMUTABLE_TYPES):
+        return True
+    if isinstance(value, (tuple, frozenset)):
+        return all(_is_immutable(item) for item in value)
+    return False
 
 
 class InMemoryCheckpointer:
@@ -143,3 +165,362 @@ class InMemoryCheckpointer:
             del self.checkpoints[thread_id]
         if thread_id in self.last_access:
             del self.last_access[thread_id]
+
+
+
+class SQLiteCheckpointer:
+    """Disk-backed checkpointer that stores per-checkpoint state deltas.
+
+    Each checkpoint records only the state keys whose value changed since its
+    parent checkpoint in the same thread. Every ``full_snapshot_interval``
+    checkpoints a full copy is written so rebuilding a state never replays more
+    than that many deltas. Values are serialized with ``pickle``.
+    """
+
+    _SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS checkpoints (
+            thread_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            checkpoint_id TEXT NOT NULL,
+            parent_checkpoint_id TEXT,
+            created_at REAL NOT NULL,
+            next TEXT NOT NULL,
+            config BLOB,
+            metadata BLOB,
+            parent_config BLOB,
+            is_full INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (thread_id, seq)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_checkpoints_id ON checkpoints (thread_id, checkpoint_id)",
+        """
+        CREATE TABLE IF NOT EXISTS checkpoint_writes (
+            thread_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            key TEXT NOT NULL,
+            value BLOB,
+            deleted INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (thread_id, seq, key)
+        )
+        """,
+    )
+
+    def __init__(
+        self,
+        path: Union[str, Path] = ":memory:",
+        max_checkpoints_per_thread: int = 100,
+        *,
+        full_snapshot_interval: int = 20,
+    ):
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_checkpoints_per_thread = max(1, max_checkpoints_per_thread)
+        self.full_snapshot_interval = max(1, full_snapshot_interval)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in self._SCHEMA:
+            self._conn.execute(statement)
+        # thread_id -> (seq, checkpoint_id, {key: digest}, values) of the latest checkpoint
+        self._heads: Dict[str, Tuple[int, str, Dict[str, bytes], Any]] = {}
+
+    # ------------------------------------------------------------------
+    # Serialization helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _dumps(value: Any) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _digest(payload: bytes) -> bytes:
+        return hashlib.blake2b(payload, digest_size=16).digest()
+
+    @staticmethod
+    def _checkpoint_id(snapshot: StateSnapshot) -> str:
+        return snapshot.metadata.get("checkpoint_id") or str(snapshot.created_at.timestamp())
+
+    # ------------------------------------------------------------------
+    # Internal reads
+    # ------------------------------------------------------------------
+
+    def _load_head(self, thread_id: str) -> Optional[Tuple[int, str, Dict[str, bytes], Any]]:
+        head = self._heads.get(thread_id)
+        if head is not None:
+            return head
+        row = self._conn.execute(
+            "SELECT seq, checkpoint_id FROM checkpoints WHERE thread_id = ? ORDER BY seq DESC LIMIT 1",
+            (thread_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        seq, checkpoint_id = row
+        digests = {key: self._digest(payload) for key, payload in self._materialize_raw(thread_id, seq).items()}
+        head = (seq, checkpoint_id, digests, None)
+        self._heads[thread_id] = head
+        return head
+
+    def _materialize_raw(self, thread_id: str, seq: int) -> Dict[str, bytes]:
+        """Rebuild the serialized values of checkpoint ``seq`` from its nearest full base."""
+        base = self._conn.execute(
+            "SELECT MAX(seq) FROM checkpoints WHERE thread_id = ? AND seq <= ? AND is_full = 1",
+            (thread_id, seq),
+        ).fetchone()[0]
+        if base is None:
+            base = self._conn.execute(
+                "SELECT MIN(seq) FROM checkpoints WHERE thread_id = ?", (thread_id,)
+            ).fetchone()[0]
+        raw: Dict[str, bytes] = {}
+        if base is None:
+            return raw
+        rows = self._conn.execute(
+            "SELECT key, value, deleted FROM checkpoint_writes "
+            "WHERE thread_id = ? AND seq >= ? AND seq <= ? ORDER BY seq",
+            (thread_id, base, seq),
+        )
+        for key, value, deleted in rows:
+            if deleted:
+                raw.pop(key, None)
+            else:
+                raw[key] = value
+        return raw
+
+    def _row_to_snapshot(self, row: Tuple[Any, ...], values: Dict[str, Any]) -> StateSnapshot:
+        thread_id, _seq, checkpoint_id, parent_id, created_at, next_json, config, metadata, parent_config = row
+        metadata_dict = pickle.loads(metadata) if metadata else {}
+        metadata_dict.setdefault("checkpoint_id", checkpoint_id)
+        parent_cfg = pickle.loads(parent_config) if parent_config else None
+        if parent_cfg is None and parent_id:
+            parent_cfg = {"configurable": {"thread_id": thread_id, "checkpoint_id": parent_id}}
+        return StateSnapshot(
+            values=values,
+            next=tuple(json.loads(next_json)),
+            config=pickle.loads(config) if config else {},
+            metadata=metadata_dict,
+            created_at=datetime.fromtimestamp(created_at),
+            parent_config=parent_cfg,
+        )
+
+    _ROW_COLUMNS = (
+        "thread_id, seq, checkpoint_id, parent_checkpoint_id, created_at, next, config, metadata, parent_config"
+    )
+
+    # ------------------------------------------------------------------
+    # Checkpointer contract
+    # ------------------------------------------------------------------
+
+    def save_checkpoint(self, thread_id: str, snapshot: StateSnapshot) -> None:
+        try:
+            if not thread_id:
+                raise CheckpointError("Thread ID cannot be empty", operation="save")
+            with self._lock:
+                head = self._load_head(thread_id)
+                seq = head[0] + 1 if head else 0
+                parent_id = head[1] if head else None
+                parent_digests = head[2] if head else {}
+                is_full = head is None or seq % self.full_snapshot_interval == 0
+
+                values = snapshot.values
+                parent_values = head[3] if head else None
+                digests: Dict[str, bytes] = {}
+                writes: List[Tuple[str, Optional[bytes], int]] = []
+                frozen = isinstance(values, FrozenState)
+                if (
+                    not is_full
+                    and frozen
+                    and parent_values is not None
+                    and (values is parent_values or values.previous is parent_values)
+                ):
+                    # Copy-on-write snapshot derived from the parent: only its
+                    # changed keys, plus mutable values a node may have
+                    # modified in place, need to be serialized and compared.
+                    changed = values.changed_keys if values is not parent_values else frozenset()
+                    candidates = set(changed)
+                    candidates.update(key for key, value in values.items() if not _is_immutable(value))
+                    digests = dict(parent_digests)
+                    for key in candidates:
+                        if key in values:
+                            payload = self._dumps(values[key])
+                            digest = self._digest(payload)
+                            digests[key] = digest
+                            if parent_digests.get(key) != digest:
+                                writes.append((key, payload, 0))
+                        elif digests.pop(key, None) is not None:
+                            writes.append((key, None, 1))
+                else:
+                    for key, value in values.items():
+                        payload = self._dumps(value)
+                        digest = self._digest(payload)
+                        digests[key] = digest
+                        if is_full or parent_digests.get(key) != digest:
+                            writes.append((key, payload, 0))
+                    if not is_full:
+                        for key in parent_digests.keys() - digests.keys():
+                            writes.append((key, None, 1))
+
+                checkpoint_id = self._checkpoint_id(snapshot)
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.execute(
+                        f"INSERT INTO checkpoints ({self._ROW_COLUMNS}, is_full) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            thread_id,
+                            seq,
+                            checkpoint_id,
+                            parent_id,
+                            snapshot.created_at.timestamp(),
+                            json.dumps(list(snapshot.next)),
+                            self._dumps(snapshot.config or {}),
+                            self._dumps(snapshot.metadata or {}),
+                            self._dumps(snapshot.parent_config) if snapshot.parent_config is not None else None,
+                            int(is_full),
+                        ),
+                    )
+                    self._conn.executemany(
+                        "INSERT INTO checkpoint_writes (thread_id, seq, key, value, deleted) VALUES (?, ?, ?, ?, ?)",
+                        [(thread_id, seq, key, payload, deleted) for key, payload, deleted in writes],
+                    )
+                    self._prune(thread_id, seq)
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    self._heads.pop(thread_id, None)
+                    raise
+                self._heads[thread_id] = (seq, checkpoint_id, digests, values if frozen else None)
+        except CheckpointError:
+            raise
+        except Exception as e:
+            raise CheckpointError(f"Failed to save checkpoint: {str(e)}", thread_id=thread_id, operation="save") from e
+
+    def _prune(self, thread_id: str, latest_seq: int) -> None:
+        oldest_kept = latest_seq - self.max_checkpoints_per_thread + 1
+        if oldest_kept <= 0:
+            return
+        row = self._conn.execute(
+            "SELECT is_full FROM checkpoints WHERE thread_id = ? AND seq = ?", (thread_id, oldest_kept)
+        ).fetchone()
+        if row is None:
+            return
+        if not row[0]:
+            # Promote the new oldest checkpoint to a full snapshot before dropping its base
+            raw = self._materialize_raw(thread_id, oldest_kept)
+            self._conn.execute(
+                "DELETE FROM checkpoint_writes WHERE thread_id = ? AND seq = ?", (thread_id, oldest_kept)
+            )
+            self._conn.executemany(
+                "INSERT INTO checkpoint_writes (thread_id, seq, key, value, deleted) VALUES (?, ?, ?, ?, 0)",
+                [(thread_id, oldest_kept, key, payload) for key, payload in raw.items()],
+            )
+            self._conn.execute(
+                "UPDATE checkpoints SET is_full = 1 WHERE thread_id = ? AND seq = ?", (thread_id, oldest_kept)
+            )
+        self._conn.execute("DELETE FROM checkpoint_writes WHERE thread_id = ? AND seq < ?", (thread_id, oldest_kept))
+        self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ? AND seq < ?", (thread_id, oldest_kept))
+
+    def get_checkpoint(self, thread_id: str, checkpoint_id: Optional[str] = None) -> Optional[StateSnapshot]:
+        try:
+            if not thread_id:
+                raise CheckpointError("Thread ID cannot be empty", operation="get")
+            with self._lock:
+                if checkpoint_id:
+                    row = self._conn.execute(
+                        f"SELECT {self._ROW_COLUMNS} FROM checkpoints "
+                        "WHERE thread_id = ? AND checkpoint_id = ? ORDER BY seq LIMIT 1",
+                        (thread_id, checkpoint_id),
+                    ).fetchone()
+                else:
+                    row = self._conn.execute(
+                        f"SELECT {self._ROW_COLUMNS} FROM checkpoints WHERE thread_id = ? ORDER BY seq DESC LIMIT 1",
+                        (thread_id,),
+                    ).fetchone()
+                if row is None:
+                    return None
+                raw = self._materialize_raw(thread_id, row[1])
+            values = {key: pickle.loads(payload) for key, payload in raw.items()}
+            return self._row_to_snapshot(row, values)
+        except CheckpointError:
+            raise
+        except Exception as e:
+            raise CheckpointError(
+                f"Failed to get checkpoint: {str(e)}",
+                thread_id=thread_id,
+                checkpoint_id=checkpoint_id,
+                operation="get",
+            ) from e
+
+    def get_checkpoint_tuple(self, config: Dict[str, Any]) -> Optional[CheckpointTuple]:
+        if not isinstance(config, dict):
+            raise CheckpointError("config must be a dictionary", operation="get_tuple")
+
+        configurable = config.get("configurable", {})
+        thread_id = configurable.get("thread_id")
+        checkpoint_id = configurable.get("checkpoint_id")
+
+        if not thread_id:
+            raise CheckpointError("thread_id is required", operation="get_tuple")
+
+        snapshot = self.get_checkpoint(thread_id, checkpoint_id)
+        if not snapshot:
+            return None
+
+        return InMemoryCheckpointer._snapshot_to_tuple(snapshot)
+
+    def list_checkpoints(self, thread_id: str) -> List[StateSnapshot]:
+        """Rebuild every stored checkpoint for a thread in a single pass over its deltas."""
+        try:
+            if not thread_id:
+                raise CheckpointError("Thread ID cannot be empty", operation="list")
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {self._ROW_COLUMNS} FROM checkpoints WHERE thread_id = ? ORDER BY seq",
+                    (thread_id,),
+                ).fetchall()
+                writes = self._conn.execute(
+                    "SELECT seq, key, value, deleted FROM checkpoint_writes WHERE thread_id = ? ORDER BY seq",
+                    (thread_id,),
+                ).fetchall()
+            by_seq: Dict[int, List[Tuple[str, Optional[bytes], int]]] = {}
+            for seq, key, value, deleted in writes:
+                by_seq.setdefault(seq, []).append((key, value, deleted))
+
+            snapshots: List[StateSnapshot] = []
+            current: Dict[str, Any] = {}
+            for row in rows:
+                for key, value, deleted in by_seq.get(row[1], ()):
+                    if deleted:
+                        current.pop(key, None)
+                    else:
+                        current[key] = pickle.loads(value)
+                snapshots.append(self._row_to_snapshot(row, dict(current)))
+            return snapshots
+        except CheckpointError:
+            raise
+        except Exception as e:
+            raise CheckpointError(f"Failed to list checkpoints: {str(e)}", thread_id=thread_id, operation="list") from e
+
+    def iter_checkpoint_history(self, config: Dict[str, Any]) -> Iterable[CheckpointTuple]:
+        """Return checkpoint tuples for the specified thread, newest last."""
+        if not isinstance(config, dict):
+            raise CheckpointError("config must be a dictionary", operation="history_tuple")
+
+        configurable = config.get("configurable", {})
+        thread_id = configurable.get("thread_id")
+        if not thread_id:
+            raise CheckpointError("thread_id is required", operation="history_tuple")
+
+        snapshots = self.list_checkpoints(thread_id)
+        return [InMemoryCheckpointer._snapshot_to_tuple(snapshot) for snapshot in snapshots]
+
+    def clear_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoint_writes WHERE thread_id = ?", (thread_id,))
+            self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            self._heads.pop(thread_id, None)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+            self._heads.clear()
@@ -60,6 +60,11 @@ class ParallelGroupConfig:
     retry_policy: ParallelRetryPolicy = field(default_factory=ParallelRetryPolicy)
     join_condition: Optional[Callable[[Dict[str, Any], List[str]], bool]] = None
 
+    # Fan-out/fan-in isolation: each branch reads a shared read-only view and
+    # writes into its own delta; deltas are merged once, in declaration order,
+    # using the reducers declared on the state schema.
+    branch_isolation: bool = False
+
     # Resource controls
     max_in_flight: Optional[int] = None
     rate_limit_per_second: Optional[float] = None
@@ -101,6 +106,37 @@ class ParallelGroupConfig:
             self.circuit_breaker_cooldown = 30.0
 
 
+# ---------------------------------------------------------------------------
+# Node result caching
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class NodeCacheConfig:
+    """Memoizes a deterministic node's updates keyed by selected state keys."""
+
+    # State keys that determine the node's output; None means the whole state.
+    keys: Optional[Sequence[str]] = None
+    ttl: Optional[float] = 300.0
+    # "memory" → in-process LRU, "disk" → SQLite file shared across processes;
+    # nodes sharing a file keep separate entries and size limits.
+    backend: str = "memory"
+    max_size: int = 256
+    path: Optional[str] = None
+    key_fn: Optional[Callable[[Dict[str, Any]], Any]] = None
+
+    def __post_init__(self) -> None:
+        self.backend = (self.backend or "memory").lower()
+        if self.backend not in {"memory", "disk"}:
+            raise ValueError(f"Unknown node cache backend '{self.backend}'")
+        if self.backend == "disk" and not self.path:
+            self.path = ".spoon_cache/node_cache.db"
+        if isinstance(self.keys, str):
+            self.keys = [self.keys]
+        if self.max_size < 1:
+            self.max_size = 1
+
+
 # ---------------------------------------------------------------------------
 # Graph-wide configuration
 # ---------------------------------------------------------------------------
@@ -5,12 +5,20 @@ import asyncio
 import functools
 import time
 from datetime import datetime
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Optional
 
 from .types import NodeContext, NodeResult
 
 
-def node_decorator(func: Callable) -> Callable:
+def node_decorator(func: Optional[Callable] = None, *, cache: Any = None) -> Callable:
+    """Wrap a node function; ``cache=`` is picked up by ``StateGraph.add_node``.
+
+    Usable bare (``@node_decorator``) or with options
+    (``@node_decorator(cache=NodeCacheConfig(keys=["symbol"]))``).
+    """
+    if func is None:
+        return functools.partial(node_decorator, cache=cache)
+
     @functools.wraps(func)
     async def async_wrapper(state: Dict[str, Any], context: NodeContext = None) -> NodeResult:
         return await _execute_node_with_context(func, state, context, is_async=True)
@@ -19,10 +27,10 @@ def node_decorator(func: Callable) -> Callable:
     def sync_wrapper(state: Dict[str, Any], context: NodeContext = None) -> NodeResult:
         return _execute_node_with_context(func, state, context, is_async=False)
 
-    if asyncio.iscoroutinefunction(func):
-        return async_wrapper
-    else:
-        return sync_wrapper
+    wrapper = async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
+    if cache is not None:
+        wrapper.__node_cache__ = cache
+    return wrapper
 
 
 def router_decorator(func: Callable) -> Callable:
@@ -2,14 +2,17 @@
 Graph engine: StateGraph, CompiledGraph, and interrupt API implementation.
 """
 import asyncio
+import contextvars
 import logging
 import uuid
 import inspect
 import time
 import re
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Callable, Dict, List, Optional, Union, Pattern, TypeVar, Generic, TypedDict, Literal, Iterable
+from types import MappingProxyType
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple, Union, Pattern, TypeVar, Generic, TypedDict, Literal, Iterable, get_args, get_origin, get_type_hints, Annotated
 from abc import ABC, abstractmethod
 
 from .exceptions import (
@@ -31,11 +34,16 @@ from .types import (
 from .reducers import (
     merge_dicts,
     add_messages,
+    _extract_remove_id,
 )
 from .decorators import node_decorator
 from .checkpointer import InMemoryCheckpointer
+from .state import BranchState, CopyOnWriteState
+from .cache import NodeResultCache, RouterDecisionCache, node_cache_from_spec
+from .metrics import ExecutionRecord, NodeExecutionStats
 from spoon_ai.schema import Message
-from .config import GraphConfig, ParallelGroupConfig, ParallelRetryPolicy, RouterConfig
+from spoon_ai.callbacks.stream_writer import bind_stream_writer, reset_stream_writer
+from .config import GraphConfig, NodeCacheConfig, ParallelGroupConfig, ParallelRetryPolicy, RouterConfig
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +54,41 @@ ConfigurableFieldSpec = Dict[str, Any]
 START = "__start__"
 END = "__end__"
 
+
+def checkpoint_thread_key(configurable: Dict[str, Any]) -> Optional[str]:
+    """Checkpointer key for a run: ``thread_id`` scoped by an optional ``checkpoint_ns``."""
+    thread_id = configurable.get("thread_id")
+    if not thread_id:
+        return None
+    namespace = configurable.get("checkpoint_ns")
+    return f"{namespace}:{thread_id}" if namespace else thread_id
+
+
+@dataclass
+class _RunContext:
+    """Per-invocation execution context, isolated between concurrent runs."""
+
+    thread_id: str
+    iteration: int = 0
+    in_batch: bool = False
+
+
+_run_context: contextvars.ContextVar[Optional[_RunContext]] = contextvars.ContextVar("spoon_graph_run", default=None)
+# Set by abatch for the runs it starts, instead of marking their user-visible config.
+_batch_run: contextvars.ContextVar[bool] = contextvars.ContextVar("spoon_graph_batch_run", default=False)
+# Node currently executing in this task; tags chunks streamed in "messages" mode.
+_active_node: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("spoon_graph_node", default=None)
+
+STREAM_MODES = frozenset({"values", "updates", "messages"})
+_STREAM_END = object()
+
+
+class _StreamFailure:
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
 class BaseNode(ABC, Generic[State]):
     """Base class for all graph nodes"""
 
@@ -186,6 +229,75 @@ class RouteRule:
         return False
 
 
+@dataclass(frozen=True)
+class NodeRoutes:
+    """Precomputed outgoing routes for one node.
+
+    ``static_target`` is set when the first usable edge is unconditional, in
+    which case no other edge can ever be selected. ``edges`` holds the
+    remaining edges in declaration order as ``(kind, a, b)`` tuples:
+    ``("static", target, None)``, ``("map", condition, path_map)`` or
+    ``("predicate", target, condition)``. ``rules`` are the routing rules in
+    priority order as ``(kind, matcher, target)`` with text needles
+    pre-lowercased.
+    """
+
+    static_target: Optional[str] = None
+    edges: tuple = ()
+    rules: tuple = ()
+    rules_need_text: bool = False
+
+
+class RoutingTable:
+    """Per-node dispatch table built once when a graph is compiled."""
+
+    def __init__(self, graph: "StateGraph"):
+        self.version = graph._version
+        self.config_source = graph.config
+        graph_cfg = graph.config if isinstance(graph.config, GraphConfig) else GraphConfig()
+        self.router: RouterConfig = graph_cfg.router
+        self.allowed_targets = frozenset(self.router.allowed_targets) if self.router.allowed_targets else None
+        self.routes: Dict[str, NodeRoutes] = {}
+        for node_name in set(graph.edges) | set(graph.routing_rules):
+            self.routes[node_name] = self._compile_node(graph, node_name)
+
+    @staticmethod
+    def _compile_node(graph: "StateGraph", node_name: str) -> NodeRoutes:
+        edges: List[tuple] = []
+        for edge_target, edge_condition in graph.edges.get(node_name, []):
+            if edge_condition is None and isinstance(edge_target, str):
+                if edge_target in graph.nodes or edge_target == END:
+                    edges.append(("static", edge_target, None))
+            elif callable(edge_target) and isinstance(edge_condition, dict):
+                edges.append(("map", edge_target, edge_condition))
+            elif isinstance(edge_target, str) and callable(edge_condition):
+                edges.append(("predicate", edge_target, edge_condition))
+
+        static_target = edges[0][1] if edges and edges[0][0] == "static" else None
+
+        rules: List[tuple] = []
+        needs_text = False
+        for rule in graph.routing_rules.get(node_name, []):
+            if isinstance(rule.condition, str):
+                rules.append(("text", rule.condition.lower(), rule.target))
+                needs_text = True
+            elif isinstance(rule.condition, Pattern):
+                rules.append(("pattern", rule.condition, rule.target))
+                needs_text = True
+            elif callable(rule.condition):
+                rules.append(("callable", rule.condition, rule.target))
+
+        return NodeRoutes(
+            static_target=static_target,
+            edges=tuple(edges) if static_target is None else (),
+            rules=tuple(rules),
+            rules_need_text=needs_text,
+        )
+
+    def is_stale(self, graph: "StateGraph") -> bool:
+        return self.version != graph._version or self.config_source is not graph.config
+
+
 @dataclass
 class RunningSummary:
     """Rolling conversation summary used by the summarisation node."""
@@ -286,6 +398,7 @@ class StateGraph(Generic[State]):
         # Node storage
         self.nodes: Dict[str, BaseNode[State]] = {}
         self.node_functions: Dict[str, Callable] = {}  # For backward compatibility
+        self.node_caches: Dict[str, NodeResultCache] = {}
 
         # Edge management
         self.edges: Dict[str, List[tuple]] = {}  # (end_node, condition_func)
@@ -307,6 +420,8 @@ class StateGraph(Generic[State]):
             "max_tokens": 100,
             "timeout": 8,
         }
+        self.llm_router_cache: Optional[RouterDecisionCache] = None
+        self._routing_steps: Optional[tuple] = None  # (version, description, names)
 
         # Parallel execution
         self.parallel_branches: Dict[str, List[str]] = {}
@@ -328,17 +443,37 @@ class StateGraph(Generic[State]):
         self.state_cleanup: Optional[Callable[[Dict[str, Any]], None]] = None
         self.state_validator: Optional[Callable[[Dict[str, Any]], None]] = None
 
+        # Bumped on every structural change so compiled routing tables can detect staleness
+        self._version: int = 0
+
     def enable_monitoring(self, metrics: Optional[List[str]] = None) -> "StateGraph":
         self.monitoring_enabled = True
         if metrics:
             self.monitoring_metrics = metrics
         return self
 
-    def add_node(self, node_name: str, node: Union[BaseNode[State], Callable[[State], Any]]) -> "StateGraph":
-        """Add a node to the graph"""
+    def add_node(
+        self,
+        node_name: str,
+        node: Union[BaseNode[State], Callable[[State], Any]],
+        *,
+        cache: Union[NodeCacheConfig, Dict[str, Any], bool, None] = None,
+    ) -> "StateGraph":
+        """Add a node to the graph.
+
+        ``cache`` memoizes the node's updates for deterministic nodes; it falls
+        back to the ``cache=`` given to ``node_decorator``.
+        """
         if node_name in [START, END]:
             raise GraphConfigurationError(f"Node name '{node_name}' is reserved", component="node")
 
+        if cache is None:
+            cache = getattr(node, "__node_cache__", None)
+        try:
+            node_cache = node_cache_from_spec(node_name, cache)
+        except (TypeError, ValueError) as e:
+            raise GraphConfigurationError(f"Invalid cache for node '{node_name}': {e}", component="node") from e
+
         if isinstance(node, BaseNode):
             self.nodes[node_name] = node
         elif callable(node):
@@ -348,6 +483,11 @@ class StateGraph(Generic[State]):
         else:
             raise GraphConfigurationError(f"Node must be callable or BaseNode instance", component="node")
 
+        if node_cache is not None:
+            self.node_caches[node_name] = node_cache
+        else:
+            self.node_caches.pop(node_name, None)
+        self._version += 1
         return self
 
     def add_edge(self, start_node: str, end_node: str, condition: Optional[Callable[[State], bool]] = None) -> "StateGraph":
@@ -363,6 +503,7 @@ class StateGraph(Generic[State]):
         if start_node not in self.edges:
             self.edges[start_node] = []
         self.edges[start_node].append((end_node, condition))
+        self._version += 1
         return self
 
     def add_conditional_edges(self, start_node: str, condition: Callable[[State], str],
@@ -379,6 +520,7 @@ class StateGraph(Generic[State]):
         if start_node not in self.edges:
             self.edges[start_node] = []
         self.edges[start_node].append((condition, path_map))
+        self._version += 1
         return self
 
     def set_entry_point(self, node_name: str) -> "StateGraph":
@@ -442,6 +584,7 @@ class StateGraph(Generic[State]):
 
         # Sort rules by priority (highest first)
         self.routing_rules[source_node].sort(key=lambda r: r.priority, reverse=True)
+        self._version += 1
 
         return self
 
@@ -452,7 +595,7 @@ class StateGraph(Generic[State]):
 
         config = config or {}
         configurable = config.get("configurable", {})
-        thread_id = configurable.get("thread_id")
+        thread_id = checkpoint_thread_key(configurable)
         checkpoint_id = configurable.get("checkpoint_id")
 
         if not thread_id:
@@ -467,7 +610,7 @@ class StateGraph(Generic[State]):
 
         config = config or {}
         configurable = config.get("configurable", {})
-        thread_id = configurable.get("thread_id")
+        thread_id = checkpoint_thread_key(configurable)
 
         if not thread_id:
             raise CheckpointError("thread_id is required to fetch state history", operation="state_history")
@@ -508,6 +651,21 @@ class StateGraph(Generic[State]):
 
         return self
 
+    def enable_router_cache(self, ttl: Optional[float] = 300.0, max_size: int = 1024,
+                            key_fn: Optional[Callable[[Dict[str, Any], str], Any]] = None) -> "StateGraph":
+        """Cache LLM router decisions in front of ``llm_router``.
+
+        Decisions are keyed by current node, allowed targets and the normalized
+        query (or ``key_fn(state, query)`` when given). Entries expire after
+        ``ttl`` seconds and the cache holds at most ``max_size`` decisions.
+        """
+        self.llm_router_cache = RouterDecisionCache(max_size=max_size, ttl=ttl, key_fn=key_fn)
+        return self
+
+    def disable_router_cache(self) -> "StateGraph":
+        self.llm_router_cache = None
+        return self
+
     def _create_default_llm_router(self, state: Dict[str, Any], query: str) -> str:
         """Create and use default LLM router for natural language routing"""
         try:
@@ -567,21 +725,22 @@ class StateGraph(Generic[State]):
             # Fallback to entry point
             return self._entry_point or list(self.nodes.keys())[0]
 
+    def _routing_steps_for_version(self) -> tuple:
+        cached = self._routing_steps
+        if cached is None or cached[0] != self._version:
+            names = [name for name in self.nodes.keys() if name not in [START, END]]
+            steps = [f"- {name}: Execute {name.replace('_', ' ')}" for name in names]
+            description = "\n".join(steps) if steps else "- analyze_intent: Analyze user intent"
+            cached = self._routing_steps = (self._version, description, names)
+        return cached
+
     def _get_available_steps_for_routing(self) -> str:
         """Get available steps description for LLM routing"""
-        steps = []
-        for node_name in self.nodes.keys():
-            if node_name not in [START, END]:
-                steps.append(f"- {node_name}: Execute {node_name.replace('_', ' ')}")
-
-        if not steps:
-            return "- analyze_intent: Analyze user intent"
-
-        return "\n".join(steps)
+        return self._routing_steps_for_version()[1]
 
     def _get_available_step_names(self) -> List[str]:
         """Get list of available step names for validation"""
-        return [name for name in self.nodes.keys() if name not in [START, END]]
+        return list(self._routing_steps_for_version()[2])
 
     def enable_llm_routing(self, config: Optional[Dict[str, Any]] = None) -> "StateGraph":
         """Enable LLM-powered natural language routing
@@ -634,17 +793,16 @@ class CompiledGraph(Generic[State]):
         self.graph = graph
         self.checkpointer = checkpointer or graph.checkpointer
 
-        # Execution state
-        self.execution_history: List[Dict[str, Any]] = []
-        self.max_execution_history = 1000
+        # Execution state: fixed-size ring buffer of raw records plus running per-node aggregates
+        self._history: deque = deque(maxlen=1000)
+        self._node_stats: Dict[str, NodeExecutionStats] = {}
 
         # Resume functionality
         self._resume_thread_id: Optional[str] = None
         self._resume_checkpoint_id: Optional[str] = None
 
-        # Current execution context
-        self._current_node: Optional[str] = None
-        self._iteration: int = 0
+        # Current execution context lives in a ContextVar (see _RunContext) so
+        # concurrent invocations on one compiled graph do not share it.
 
         # Execution metrics
         self.execution_metrics = {
@@ -654,78 +812,168 @@ class CompiledGraph(Generic[State]):
             "routing_performance": {}
         }
 
-    def _find_matching_route(self, current_node: str, state: Dict[str, Any]) -> Optional[str]:
+        # Routing dispatch table, rebuilt only if the graph changes after compile
+        self._routing = RoutingTable(graph)
+
+        # Reducers declared on the state schema via Annotated[T, reducer]
+        self.declared_reducers: Dict[str, Callable[[Any, Any], Any]] = self._collect_declared_reducers(graph.state_schema)
+
+    @property
+    def _current_thread_id(self) -> Optional[str]:
+        ctx = _run_context.get()
+        return ctx.thread_id if ctx else None
+
+    @property
+    def _current_iteration(self) -> int:
+        ctx = _run_context.get()
+        return ctx.iteration if ctx else 0
+
+    @property
+    def max_execution_history(self) -> int:
+        return self._history.maxlen
+
+    @max_execution_history.setter
+    def max_execution_history(self, value: int) -> None:
+        self._history = deque(self._history, maxlen=max(1, int(value)))
+
+    @property
+    def execution_history(self) -> List[Dict[str, Any]]:
+        """Most recent node executions, oldest first (rendered on access)."""
+        return [record.to_dict() for record in self._history]
+
+    @execution_history.setter
+    def execution_history(self, records: Iterable[Any]) -> None:
+        self._history.clear()
+        for record in records:
+            self._history.append(record if isinstance(record, ExecutionRecord) else ExecutionRecord.from_dict(record))
+
+    def get_execution_history(self) -> List[Dict[str, Any]]:
+        return self.execution_history
+
+    @staticmethod
+    def _collect_declared_reducers(state_schema: Any) -> Dict[str, Callable[[Any, Any], Any]]:
+        try:
+            hints = get_type_hints(state_schema, include_extras=True)
+        except Exception:
+            hints = getattr(state_schema, "__annotations__", {}) or {}
+        reducers: Dict[str, Callable[[Any, Any], Any]] = {}
+        for field_name, hint in hints.items():
+            if get_origin(hint) is Annotated:
+                for meta in get_args(hint)[1:]:
+                    if callable(meta):
+                        reducers[field_name] = meta
+                        break
+        return reducers
+
+    def _routing_table(self) -> RoutingTable:
+        table = self._routing
+        if table.is_stale(self.graph):
+            table = self._routing = RoutingTable(self.graph)
+        return table
+
+    def _find_matching_route(self, current_node: str, state: Dict[str, Any], routes: Optional[NodeRoutes] = None) -> Optional[str]:
         """Find matching routing rule for the current node and state"""
-        if current_node not in self.graph.routing_rules:
+        if routes is None:
+            routes = self._routing_table().routes.get(current_node)
+        if routes is None or not routes.rules:
             return None
 
-        query = state.get("user_query", "").lower()
+        query = (state.get("user_query", "") or "").lower()
+        text = query + str(state) if routes.rules_need_text else ""
+        lowered: Optional[str] = None
 
         # Check routing rules in priority order
-        for rule in self.graph.routing_rules[current_node]:
-            if rule.matches(state, query):
-                return rule.target
+        for kind, matcher, target in routes.rules:
+            if kind == "text":
+                if lowered is None:
+                    lowered = text.lower()
+                if matcher in lowered:
+                    return target
+            elif kind == "pattern":
+                if matcher.search(text):
+                    return target
+            elif matcher(state, query):
+                return target
 
         return None
 
-    def _find_edge_target(self, current_node: str, state: Dict[str, Any]) -> Optional[str]:
-        if current_node in self.graph.edges:
-            for edge_target, edge_condition in self.graph.edges[current_node]:
-                if edge_condition is None and isinstance(edge_target, str) and (edge_target in self.graph.nodes or edge_target == END):
-                    return edge_target
-                if callable(edge_target) and isinstance(edge_condition, dict):
-                    try:
-                        cond_key = edge_target(state)
-                        if isinstance(cond_key, str) and cond_key in edge_condition:
-                            return edge_condition[cond_key]
-                    except Exception as e:
-                        logger.warning(f"Conditional map evaluation failed: {e}")
-                if isinstance(edge_target, str) and callable(edge_condition):
-                    try:
-                        if edge_condition(state):
-                            return edge_target
-                    except Exception as e:
-                        logger.warning(f"Predicate condition failed: {e}")
+    def _find_edge_target(self, current_node: str, state: Dict[str, Any], routes: Optional[NodeRoutes] = None) -> Optional[str]:
+        if routes is None:
+            routes = self._routing_table().routes.get(current_node)
+        if routes is None:
+            return None
+        if routes.static_target is not None:
+            return routes.static_target
+        for kind, first, second in routes.edges:
+            if kind == "static":
+                return first
+            if kind == "map":
+                try:
+                    cond_key = first(state)
+                    if isinstance(cond_key, str) and cond_key in second:
+                        return second[cond_key]
+                except Exception as e:
+                    logger.warning(f"Conditional map evaluation failed: {e}")
+            else:
+                try:
+                    if second(state):
+                        return first
+                except Exception as e:
+                    logger.warning(f"Predicate condition failed: {e}")
         return None
 
     async def _determine_next_node(self, current_node: str, state: Dict[str, Any]) -> Optional[str]:
         """Determine the next node to execute (async to support async LLM router)."""
-        query = state.get("user_query", "")
-        logger.info(f"Getting next node from '{current_node}' for query: '{query}'")
-
-        graph_cfg = self.graph.config if isinstance(self.graph.config, GraphConfig) else GraphConfig()
-        router_cfg: RouterConfig = graph_cfg.router
+        table = self._routing_table()
+        routes = table.routes.get(current_node)
 
         # Priority 1: Explicit edges
-        logger.info("Checking explicit edges...")
-        explicit_target = self._find_edge_target(current_node, state)
-        if explicit_target:
-            return explicit_target
-
-        # Priority 2: Intelligent routing rules
-        logger.info("Trying routing rules...")
-        matching_route = self._find_matching_route(current_node, state)
-        if matching_route:
-            logger.info(f"Routing rule matched: {matching_route}")
-            return matching_route
+        if routes is not None:
+            if routes.static_target is not None:
+                return routes.static_target
+            explicit_target = self._find_edge_target(current_node, state, routes)
+            if explicit_target:
+                return explicit_target
+
+            # Priority 2: Intelligent routing rules
+            matching_route = self._find_matching_route(current_node, state, routes)
+            if matching_route:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Routing rule matched: {matching_route}")
+                return matching_route
+
+        router_cfg = table.router
+        allowed_targets = table.allowed_targets
+        query = state.get("user_query", "")
 
         # Priority 3: Intelligent router function
         if self.graph.intelligent_router:
-            logger.info("Trying intelligent router...")
             try:
                 router = self.graph.intelligent_router
                 next_node = await router(state, query) if asyncio.iscoroutinefunction(router) else router(state, query)
                 if next_node and next_node != current_node:
-                    if router_cfg.allowed_targets and next_node not in router_cfg.allowed_targets:
+                    if allowed_targets is not None and next_node not in allowed_targets:
                         logger.warning(f"Intelligent router returned disallowed target '{next_node}'")
                     else:
-                        logger.info(f"Intelligent router selected: {next_node}")
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(f"Intelligent router selected: {next_node}")
                         return next_node
             except Exception as e:
                 logger.warning(f"Intelligent router failed: {e}")
 
         # Priority 4: LLM Router (if available)
         if router_cfg.allow_llm and self.graph.llm_router:
+            decision_cache = self.graph.llm_router_cache
+            cache_key = None
+            if decision_cache is not None:
+                try:
+                    cache_key = decision_cache.make_key(current_node, allowed_targets, state, query, table.version)
+                    cached_node = decision_cache.get(cache_key)
+                except Exception as e:
+                    logger.warning(f"LLM router cache lookup failed: {e}")
+                    cache_key = cached_node = None
+                if cached_node is not None and cached_node in self.graph.nodes:
+                    return cached_node
             try:
                 router = self.graph.llm_router
                 if asyncio.iscoroutinefunction(router):
@@ -733,10 +981,12 @@ class CompiledGraph(Generic[State]):
                 else:
                     next_node = router(state, query)
                 if next_node and next_node != current_node and next_node in self.graph.nodes:
-                    if router_cfg.allowed_targets and next_node not in router_cfg.allowed_targets:
+                    if allowed_targets is not None and next_node not in allowed_targets:
                         logger.warning(f"LLM router returned disallowed target '{next_node}'")
                     else:
                         logger.info(f"LLM Router selected: {next_node}")
+                        if cache_key is not None:
+                            decision_cache.put(cache_key, next_node)
                         return next_node
             except Exception as e:
                 logger.warning(f"LLM router failed: {e}")
@@ -744,10 +994,11 @@ class CompiledGraph(Generic[State]):
         # Priority 5: Default target
         if router_cfg.enable_fallback_to_default and router_cfg.default_target:
             target = router_cfg.default_target
-            if router_cfg.allowed_targets and target not in router_cfg.allowed_targets:
+            if allowed_targets is not None and target not in allowed_targets:
                 logger.warning(f"Default target '{target}' not in allowed targets")
             elif target in self.graph.nodes:
-                logger.info(f"Using default router target: {target}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Using default router target: {target}")
                 return target
 
         logger.debug("No valid next node found - graph execution complete")
@@ -755,35 +1006,40 @@ class CompiledGraph(Generic[State]):
 
     async def invoke(self, initial_state: Optional[Dict[str, Any]] = None, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         config = config or {}
-        thread_id = config.get("configurable", {}).get("thread_id", str(uuid.uuid4()))
+        configurable = config.get("configurable", {})
+        thread_id = checkpoint_thread_key(configurable) or str(uuid.uuid4())
+        in_batch = _batch_run.get()
 
-        # Handle resume from checkpoint
-        if self._resume_thread_id:
+        # Handle resume from checkpoint (the instance-level resume target is
+        # ignored inside abatch so concurrent runs cannot pick it up)
+        if self._resume_thread_id and not in_batch:
             thread_id = self._resume_thread_id
-            checkpoint = self.graph.checkpointer.get_checkpoint(thread_id, self._resume_checkpoint_id)
+            checkpoint = self.checkpointer.get_checkpoint(thread_id, self._resume_checkpoint_id)
             if checkpoint:
-                state = checkpoint.values.copy()
-                current_node = checkpoint.next[0] if checkpoint.next else self.graph.entry_point
+                state = CopyOnWriteState(checkpoint.values.copy())
+                current_node = checkpoint.next[0] if checkpoint.next else self.graph._entry_point
                 iteration = checkpoint.metadata.get("iteration", 0)
             else:
-                state = self._initialize_state(initial_state)
+                state = CopyOnWriteState(self._initialize_state(initial_state))
                 current_node = self.graph._entry_point
                 iteration = 0
         else:
-            state = self._initialize_state(initial_state)
+            state = CopyOnWriteState(self._initialize_state(initial_state))
             current_node = self.graph._entry_point
             iteration = 0
 
         max_iterations = int(config.get("max_iterations", 100) or 100)
-        self._current_thread_id = thread_id
+        run_ctx = _RunContext(thread_id=thread_id, in_batch=in_batch)
+        ctx_token = _run_context.set(run_ctx)
+        batch_token = _batch_run.set(False)  # graphs invoked by nodes are not batch runs
         try:
             while current_node and iteration < max_iterations:
-                self._current_iteration = iteration
+                run_ctx.iteration = iteration
                 iteration += 1
                 # checkpoint (best-effort)
                 try:
-                    snapshot = StateSnapshot(values=state.copy(), next=(current_node,), config=config, metadata={"iteration": iteration, "node": current_node}, created_at=datetime.now())
-                    self.graph.checkpointer.save_checkpoint(thread_id, snapshot)
+                    snapshot = StateSnapshot(values=state.snapshot(), next=(current_node,), config=config, metadata={"iteration": iteration, "node": current_node}, created_at=datetime.now())
+                    self.checkpointer.save_checkpoint(thread_id, snapshot)
                 except Exception:
                     pass
                 # execute current node or parallel group
@@ -807,8 +1063,8 @@ class CompiledGraph(Generic[State]):
                 except InterruptError as e:
                     # record interrupt + checkpoint
                     try:
-                        interrupt_snapshot = StateSnapshot(values=state.copy(), next=(current_node,), config=config, metadata={"iteration": iteration, "node": current_node, "interrupt_id": e.interrupt_id, "interrupt_data": e.interrupt_data, "status": "interrupted"}, created_at=datetime.now())
-                        self.graph.checkpointer.save_checkpoint(thread_id, interrupt_snapshot)
+                        interrupt_snapshot = StateSnapshot(values=state.snapshot(), next=(current_node,), config=config, metadata={"iteration": iteration, "node": current_node, "interrupt_id": e.interrupt_id, "interrupt_data": e.interrupt_data, "status": "interrupted"}, created_at=datetime.now())
+                        self.checkpointer.save_checkpoint(thread_id, interrupt_snapshot)
                     except Exception:
                         pass
                     return {**state, "__interrupt__": [{"interrupt_id": e.interrupt_id, "value": e.interrupt_data, "node": current_node, "iteration": iteration}]}
@@ -822,11 +1078,115 @@ class CompiledGraph(Generic[State]):
                     break
             if iteration >= max_iterations:
                 raise GraphExecutionError(f"Graph execution exceeded maximum iterations ({max_iterations})", node=current_node, iteration=iteration)
-            return state
+            return dict(state)
         except GraphExecutionError:
             raise
         except Exception as e:
             raise GraphExecutionError(f"Graph execution failed: {e}", node=current_node, iteration=iteration) from e
+        finally:
+            _batch_run.reset(batch_token)
+            _run_context.reset(ctx_token)
+
+    async def _invoke_batch_run(self, initial_state: Optional[Dict[str, Any]], config: Dict[str, Any]) -> Dict[str, Any]:
+        token = _batch_run.set(True)
+        try:
+            return await self.invoke(initial_state, config)
+        finally:
+            _batch_run.reset(token)
+
+    def _batch_configs(
+        self,
+        count: int,
+        config: Optional[Union[Dict[str, Any], Sequence[Dict[str, Any]]]],
+    ) -> List[Dict[str, Any]]:
+        """Give every batch run its own thread_id and checkpoint namespace."""
+        if config is not None and not isinstance(config, dict):
+            configs = list(config)
+            if len(configs) != count:
+                raise ValueError(f"Expected {count} configs, got {len(configs)}")
+        else:
+            configs = [config or {}] * count
+
+        batch_ns = f"batch-{uuid.uuid4().hex[:12]}"
+        run_configs: List[Dict[str, Any]] = []
+        for index, base in enumerate(configs):
+            configurable = dict(base.get("configurable", {}))
+            if isinstance(config, dict) and configurable.get("thread_id"):
+                # a shared config's thread_id becomes a per-run prefix
+                configurable["thread_id"] = f"{configurable['thread_id']}-{index}"
+            configurable.setdefault("thread_id", str(uuid.uuid4()))
+            configurable.setdefault("checkpoint_ns", batch_ns)
+            run_configs.append({**base, "configurable": configurable})
+        return run_configs
+
+    async def abatch(
+        self,
+        inputs: Sequence[Optional[Dict[str, Any]]],
+        config: Optional[Union[Dict[str, Any], Sequence[Dict[str, Any]]]] = None,
+        *,
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """Invoke the graph once per input, at most ``max_concurrency`` at a time.
+
+        Results are returned in input order. ``config`` may be one config shared
+        by all runs or one config per input; either way each run gets its own
+        ``thread_id`` and ``checkpoint_ns``. With ``return_exceptions`` the
+        exception for a failed run is returned in its slot, otherwise the first
+        failure cancels the remaining runs and is raised.
+        """
+        inputs = list(inputs)
+        run_configs = self._batch_configs(len(inputs), config)
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+        async def run(index: int) -> Any:
+            if semaphore is None:
+                return await self._invoke_batch_run(inputs[index], run_configs[index])
+            async with semaphore:
+                return await self._invoke_batch_run(inputs[index], run_configs[index])
+
+        tasks = [asyncio.ensure_future(run(i)) for i in range(len(inputs))]
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def abatch_as_completed(
+        self,
+        inputs: Sequence[Optional[Dict[str, Any]]],
+        config: Optional[Union[Dict[str, Any], Sequence[Dict[str, Any]]]] = None,
+        *,
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = False,
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """Like ``abatch`` but yield ``(index, result)`` pairs as runs finish."""
+        inputs = list(inputs)
+        run_configs = self._batch_configs(len(inputs), config)
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+        async def run(index: int) -> Tuple[int, Any]:
+            try:
+                if semaphore is None:
+                    return index, await self._invoke_batch_run(inputs[index], run_configs[index])
+                async with semaphore:
+                    return index, await self._invoke_batch_run(inputs[index], run_configs[index])
+            except Exception as e:
+                if return_exceptions:
+                    return index, e
+                raise
+
+        tasks = [asyncio.ensure_future(run(i)) for i in range(len(inputs))]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
 
     def _initialize_state(self, initial_state: State) -> State:
@@ -853,8 +1213,19 @@ class CompiledGraph(Generic[State]):
         if not node:
             raise GraphExecutionError(f"Node '{node_name}' not found")
 
+        node_cache = self.graph.node_caches.get(node_name)
+        node_token = _active_node.set(node_name)
+        start_ts = time.time()
         try:
-            start_dt = datetime.now()
+            # Key construction runs user key functions and may pickle state
+            cache_key = node_cache.make_key(state) if node_cache is not None else None
+            if cache_key is not None:
+                cached = node_cache.get(cache_key)
+                if cached is not None:
+                    self._record_execution_metrics(node_name, start_ts, time.time(), True, metadata={"cache_hit": True})
+                    return cached
+
+            start_ts = time.time()
             # Call the node with proper parameters
             if hasattr(node, '__call__'):
                 if config is not None:
@@ -864,20 +1235,27 @@ class CompiledGraph(Generic[State]):
             else:
                 # Fallback for old-style nodes
                 result = await node(state)
-            end_dt = datetime.now()
+            end_ts = time.time()
             # record metrics
             try:
-                self._record_execution_metrics(node_name, start_dt, end_dt, True, metadata={})
+                self._record_execution_metrics(
+                    node_name, start_ts, end_ts, True,
+                    metadata={"cache_hit": False} if cache_key is not None else None,
+                )
             except Exception:
                 pass
+            if cache_key is not None and isinstance(result, dict):
+                node_cache.put(cache_key, result)
             return result if isinstance(result, dict) else {"result": result}
         except Exception as e:
             logger.error(f"Node {node_name} execution failed: {e}")
             try:
-                self._record_execution_metrics(node_name, start_dt, datetime.now(), False, error=str(e))
+                self._record_execution_metrics(node_name, start_ts, time.time(), False, error=str(e))
             except Exception:
                 pass
             raise NodeExecutionError(f"Node '{node_name}' failed", node_name=node_name, original_error=e, state=state) from e
+        finally:
+            _active_node.reset(node_token)
 
     def _update_state(self, state: State, updates: Dict[str, Any]) -> None:
         """Update state with node results"""
@@ -952,56 +1330,69 @@ class CompiledGraph(Generic[State]):
         except Exception:
             pass
 
-    def _record_execution_metrics(self, node_name: str, start_time: datetime, end_time: datetime, success: bool, error: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> None:
+    def _record_execution_metrics(self, node_name: str, start_time: Union[float, datetime], end_time: Union[float, datetime], success: bool, error: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> None:
         if not self.graph.monitoring_enabled:
             return
         try:
-            execution_time = (end_time - start_time).total_seconds()
-            record = {
-                "node_name": node_name,
-                "start_time": start_time.isoformat(),
-                "end_time": end_time.isoformat(),
-                "execution_time": execution_time,
-                "success": success,
-                "error": error,
-                "metadata": metadata or {}
-            }
-            self.execution_history.append(record)
-            # Ring buffer: keep only last max_execution_history entries
-            if len(self.execution_history) > self.max_execution_history:
-                self.execution_history = self.execution_history[-self.max_execution_history:]
+            if isinstance(start_time, datetime):
+                start_time = start_time.timestamp()
+            if isinstance(end_time, datetime):
+                end_time = end_time.timestamp()
+            execution_time = end_time - start_time
+            self._history.append(ExecutionRecord(node_name, start_time, end_time, execution_time, success, error, metadata))
+            stats = self._node_stats.get(node_name)
+            if stats is None:
+                stats = self._node_stats[node_name] = NodeExecutionStats()
+            stats.record(execution_time, success)
+            if metadata and "cache_hit" in metadata:
+                stats.record_cache(metadata["cache_hit"])
         except Exception:
             pass  # Don't let monitoring break execution
 
     def get_execution_metrics(self) -> Dict[str, Any]:
-        """Get aggregated execution metrics"""
-        if not self.execution_history:
-            return {"total_executions": 0, "avg_execution_time": 0, "success_rate": 0, "node_stats": {}}
+        """Get aggregated execution metrics.
 
-        total = len(self.execution_history)
-        successful = sum(1 for h in self.execution_history if h["success"])
-        total_time = sum(h["execution_time"] for h in self.execution_history)
+        Aggregates are maintained incrementally since the graph was compiled (or
+        since ``reset_execution_metrics``), so this is O(nodes). Per-node stats
+        include p50/p95/p99 latencies from a log-bucketed histogram.
+        """
+        if not self._node_stats:
+            return {"total_executions": 0, "avg_execution_time": 0, "success_rate": 0, "node_stats": {}}
 
+        total = 0
+        errors = 0
+        total_time = 0.0
         node_stats = {}
-        for h in self.execution_history:
-            node = h["node_name"]
-            if node not in node_stats:
-                node_stats[node] = {"count": 0, "total_time": 0, "errors": 0}
-            node_stats[node]["count"] += 1
-            node_stats[node]["total_time"] += h["execution_time"]
-            if not h["success"]:
-                node_stats[node]["errors"] += 1
-
-        for node, stats in node_stats.items():
-            stats["avg_time"] = stats["total_time"] / stats["count"]
-            stats["error_rate"] = stats["errors"] / stats["count"]
+        for node, stats in self._node_stats.items():
+            total += stats.count
+            errors += stats.errors
+            total_time += stats.total_time
+            node_stats[node] = stats.to_dict()
 
-        return {
+        metrics = {
             "total_executions": total,
             "avg_execution_time": total_time / total,
-            "success_rate": successful / total,
+            "success_rate": (total - errors) / total,
             "node_stats": node_stats
         }
+        if self.graph.llm_router_cache is not None:
+            metrics["router_cache"] = self.graph.llm_router_cache.get_stats()
+        if self.graph.node_caches:
+            metrics["node_caches"] = self.get_node_cache_stats()
+        return metrics
+
+    def reset_execution_metrics(self) -> None:
+        self._history.clear()
+        self._node_stats.clear()
+
+    def get_node_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit-rate metrics for each memoized node."""
+        return {name: cache.get_stats() for name, cache in self.graph.node_caches.items()}
+
+    def get_router_cache_stats(self) -> Dict[str, Any]:
+        """Hit-rate metrics for the LLM router decision cache (empty when disabled)."""
+        cache = self.graph.llm_router_cache
+        return cache.get_stats() if cache is not None else {}
 
     async def _execute_parallel_group(self, group_name: str, state: Dict[str, Any]) -> None:
         nodes = self.graph.parallel_groups.get(group_name, [])
@@ -1016,31 +1407,52 @@ class CompiledGraph(Generic[State]):
         timeout = group_cfg.timeout
         error_strategy = group_cfg.error_strategy
         join_condition = group_cfg.join_condition
+        isolated = group_cfg.branch_isolation
 
-        # create tasks
+        # create tasks; isolated branches share one read-only view of the state
         loop = asyncio.get_event_loop()
         tasks: Dict[str, asyncio.Task] = {}
+        task_nodes: Dict[asyncio.Task, str] = {}
+        branch_views: Dict[str, BranchState] = {}
+        shared_view = MappingProxyType(state) if isolated else None
         for n in nodes:
-            tasks[n] = loop.create_task(self._execute_node(n, state))
+            if isolated:
+                branch_views[n] = BranchState(shared_view)
+                task = loop.create_task(self._execute_node(n, branch_views[n]))
+            else:
+                task = loop.create_task(self._execute_node(n, state))
+            tasks[n] = task
+            task_nodes[task] = n
 
         completed_nodes: List[str] = []
         updates_to_merge: List[Dict[str, Any]] = []
+        updates_by_node: Dict[str, Dict[str, Any]] = {}
         errors: List[Dict[str, Any]] = []
 
+        def merge_updates() -> None:
+            if isolated:
+                self._merge_branch_deltas(state, nodes, branch_views, updates_by_node, completed_nodes)
+            else:
+                for upd in updates_to_merge:
+                    self._update_state_with_reducers(state, upd)
+
         async def handle_done(done_set):
             for t in done_set:
-                # find node name by task
-                node_name = next((name for name, task in tasks.items() if task is t), None)
+                node_name = task_nodes.get(t)
                 try:
                     result = t.result()
+                    update: Optional[Dict[str, Any]] = None
                     if isinstance(result, Command):
                         if result.update:
-                            updates_to_merge.append(result.update)
+                            update = result.update
                     elif isinstance(result, dict):
-                        updates_to_merge.append(result)
+                        update = result
                     elif isinstance(result, RouterResult):
                         # RouterResult in parallel branch is unusual; ignore routing but record metadata
-                        updates_to_merge.append({"__router__": {"node": node_name, "next": result.next_node}})
+                        update = {"__router__": {"node": node_name, "next": result.next_node}}
+                    if update is not None:
+                        updates_to_merge.append(update)
+                        updates_by_node[node_name] = update
                     completed_nodes.append(node_name or "")
                 except Exception as e:
                     err_info = {"node": node_name, "error": str(e)}
@@ -1098,8 +1510,7 @@ class CompiledGraph(Generic[State]):
         except Exception:
             if error_strategy == "collect_errors":
                 # merge successful updates and attach errors into state
-                for upd in updates_to_merge:
-                    self._update_state_with_reducers(state, upd)
+                merge_updates()
                 self._update_state_with_reducers(state, {"__errors__": errors})
                 return
             raise
@@ -1119,8 +1530,7 @@ class CompiledGraph(Generic[State]):
                 pass
 
         # finally merge accumulated updates
-        for upd in updates_to_merge:
-            self._update_state_with_reducers(state, upd)
+        merge_updates()
         if errors:
             if error_strategy in {"ignore_errors", "collect_errors"}:
                 self._update_state_with_reducers(state, {"__errors__": errors})
@@ -1132,43 +1542,186 @@ class CompiledGraph(Generic[State]):
         self._maybe_cleanup_state(state)
 
 
-    async def stream(self, initial_state: Optional[Dict[str, Any]] = None, config: Optional[Dict[str, Any]] = None, stream_mode: str = "values"):
-        config = config or {}
-        state = self._initialize_state(initial_state)
+    def _merge_branch_deltas(
+        self,
+        state: Dict[str, Any],
+        nodes: List[str],
+        branch_views: Dict[str, BranchState],
+        updates_by_node: Dict[str, Dict[str, Any]],
+        completed_nodes: List[str],
+    ) -> None:
+        """Fold isolated branch deltas into ``state`` once, in group declaration order.
+
+        Only branches that completed are merged; the deltas of branches that
+        failed, timed out or were cancelled are discarded. Keys with a reducer
+        declared on the state schema are folded through that reducer and
+        written once; other keys use the engine's default merge.
+        """
+        completed = set(completed_nodes)
+        reduced: Dict[str, List[Any]] = {}
+        deleted: List[str] = []
+        for node_name in nodes:
+            if node_name not in completed:
+                continue
+            view = branch_views.get(node_name)
+            update = updates_by_node.get(node_name)
+            if view is None or (update is None and not view.writes and not view.deleted_keys):
+                continue
+            deleted.extend(view.deleted_keys)
+            delta = {**view.writes, **(update or {})}
+            for key, value in delta.items():
+                if key in self.declared_reducers:
+                    reduced.setdefault(key, []).append(value)
+                else:
+                    self._update_state_with_reducers(state, {key: value})
+        for key in deleted:
+            if key not in reduced:
+                state.pop(key, None)
+        for key, values in reduced.items():
+            reducer = self.declared_reducers[key]
+            if reducer is add_messages and all(isinstance(v, list) for v in values):
+                # add_messages applies items sequentially, so one call over the
+                # concatenated branch outputs avoids copying the history per branch
+                state[key] = add_messages(state.get(key), [item for v in values for item in v])
+                continue
+            current = state.get(key)
+            for value in values:
+                current = reducer(current, value)
+            state[key] = current
+
+    async def stream(
+        self,
+        initial_state: Optional[Dict[str, Any]] = None,
+        config: Optional[Dict[str, Any]] = None,
+        stream_mode: Union[str, Sequence[str]] = "values",
+        *,
+        max_buffer: int = 64,
+    ) -> AsyncIterator[Any]:
+        """Execute the graph, yielding events as it runs.
+
+        Modes:
+            ``values``: a copy of the full state after each step.
+            ``updates``: ``{node_name: delta}`` for each step (a parallel group
+            reports the keys it changed under the group name).
+            ``messages``: ``(chunk, {"node": node_name})`` for every chunk
+            streamed by ``LLMManager.chat_stream`` inside a node.
+
+        Passing a list of modes yields ``(mode, payload)`` tuples instead.
+        Events go through a queue of ``max_buffer`` items, so a slow consumer
+        pauses the graph rather than letting events pile up in memory.
+        """
+        multi = not isinstance(stream_mode, str)
+        modes = frozenset(stream_mode if multi else (stream_mode,))
+        unknown = modes - STREAM_MODES
+        if unknown:
+            raise ValueError(f"Unknown stream_mode(s): {', '.join(sorted(unknown))}")
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_buffer))
+
+        async def emit(mode: str, payload: Any) -> None:
+            if mode in modes or mode == "interrupt":
+                await queue.put((mode, payload) if multi else payload)
+
+        async def produce() -> None:
+            writer_token = None
+            if "messages" in modes:
+                async def forward_chunk(chunk: Any) -> None:
+                    await emit("messages", (chunk, {"node": _active_node.get()}))
+                writer_token = bind_stream_writer(forward_chunk)
+            try:
+                await self._run_stream(initial_state, config or {}, modes, emit)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await queue.put(_StreamFailure(e))
+                return
+            finally:
+                if writer_token is not None:
+                    reset_stream_writer(writer_token)
+            await queue.put(_STREAM_END)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is _STREAM_END:
+                    break
+                if isinstance(item, _StreamFailure):
+                    raise item.error
+                yield item
+        finally:
+            if not producer.done():
+                producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+
+    async def _run_stream(
+        self,
+        initial_state: Optional[Dict[str, Any]],
+        config: Dict[str, Any],
+        modes: frozenset,
+        emit: Callable[[str, Any], Any],
+    ) -> None:
+        state = CopyOnWriteState(self._initialize_state(initial_state))
         current_node = self.graph._entry_point
         iteration = 0
         max_iterations = int(config.get("max_iterations", 100) or 100)
-        while current_node and iteration < max_iterations:
-            iteration += 1
-            try:
-                # If current node is a parallel group entry, stream merged results after group finishes
-                if current_node in self.graph.node_to_group and current_node in self.graph.parallel_entry_nodes:
-                    await self._execute_parallel_group(self.graph.node_to_group[current_node], state)
-                    if stream_mode == "values":
-                        yield state.copy()
-                else:
-                    result = await self._execute_node(current_node, state)
-                    if isinstance(result, Command):
-                        if result.update:
-                            self._update_state_with_reducers(state, result.update)
-                            if stream_mode == "values":
-                                yield state.copy()
-                        if result.goto:
-                            current_node = result.goto
-                            continue
-                    elif isinstance(result, dict):
-                        self._update_state_with_reducers(state, result)
-                        if stream_mode == "values":
-                            yield state.copy()
-            except InterruptError as e:
-                yield {"type": "interrupt", "node": current_node, "interrupt_id": e.interrupt_id, "interrupt_data": e.interrupt_data, "state": state.copy()}
-                return
-            next_node = await self._determine_next_node(current_node, state)
-            if next_node == "END" or next_node is None:
-                if stream_mode == "values":
-                    yield state.copy()
-                break
-            current_node = next_node
+        want_values = "values" in modes
+        want_updates = "updates" in modes
+        values_pending = True  # nothing emitted yet
+
+        async def step_done(node_name: str, delta: Dict[str, Any]) -> None:
+            nonlocal values_pending
+            # Emitted payloads share value objects with the live state; a
+            # snapshot ends ownership so later reducers copy instead of
+            # mutating values the consumer already holds.
+            state.snapshot()
+            if want_updates:
+                await emit("updates", {node_name: delta})
+            if want_values:
+                await emit("values", state.copy())
+            values_pending = False
+
+        run_ctx = _RunContext(thread_id=str(uuid.uuid4()))
+        ctx_token = _run_context.set(run_ctx)
+        try:
+            while current_node and iteration < max_iterations:
+                run_ctx.iteration = iteration
+                iteration += 1
+                try:
+                    # If current node is a parallel group entry, stream merged results after group finishes
+                    if current_node in self.graph.node_to_group and current_node in self.graph.parallel_entry_nodes:
+                        group_name = self.graph.node_to_group[current_node]
+                        if want_updates:
+                            state.snapshot()
+                        await self._execute_parallel_group(group_name, state)
+                        delta = {}
+                        if want_updates:
+                            changed = state.snapshot().changed_keys
+                            delta = {key: state[key] for key in changed if key in state}
+                        await step_done(group_name, delta)
+                    else:
+                        result = await self._execute_node(current_node, state)
+                        if isinstance(result, Command):
+                            if result.update:
+                                self._update_state_with_reducers(state, result.update)
+                                await step_done(current_node, result.update)
+                            if result.goto:
+                                current_node = result.goto
+                                continue
+                        elif isinstance(result, dict):
+                            self._update_state_with_reducers(state, result)
+                            await step_done(current_node, result)
+                except InterruptError as e:
+                    await emit("interrupt", {"type": "interrupt", "node": current_node, "interrupt_id": e.interrupt_id, "interrupt_data": e.interrupt_data, "state": state.copy()})
+                    return
+                next_node = await self._determine_next_node(current_node, state)
+                if next_node in (END, "END") or next_node is None:
+                    if want_values and values_pending:
+                        await emit("values", state.copy())
+                    break
+                current_node = next_node
+        finally:
+            _run_context.reset(ctx_token)
 
     def _initialize_state(self, initial_state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         state: Dict[str, Any] = {}
@@ -1187,20 +1740,45 @@ class CompiledGraph(Generic[State]):
 
 
     def _update_state_with_reducers(self, state: Dict[str, Any], updates: Dict[str, Any]) -> None:
+        # Values created here and not yet captured by a snapshot are updated in
+        # place; anything a snapshot may reference is replaced, never mutated.
+        cow = isinstance(state, CopyOnWriteState)
         for key, value in updates.items():
             if key not in state:
                 state[key] = value
                 continue
+            current = state[key]
+            owned = cow and state.is_owned(key)
             # merge dicts deeply, else replace
-            if isinstance(state[key], dict) and isinstance(value, dict):
-                state[key] = merge_dicts(state[key], value)
+            if isinstance(current, dict) and isinstance(value, dict):
+                if owned:
+                    for sub_key, sub_value in value.items():
+                        existing = current.get(sub_key)
+                        if isinstance(existing, dict) and isinstance(sub_value, dict):
+                            current[sub_key] = merge_dicts(existing, sub_value)
+                        else:
+                            current[sub_key] = sub_value
+                    continue
+                merged = merge_dicts(current, value)
             elif key == "messages" and isinstance(value, list):
-                existing = state.get(key) or []
-                state[key] = add_messages(existing, value)
-            elif isinstance(state[key], list) and isinstance(value, list):
+                if owned and not any(_extract_remove_id(item) is not None for item in value):
+                    current.extend(value)
+                    continue
+                merged = add_messages(current or [], value)
+            elif isinstance(current, list) and isinstance(value, list):
                 # Cap list growth to avoid MemoryError
-                combined = state[key] + value
-                # keep only last 100 entries to bound memory
-                state[key] = combined[-100:]
+                if owned:
+                    current.extend(value)
+                    # keep only last 100 entries to bound memory
+                    del current[:-100]
+                    continue
+                merged = (current + value)[-100:]
             else:
                 state[key] = value
+                continue
+            if merged is current:
+                continue
+            if cow:
+                state.set_owned(key, merged)
+            else:
+                state[key] = merged
@@ -0,0 +1,156 @@
+"""
+Streaming execution metrics for the graph engine.
+"""
+import math
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with bounded relative error.
+
+    Values are placed in geometric buckets (``growth`` apart) between
+    ``min_value`` and ``max_value`` seconds, so recording is O(1) and
+    percentile queries are O(buckets) with at most ``(growth - 1) / 2``
+    relative error.
+    """
+
+    __slots__ = ("min_value", "max_value", "growth", "_log_growth", "_counts", "count", "min", "max")
+
+    def __init__(self, min_value: float = 1e-6, max_value: float = 3600.0, growth: float = 1.1):
+        self.min_value = min_value
+        self.max_value = max_value
+        self.growth = growth
+        self._log_growth = math.log(growth)
+        size = int(math.ceil(math.log(max_value / min_value) / self._log_growth)) + 2
+        self._counts: List[int] = [0] * size
+        self.count = 0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        if value >= self.max_value:
+            return len(self._counts) - 1
+        return int(math.log(value / self.min_value) / self._log_growth) + 1
+
+    def record(self, value: float) -> None:
+        self._counts[self._index(value)] += 1
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, pct: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = max(1, int(math.ceil(pct / 100.0 * self.count)))
+        seen = 0
+        for index, bucket in enumerate(self._counts):
+            seen += bucket
+            if seen >= rank:
+                if index == 0:
+                    estimate = self.min_value
+                else:
+                    # geometric midpoint of the bucket
+                    estimate = self.min_value * self.growth ** (index - 0.5)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+
+class NodeExecutionStats:
+    """Incrementally updated counters and latency histogram for one node."""
+
+    __slots__ = ("count", "errors", "total_time", "histogram", "cache_hits", "cache_misses")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.histogram = LatencyHistogram()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def record(self, execution_time: float, success: bool) -> None:
+        self.count += 1
+        self.total_time += execution_time
+        if not success:
+            self.errors += 1
+        self.histogram.record(execution_time)
+
+    def record_cache(self, hit: bool) -> None:
+        if hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        count = self.count or 1
+        return {
+            "count": self.count,
+            "total_time": self.total_time,
+            "errors": self.errors,
+            "avg_time": self.total_time / count,
+            "error_rate": self.errors / count,
+            "p50": self.histogram.percentile(50),
+            "p95": self.histogram.percentile(95),
+            "p99": self.histogram.percentile(99),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+
+class ExecutionRecord:
+    """Raw node execution record kept in the history ring buffer."""
+
+    __slots__ = ("node_name", "start_time", "end_time", "execution_time", "success", "error", "metadata")
+
+    def __init__(
+        self,
+        node_name: str,
+        start_time: float,
+        end_time: float,
+        execution_time: float,
+        success: bool,
+        error: Optional[str],
+        metadata: Optional[Dict[str, Any]],
+    ):
+        self.node_name = node_name
+        self.start_time = start_time
+        self.end_time = end_time
+        self.execution_time = execution_time
+        self.success = success
+        self.error = error
+        self.metadata = metadata
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "node_name": self.node_name,
+            "start_time": datetime.fromtimestamp(self.start_time).isoformat(),
+            "end_time": datetime.fromtimestamp(self.end_time).isoformat(),
+            "execution_time": self.execution_time,
+            "success": self.success,
+            "error": self.error,
+            "metadata": self.metadata or {},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ExecutionRecord":
+        def _ts(value: Any) -> float:
+            if isinstance(value, datetime):
+                return value.timestamp()
+            if isinstance(value, str):
+                return datetime.fromisoformat(value).timestamp()
+            return float(value or 0.0)
+
+        return cls(
+            data.get("node_name", ""),
+            _ts(data.get("start_time")),
+            _ts(data.get("end_time")),
+            float(data.get("execution_time", 0.0)),
+            bool(data.get("success", False)),
+            data.get("error"),
+            data.get("metadata"),
+        )
@@ -0,0 +1,264 @@
+"""
+Copy-on-write state containers for the graph engine.
+
+``CopyOnWriteState`` is the mutable dict handed to nodes during execution. It
+tracks which keys changed since the last snapshot so ``snapshot()`` can build
+an immutable ``FrozenState`` in O(changed keys). Snapshots share value objects
+with the live state and with each other; the engine reducers never mutate a
+value in place once it has been captured by a snapshot. ``BranchState`` gives
+each branch of an isolated parallel group a private write delta over a shared
+read-only base.
+"""
+import weakref
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, Iterator, Optional, Set
+
+_MISSING = object()
+
+# Snapshots are stored as layers of changes over their parent. Once a chain gets
+# this deep it is flattened so lookups stay cheap and old layers can be freed.
+MAX_LAYER_DEPTH = 16
+
+
+class FrozenState(Mapping):
+    """Immutable, structurally shared view of graph state at a checkpoint."""
+
+    __slots__ = ("_layer", "_parent", "_depth", "_changed", "_previous", "__weakref__")
+
+    def __init__(self, values: Optional[Mapping] = None):
+        self._layer: Dict[str, Any] = dict(values or {})
+        self._parent: Optional["FrozenState"] = None
+        self._depth = 0
+        self._changed = frozenset(self._layer)
+        self._previous = None
+
+    @classmethod
+    def derive(cls, parent: Optional["FrozenState"], changes: Dict[str, Any]) -> "FrozenState":
+        """Build a snapshot from ``parent`` plus ``changes``.
+
+        Deleted keys are passed as the module-level ``_MISSING`` sentinel.
+        """
+        frozen = cls.__new__(cls)
+        frozen._changed = frozenset(changes)
+        frozen._previous = weakref.ref(parent) if parent is not None else None
+        if parent is None:
+            frozen._layer = {k: v for k, v in changes.items() if v is not _MISSING}
+            frozen._parent = None
+            frozen._depth = 0
+        elif parent._depth + 1 >= MAX_LAYER_DEPTH:
+            layer = parent._flat()
+            for key, value in changes.items():
+                if value is _MISSING:
+                    layer.pop(key, None)
+                else:
+                    layer[key] = value
+            frozen._layer = layer
+            frozen._parent = None
+            frozen._depth = 0
+        else:
+            frozen._layer = dict(changes)
+            frozen._parent = parent
+            frozen._depth = parent._depth + 1
+        return frozen
+
+    @property
+    def previous(self) -> Optional["FrozenState"]:
+        """Snapshot this one was derived from, if it is still alive."""
+        return self._previous() if self._previous is not None else None
+
+    @property
+    def changed_keys(self) -> frozenset:
+        """Keys set or deleted relative to ``previous``."""
+        return self._changed
+
+    def _flat(self) -> Dict[str, Any]:
+        layers = []
+        node: Optional[FrozenState] = self
+        while node is not None:
+            layers.append(node._layer)
+            node = node._parent
+        flat: Dict[str, Any] = {}
+        for layer in reversed(layers):
+            for key, value in layer.items():
+                if value is _MISSING:
+                    flat.pop(key, None)
+                else:
+                    flat[key] = value
+        return flat
+
+    def _compact(self) -> None:
+        if self._parent is not None:
+            self._layer = self._flat()
+            self._parent = None
+            self._depth = 0
+
+    def __getitem__(self, key: str) -> Any:
+        node: Optional[FrozenState] = self
+        while node is not None:
+            value = node._layer.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            if key in node._layer:
+                break
+            node = node._parent
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        self._compact()
+        return iter(self._layer)
+
+    def __len__(self) -> int:
+        self._compact()
+        return len(self._layer)
+
+    def copy(self) -> Dict[str, Any]:
+        """Return a plain, mutable shallow copy."""
+        self._compact()
+        return dict(self._layer)
+
+    def __reduce__(self):
+        return (FrozenState, (self.copy(),))
+
+    def __repr__(self) -> str:
+        return f"FrozenState({self.copy()!r})"
+
+
+class CopyOnWriteState(dict):
+    """Mutable graph state that records changed keys between snapshots.
+
+    Keys whose value object was created by the engine since the last snapshot
+    are "owned": the reducers may update those values in place because no
+    snapshot references them yet.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._dirty: Set[str] = set(self.keys())
+        self._owned: Set[str] = set()
+        self._last: Optional[FrozenState] = None
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        super().__setitem__(key, value)
+        self._dirty.add(key)
+        self._owned.discard(key)
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self._dirty.add(key)
+        self._owned.discard(key)
+
+    def pop(self, key: str, *default: Any) -> Any:
+        if key in self:
+            self._dirty.add(key)
+            self._owned.discard(key)
+        return super().pop(key, *default)
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._dirty.add(key)
+        self._owned.discard(key)
+        return key, value
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __ior__(self, other: Any) -> "CopyOnWriteState":
+        self.update(other)
+        return self
+
+    def clear(self) -> None:
+        self._dirty.update(self.keys())
+        self._owned.clear()
+        super().clear()
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __reduce__(self):
+        return (CopyOnWriteState, (dict(self),))
+
+    def set_owned(self, key: str, value: Any) -> None:
+        """Store a value object freshly created by the engine."""
+        self[key] = value
+        self._owned.add(key)
+
+    def is_owned(self, key: str) -> bool:
+        return key in self._owned
+
+    def snapshot(self) -> FrozenState:
+        """Freeze the current state in O(changed keys)."""
+        if self._last is not None and not self._dirty:
+            return self._last
+        changes = {key: dict.get(self, key, _MISSING) for key in self._dirty}
+        self._last = FrozenState.derive(self._last, changes)
+        self._dirty.clear()
+        self._owned.clear()
+        return self._last
+
+
+class BranchState(MutableMapping):
+    """State view handed to one branch of an isolated parallel group.
+
+    Reads fall through to a shared read-only base; writes and deletions are
+    recorded in a private delta that the engine merges after the group joins.
+    Values read from the base are shared, so branches must not mutate them in
+    place.
+    """
+
+    __slots__ = ("_base", "_delta")
+
+    def __init__(self, base: Mapping):
+        self._base = base
+        self._delta: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._delta.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if key in self._delta:
+            raise KeyError(key)
+        return self._base[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._delta[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self._delta[key] = _MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self._base:
+            if self._delta.get(key, None) is not _MISSING:
+                yield key
+        for key, value in self._delta.items():
+            if value is not _MISSING and key not in self._base:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self)
+
+    @property
+    def writes(self) -> Dict[str, Any]:
+        """Keys this branch assigned directly on the view."""
+        return {key: value for key, value in self._delta.items() if value is not _MISSING}
+
+    @property
+    def deleted_keys(self) -> Set[str]:
+        return {key for key, value in self._delta.items() if value is _MISSING}
@@ -47,12 +47,30 @@ from .errors import (
 
 from .manager import (
     LLMManager,
+    CircuitBreaker,
+    CircuitState,
     FallbackStrategy,
+    HedgingPolicy,
+    HedgingStrategy,
     LoadBalancer,
+    ProviderLoadStats,
     get_llm_manager,
     set_llm_manager
 )
 
+from .rate_limiter import (
+    ProviderRateLimiter,
+    TokenBucket,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_BATCH
+)
+
+from .token_counter import (
+    TokenCounter,
+    get_token_counter,
+    set_token_counter
+)
+
 from .response_normalizer import (
     ResponseNormalizer,
     get_response_normalizer
@@ -106,11 +124,27 @@ __all__ = [
     
     # Manager and orchestration
     'LLMManager',
+    'CircuitBreaker',
+    'CircuitState',
     'FallbackStrategy',
+    'HedgingPolicy',
+    'HedgingStrategy',
     'LoadBalancer',
+    'ProviderLoadStats',
     'get_llm_manager',
     'set_llm_manager',
     
+    # Admission control
+    'ProviderRateLimiter',
+    'TokenBucket',
+    'PRIORITY_INTERACTIVE',
+    'PRIORITY_BATCH',
+    
+    # Token counting
+    'TokenCounter',
+    'get_token_counter',
+    'set_token_counter',
+    
     # Response normalization
     'ResponseNormalizer',
     'get_response_normalizer',
@@ -2,18 +2,51 @@
 Caching system for LLM responses to improve performance.
 """
 
+import asyncio
+import copy
 import hashlib
+import heapq
 import json
+import sqlite3
+import threading
 import time
-from typing import Dict, Any, Optional, List
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Any, Optional, List, Tuple, Union
 from dataclasses import dataclass, field
 from logging import getLogger
 
 from .interface import LLMResponse
-from spoon_ai.schema import Message
+from spoon_ai.schema import Message, ToolCall
+from .semantic_cache import SemanticResponseCache
 
 logger = getLogger(__name__)
 
+# Fixed per-entry bookkeeping cost (key, entry object, heap slot) used in size estimates.
+ENTRY_OVERHEAD_BYTES = 256
+
+
+def estimate_response_size(response: LLMResponse) -> int:
+    """Estimate the memory footprint of a cached response in bytes.
+
+    Text is counted by UTF-8 length; tool calls and metadata by the length of
+    their JSON form. This is an estimate for budgeting, not an exact measure.
+    """
+    size = ENTRY_OVERHEAD_BYTES + len((response.content or "").encode("utf-8"))
+    for tool_call in response.tool_calls or []:
+        try:
+            size += len(tool_call.model_dump_json())
+        except AttributeError:
+            size += len(str(tool_call))
+    if response.metadata:
+        size += len(json.dumps(response.metadata, default=str))
+    if response.usage:
+        size += 16 * len(response.usage)
+    return size
+
 
 @dataclass
 class CacheEntry:
@@ -22,6 +55,8 @@ class CacheEntry:
     timestamp: float
     access_count: int = 0
     last_accessed: float = field(default_factory=time.time)
+    size: int = 0
+    expires_at: Optional[float] = None
     
     def is_expired(self, ttl: float) -> bool:
         """Check if cache entry is expired.
@@ -40,104 +75,227 @@ class CacheEntry:
         self.last_accessed = time.time()
 
 
-class LLMResponseCache:
-    """Cache for LLM responses with TTL and size limits."""
+# id(value) -> (value, snapshot, digest) for container-valued request parameters
+_PARAM_DIGESTS: "OrderedDict[int, Tuple[Any, Any, str]]" = OrderedDict()
+_PARAM_DIGESTS_MAX = 64
+_param_digests_lock = threading.Lock()
+
+
+def _param_digest(value: Any) -> str:
+    """Digest of a list or dict request parameter such as a tools schema.
+
+    The digest is memoized per object and reused while the object still
+    equals a snapshot taken when it was hashed. Comparing against the snapshot
+    is far cheaper than re-serializing, so callers that pass the same tools
+    list on every request pay for ``json.dumps`` only once.
+    """
+    with _param_digests_lock:
+        entry = _PARAM_DIGESTS.get(id(value))
+        if entry is not None and entry[0] is value and entry[1] == value:
+            _PARAM_DIGESTS.move_to_end(id(value))
+            return entry[2]
+    payload = json.dumps(value, sort_keys=True).encode()
+    digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+    with _param_digests_lock:
+        _PARAM_DIGESTS[id(value)] = (value, copy.deepcopy(value), digest)
+        _PARAM_DIGESTS.move_to_end(id(value))
+        while len(_PARAM_DIGESTS) > _PARAM_DIGESTS_MAX:
+            _PARAM_DIGESTS.popitem(last=False)
+    return digest
+
+
+class LLMCacheBackend(ABC):
+    """Interface for response cache backends used by ``CachedLLMManager``."""
+
+    def make_key(self, messages: List[Message], provider: str, **kwargs) -> str:
+        """Generate cache key from request parameters.
+        
+        The key combines the per-message digests memoized on each ``Message``
+        with a hash of the provider and parameters, so the cost of keying a
+        request grows with its new messages rather than the whole history.
+        List and dict parameters (e.g. ``tools``) are hashed through
+        ``_param_digest`` so an unchanged schema is not re-serialized.
+        
+        Args:
+            messages: List of messages
+            provider: Provider name
+            **kwargs: Additional parameters
+            
+        Returns:
+            str: Cache key
+        """
+        params = {}
+        digests = {}
+        for k, v in kwargs.items():
+            if k in ('request_id', 'timestamp', 'priority'):
+                continue
+            if isinstance(v, (list, dict)):
+                digests[k] = _param_digest(v)
+            else:
+                params[k] = v
+        header = json.dumps({'provider': provider, 'params': params, 'digests': digests}, sort_keys=True)
+        key_hash = hashlib.sha256(header.encode())
+        key_hash.update(b"".join(msg.digest() for msg in messages))
+        return key_hash.hexdigest()
+
+    # Kept for callers of the old private name
+    _generate_key = make_key
+
+    @abstractmethod
+    def get_by_key(self, key: str, ttl: Optional[float] = None) -> Optional[LLMResponse]:
+        """Return a cached, unexpired response for a key from ``make_key`` or None."""
+
+    @abstractmethod
+    def put_by_key(self, key: str, response: LLMResponse, ttl: Optional[float] = None) -> None:
+        """Store a response under a key from ``make_key``."""
+
+    def get(self, messages: List[Message], provider: str, ttl: Optional[float] = None, **kwargs) -> Optional[LLMResponse]:
+        """Get cached response if available and not expired.
+        
+        Args:
+            messages: List of messages
+            provider: Provider name
+            ttl: Time to live override
+            **kwargs: Additional parameters
+            
+        Returns:
+            Optional[LLMResponse]: Cached response if available
+        """
+        return self.get_by_key(self.make_key(messages, provider, **kwargs), ttl=ttl)
+
+    def put(self, messages: List[Message], provider: str, response: LLMResponse, ttl: Optional[float] = None, **kwargs) -> None:
+        """Store response in cache.
+        
+        Args:
+            messages: List of messages
+            provider: Provider name
+            response: Response to cache
+            ttl: Time to live override for this entry
+            **kwargs: Additional parameters
+        """
+        self.put_by_key(self.make_key(messages, provider, **kwargs), response, ttl=ttl)
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries."""
+
+    @abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction statistics."""
+
+    @abstractmethod
+    def cleanup_expired(self) -> int:
+        """Remove expired entries and return how many were removed."""
+
+
+class LLMResponseCache(LLMCacheBackend):
+    """Cache for LLM responses with TTL, entry-count and byte limits.
+
+    Entries are kept in an ``OrderedDict`` in LRU order, so get, put and
+    eviction are O(1). Expiry times are tracked in a min-heap so
+    ``cleanup_expired`` only touches entries that have actually expired.
+    """
     
-    def __init__(self, max_size: int = 1000, default_ttl: float = 3600):
+    def __init__(self, max_size: int = 1000, default_ttl: float = 3600, max_bytes: Optional[int] = None):
         """Initialize cache.
         
         Args:
             max_size: Maximum number of entries
             default_ttl: Default time to live in seconds
+            max_bytes: Maximum estimated size of all cached responses (optional)
         """
         self.max_size = max_size
         self.default_ttl = default_ttl
-        self._cache: Dict[str, CacheEntry] = {}
+        self.max_bytes = max_bytes
+        self._cache: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._bytes = 0
         self._stats = {
             'hits': 0,
             'misses': 0,
             'evictions': 0,
+            'expirations': 0,
+            'rejected': 0,
             'size': 0
         }
     
-    def _generate_key(self, messages: List[Message], provider: str, **kwargs) -> str:
-        """Generate cache key from request parameters.
-        
-        Args:
-            messages: List of messages
-            provider: Provider name
-            **kwargs: Additional parameters
-            
-        Returns:
-            str: Cache key
-        """
-        # Create a deterministic representation of the request
-        cache_data = {
-            'messages': [{'role': msg.role, 'content': msg.content} for msg in messages],
-            'provider': provider,
-            'params': {k: v for k, v in sorted(kwargs.items()) if k not in ['request_id', 'timestamp']}
-        }
-        
-        # Generate hash
-        cache_str = json.dumps(cache_data, sort_keys=True)
-        return hashlib.sha256(cache_str.encode()).hexdigest()
+    def _remove(self, key: str) -> Optional[CacheEntry]:
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+            self._stats['size'] = len(self._cache)
+        return entry
     
-    def get(self, messages: List[Message], provider: str, ttl: Optional[float] = None, **kwargs) -> Optional[LLMResponse]:
-        """Get cached response if available and not expired.
+    def get_by_key(self, key: str, ttl: Optional[float] = None) -> Optional[LLMResponse]:
+        """Get cached response for a key if available and not expired.
         
         Args:
-            messages: List of messages
-            provider: Provider name
+            key: Key from ``make_key``
             ttl: Time to live override
-            **kwargs: Additional parameters
             
         Returns:
             Optional[LLMResponse]: Cached response if available
         """
-        key = self._generate_key(messages, provider, **kwargs)
         entry = self._cache.get(key)
         
         if entry is None:
             self._stats['misses'] += 1
             return None
         
-        # Check if expired
-        ttl = ttl or self.default_ttl
-        if entry.is_expired(ttl):
-            del self._cache[key]
+        # A ttl override is measured from creation; otherwise the expiry set
+        # by put applies
+        if ttl:
+            expired = entry.is_expired(ttl)
+        elif entry.expires_at is not None:
+            expired = time.time() >= entry.expires_at
+        else:
+            expired = entry.is_expired(self.default_ttl)
+        if expired:
+            self._remove(key)
+            self._stats['expirations'] += 1
             self._stats['misses'] += 1
-            self._stats['size'] = len(self._cache)
             return None
         
         # Update access info and return
         entry.touch()
+        self._cache.move_to_end(key)
         self._stats['hits'] += 1
         
         logger.debug(f"Cache hit for key: {key[:16]}...")
         return entry.response
     
-    def put(self, messages: List[Message], provider: str, response: LLMResponse, **kwargs) -> None:
+    def put_by_key(self, key: str, response: LLMResponse, ttl: Optional[float] = None) -> None:
         """Store response in cache.
         
         Args:
-            messages: List of messages
-            provider: Provider name
+            key: Key from ``make_key``
             response: Response to cache
-            **kwargs: Additional parameters
+            ttl: Time to live override for this entry
         """
-        key = self._generate_key(messages, provider, **kwargs)
-        
-        # Check if we need to evict entries
-        if len(self._cache) >= self.max_size:
-            self._evict_lru()
+        size = estimate_response_size(response)
+        if self.max_bytes is not None and size > self.max_bytes:
+            self._stats['rejected'] += 1
+            logger.debug(f"Response for key {key[:16]}... exceeds cache byte budget ({size} bytes)")
+            return
         
-        # Store entry
+        self._remove(key)
+        now = time.time()
         entry = CacheEntry(
             response=response,
-            timestamp=time.time()
+            timestamp=now,
+            size=size,
+            expires_at=now + (ttl or self.default_ttl)
         )
         self._cache[key] = entry
+        self._bytes += size
+        heapq.heappush(self._expiry_heap, (entry.expires_at, key))
+        
+        # Evict by count and by bytes, least recently used first
+        while len(self._cache) > self.max_size or (self.max_bytes is not None and self._bytes > self.max_bytes):
+            self._evict_lru()
         self._stats['size'] = len(self._cache)
+        if len(self._expiry_heap) > 2 * len(self._cache) + 64:
+            self._rebuild_expiry_heap()
         
         logger.debug(f"Cached response for key: {key[:16]}...")
     
@@ -146,16 +304,22 @@ class LLMResponseCache:
         if not self._cache:
             return
         
-        # Find LRU entry
-        lru_key = min(self._cache.keys(), key=lambda k: self._cache[k].last_accessed)
-        del self._cache[lru_key]
+        lru_key, entry = self._cache.popitem(last=False)
+        self._bytes -= entry.size
         self._stats['evictions'] += 1
         
         logger.debug(f"Evicted LRU entry: {lru_key[:16]}...")
     
+    def _rebuild_expiry_heap(self) -> None:
+        """Drop heap items for entries that were replaced, evicted or removed."""
+        self._expiry_heap = [(entry.expires_at, key) for key, entry in self._cache.items()]
+        heapq.heapify(self._expiry_heap)
+    
     def clear(self) -> None:
         """Clear all cache entries."""
         self._cache.clear()
+        self._expiry_heap.clear()
+        self._bytes = 0
         self._stats['size'] = 0
         logger.info("Cache cleared")
     
@@ -172,8 +336,12 @@ class LLMResponseCache:
             'hits': self._stats['hits'],
             'misses': self._stats['misses'],
             'evictions': self._stats['evictions'],
+            'expirations': self._stats['expirations'],
+            'rejected': self._stats['rejected'],
             'size': self._stats['size'],
             'max_size': self.max_size,
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
             'hit_rate': hit_rate,
             'total_requests': total_requests
         }
@@ -184,29 +352,279 @@ class LLMResponseCache:
         Returns:
             int: Number of entries removed
         """
-        expired_keys = []
+        removed = 0
         current_time = time.time()
+        heap = self._expiry_heap
         
-        for key, entry in self._cache.items():
-            if current_time - entry.timestamp > self.default_ttl:
-                expired_keys.append(key)
+        while heap and heap[0][0] <= current_time:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._cache.get(key)
+            # Skip stale heap items for entries replaced or evicted since
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                removed += 1
         
-        for key in expired_keys:
-            del self._cache[key]
+        self._stats['expirations'] += removed
         
-        self._stats['size'] = len(self._cache)
+        if removed:
+            logger.info(f"Cleaned up {removed} expired cache entries")
         
-        if expired_keys:
-            logger.info(f"Cleaned up {len(expired_keys)} expired cache entries")
+        return removed
+
+
+# Payloads at least this large are zlib-compressed before being stored on disk.
+COMPRESS_THRESHOLD_BYTES = 512
+
+
+def serialize_response(response: LLMResponse) -> bytes:
+    """Encode a response as compact JSON, zlib-compressed when large.
+
+    The first byte flags the encoding: ``b"j"`` for plain JSON, ``b"z"`` for
+    compressed JSON.
+    """
+    data = {
+        'c': response.content,
+        'p': response.provider,
+        'm': response.model,
+        'f': response.finish_reason,
+        'n': response.native_finish_reason,
+        't': [tool_call.model_dump() for tool_call in response.tool_calls or []],
+        'u': response.usage,
+        'md': response.metadata,
+        'r': response.request_id,
+        'd': response.duration,
+        'ts': response.timestamp.isoformat() if response.timestamp else None,
+    }
+    payload = json.dumps(data, separators=(',', ':'), default=str).encode('utf-8')
+    if len(payload) >= COMPRESS_THRESHOLD_BYTES:
+        return b'z' + zlib.compress(payload)
+    return b'j' + payload
+
+
+def deserialize_response(blob: bytes) -> LLMResponse:
+    """Decode a payload produced by ``serialize_response``."""
+    flag, payload = blob[:1], blob[1:]
+    if flag == b'z':
+        payload = zlib.decompress(payload)
+    data = json.loads(payload)
+    return LLMResponse(
+        content=data['c'],
+        provider=data['p'],
+        model=data['m'],
+        finish_reason=data['f'],
+        native_finish_reason=data['n'],
+        tool_calls=[ToolCall.model_validate(tool_call) for tool_call in data.get('t') or []],
+        usage=data.get('u'),
+        metadata=data.get('md') or {},
+        request_id=data.get('r', ''),
+        duration=data.get('d', 0.0),
+        timestamp=datetime.fromisoformat(data['ts']) if data.get('ts') else datetime.now(),
+    )
+
+
+class SQLiteResponseCache(LLMCacheBackend):
+    """On-disk response cache that worker processes on one host can share.
+
+    Uses SQLite in WAL mode with a busy timeout, so concurrent readers and
+    writers in different processes are safe and entries survive restarts.
+    Count and byte limits are enforced on write by evicting least recently
+    accessed rows. Hit/miss counters are per process; ``size`` and ``bytes``
+    reflect the shared store.
+    """
+
+    _SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY,
+            payload BLOB NOT NULL,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            last_accessed REAL NOT NULL,
+            size INTEGER NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS llm_cache_last_accessed ON llm_cache (last_accessed)",
+        "CREATE INDEX IF NOT EXISTS llm_cache_expires_at ON llm_cache (expires_at)",
+        # Running entry and byte totals, kept exact across processes by triggers
+        # so enforcing limits never scans the table
+        """
+        CREATE TABLE IF NOT EXISTS llm_cache_totals (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            entries INTEGER NOT NULL,
+            bytes INTEGER NOT NULL
+        )
+        """,
+        "INSERT OR IGNORE INTO llm_cache_totals (id, entries, bytes) "
+        "SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache",
+        """
+        CREATE TRIGGER IF NOT EXISTS llm_cache_totals_insert AFTER INSERT ON llm_cache BEGIN
+            UPDATE llm_cache_totals SET entries = entries + 1, bytes = bytes + NEW.size WHERE id = 0;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS llm_cache_totals_delete AFTER DELETE ON llm_cache BEGIN
+            UPDATE llm_cache_totals SET entries = entries - 1, bytes = bytes - OLD.size WHERE id = 0;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS llm_cache_totals_update AFTER UPDATE OF size ON llm_cache BEGIN
+            UPDATE llm_cache_totals SET bytes = bytes - OLD.size + NEW.size WHERE id = 0;
+        END
+        """,
+    )
+
+    def __init__(
+        self,
+        path: Union[str, Path] = ".spoon_cache/llm_responses.db",
+        max_size: int = 10000,
+        default_ttl: float = 3600,
+        max_bytes: Optional[int] = None,
+        timeout: float = 30.0,
+    ):
+        """Initialize cache.
         
-        return len(expired_keys)
+        Args:
+            path: SQLite database file shared by all processes using the cache
+            max_size: Maximum number of entries
+            default_ttl: Default time to live in seconds
+            max_bytes: Maximum total size of stored payloads (optional)
+            timeout: Seconds to wait for a lock held by another process
+        """
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            for statement in self._SCHEMA:
+                self._conn.execute(statement)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'rejected': 0,
+        }
+
+    def get_by_key(self, key: str, ttl: Optional[float] = None) -> Optional[LLMResponse]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats['misses'] += 1
+                return None
+            payload, created_at, expires_at = row
+            # A ttl override is measured from creation, as in LLMResponseCache
+            expired = now - created_at > ttl if ttl else now >= expires_at
+            if expired:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_accessed = ? WHERE key = ?", (now, key))
+            self._stats['hits'] += 1
+        logger.debug(f"Cache hit for key: {key[:16]}...")
+        return deserialize_response(payload)
+
+    def put_by_key(self, key: str, response: LLMResponse, ttl: Optional[float] = None) -> None:
+        payload = serialize_response(response)
+        size = len(payload)
+        if self.max_bytes is not None and size > self.max_bytes:
+            self._stats['rejected'] += 1
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # An upsert (not INSERT OR REPLACE) so the totals triggers see replacements
+                self._conn.execute(
+                    "INSERT INTO llm_cache (key, payload, created_at, expires_at, last_accessed, size) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET payload = excluded.payload, created_at = excluded.created_at, "
+                    "expires_at = excluded.expires_at, last_accessed = excluded.last_accessed, size = excluded.size",
+                    (key, payload, now, now + (ttl or self.default_ttl), now, size),
+                )
+                self._enforce_limits()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        logger.debug(f"Cached response for key: {key[:16]}...")
+
+    def _totals(self) -> Tuple[int, int]:
+        return self._conn.execute("SELECT entries, bytes FROM llm_cache_totals WHERE id = 0").fetchone()
+
+    def _enforce_limits(self) -> None:
+        count, total_bytes = self._totals()
+        overflow = count - self.max_size
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_accessed LIMIT ?)",
+                (overflow,),
+            )
+            self._stats['evictions'] += overflow
+            total_bytes = self._totals()[1]
+        if self.max_bytes is None or total_bytes <= self.max_bytes:
+            return
+        excess = total_bytes - self.max_bytes
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_accessed"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", victims)
+        self._stats['evictions'] += len(victims)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+        logger.info("Cache cleared")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size, total_bytes = self._totals()
+        total_requests = self._stats['hits'] + self._stats['misses']
+        return {
+            **self._stats,
+            'size': size,
+            'max_size': self.max_size,
+            'bytes': total_bytes,
+            'max_bytes': self.max_bytes,
+            'hit_rate': self._stats['hits'] / total_requests if total_requests > 0 else 0,
+            'total_requests': total_requests
+        }
+
+    def cleanup_expired(self) -> int:
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+        self._stats['expirations'] += removed
+        if removed:
+            logger.info(f"Cleaned up {removed} expired cache entries")
+        return removed
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
 
 
 # Global cache instance
 _global_cache: Optional[LLMResponseCache] = None
 
 
-def get_global_cache() -> LLMResponseCache:
+def get_global_cache() -> LLMCacheBackend:
     """Get global cache instance.
     
     Returns:
@@ -218,7 +636,7 @@ def get_global_cache() -> LLMResponseCache:
     return _global_cache
 
 
-def set_global_cache(cache: LLMResponseCache) -> None:
+def set_global_cache(cache: LLMCacheBackend) -> None:
     """Set global cache instance.
     
     Args:
@@ -228,27 +646,97 @@ def set_global_cache(cache: LLMResponseCache) -> None:
     _global_cache = cache
 
 
+class _InFlightRequest:
+    """A provider call shared by every concurrent caller with the same cache key."""
+
+    __slots__ = ("task", "loop", "waiters")
+
+    def __init__(self, task: "asyncio.Task[LLMResponse]", loop: asyncio.AbstractEventLoop):
+        self.task = task
+        self.loop = loop
+        self.waiters = 0
+
+
 class CachedLLMManager:
-    """LLM Manager wrapper with caching support."""
+    """LLM Manager wrapper with caching support.
+
+    Concurrent cache misses for the same request are coalesced: the first
+    caller starts the provider call and later callers await the same result
+    instead of issuing duplicate requests.
+    """
     
-    def __init__(self, manager, cache: Optional[LLMResponseCache] = None):
+    def __init__(self, manager, cache: Optional[LLMCacheBackend] = None, semantic_cache: Optional[SemanticResponseCache] = None):
         """Initialize cached manager.
         
         Args:
             manager: LLM manager instance
-            cache: Cache instance (optional)
+            cache: Cache backend, e.g. ``LLMResponseCache`` or ``SQLiteResponseCache``
+                (defaults to the process-wide in-memory cache)
+            semantic_cache: Optional similarity tier consulted after an exact miss
+                for requests that pass an enabled ``semantic_namespace``
         """
         self.manager = manager
         self.cache = cache or get_global_cache()
+        self.semantic_cache = semantic_cache
         self.cache_enabled = True
+        self._in_flight: Dict[str, _InFlightRequest] = {}
+        self._coalesced = 0
     
-    async def chat(self, messages: List[Message], provider: Optional[str] = None, use_cache: bool = True, **kwargs) -> LLMResponse:
+    async def _single_flight(self, key: str, call: Callable[[], Awaitable[LLMResponse]], store: Callable[[LLMResponse], None]) -> LLMResponse:
+        """Run ``call`` once per key among concurrent callers.
+
+        The call runs in its own task so a cancelled caller does not cancel it
+        for the others; it is cancelled only when every caller has gone away.
+        Errors are propagated to all callers and are not cached.
+        """
+        loop = asyncio.get_running_loop()
+        flight = self._in_flight.get(key)
+        if flight is not None and flight.loop is loop and not flight.task.done():
+            self._coalesced += 1
+        else:
+            async def run() -> LLMResponse:
+                response = await call()
+                store(response)
+                return response
+
+            flight = _InFlightRequest(loop.create_task(run()), loop)
+            self._in_flight[key] = flight
+
+            def release(task: "asyncio.Task[LLMResponse]", key: str = key, flight: _InFlightRequest = flight) -> None:
+                if self._in_flight.get(key) is flight:
+                    del self._in_flight[key]
+                if not task.cancelled():
+                    task.exception()  # mark retrieved; callers already received it
+
+            flight.task.add_done_callback(release)
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+    
+    def _lookup(self, key: str, messages: List[Message], cache_provider: str, semantic_namespace: Optional[str], **key_kwargs) -> Optional[LLMResponse]:
+        cached_response = self.cache.get_by_key(key)
+        if cached_response is None and self.semantic_cache is not None and semantic_namespace:
+            cached_response = self.semantic_cache.get(messages, cache_provider, semantic_namespace, **key_kwargs)
+        return cached_response
+    
+    def _store(self, key: str, messages: List[Message], cache_provider: str, response: LLMResponse, semantic_namespace: Optional[str], **key_kwargs) -> None:
+        self.cache.put_by_key(key, response)
+        if self.semantic_cache is not None and semantic_namespace:
+            self.semantic_cache.put(messages, cache_provider, response, semantic_namespace, **key_kwargs)
+    
+    async def chat(self, messages: List[Message], provider: Optional[str] = None, use_cache: bool = True, semantic_namespace: Optional[str] = None, **kwargs) -> LLMResponse:
         """Chat with caching support.
         
         Args:
             messages: List of messages
             provider: Provider name
             use_cache: Whether to use cache
+            semantic_namespace: Namespace for the similarity tier (opt-in)
             **kwargs: Additional parameters
             
         Returns:
@@ -258,19 +746,20 @@ class CachedLLMManager:
             return await self.manager.chat(messages, provider=provider, **kwargs)
         
         # Try to get from cache
-        cached_response = self.cache.get(messages, provider or 'default', **kwargs)
+        cache_provider = provider or 'default'
+        key = self.cache.make_key(messages, cache_provider, **kwargs)
+        cached_response = self._lookup(key, messages, cache_provider, semantic_namespace, **kwargs)
         if cached_response is not None:
             return cached_response
         
-        # Get fresh response
-        response = await self.manager.chat(messages, provider=provider, **kwargs)
-        
-        # Cache the response
-        self.cache.put(messages, provider or 'default', response, **kwargs)
-        
-        return response
+        # Get a fresh response, shared with concurrent identical requests, and cache it
+        return await self._single_flight(
+            key,
+            lambda: self.manager.chat(messages, provider=provider, **kwargs),
+            lambda response: self._store(key, messages, cache_provider, response, semantic_namespace, **kwargs),
+        )
     
-    async def chat_with_tools(self, messages: List[Message], tools: List[Dict], provider: Optional[str] = None, use_cache: bool = True, **kwargs) -> LLMResponse:
+    async def chat_with_tools(self, messages: List[Message], tools: List[Dict], provider: Optional[str] = None, use_cache: bool = True, semantic_namespace: Optional[str] = None, **kwargs) -> LLMResponse:
         """Chat with tools and caching support.
         
         Args:
@@ -278,29 +767,31 @@ class CachedLLMManager:
             tools: List of tools
             provider: Provider name
             use_cache: Whether to use cache
+            semantic_namespace: Namespace for the similarity tier (opt-in)
             **kwargs: Additional parameters
             
         Returns:
             LLMResponse: Response (cached or fresh)
         """
-        # Include tools in cache key
-        kwargs['tools'] = tools
-        
         if not (self.cache_enabled and use_cache):
             return await self.manager.chat_with_tools(messages, tools, provider=provider, **kwargs)
         
+        # Include tools in cache key
+        cache_provider = provider or 'default'
+        key_kwargs = {**kwargs, 'tools': tools}
+        
         # Try to get from cache
-        cached_response = self.cache.get(messages, provider or 'default', **kwargs)
+        key = self.cache.make_key(messages, cache_provider, **key_kwargs)
+        cached_response = self._lookup(key, messages, cache_provider, semantic_namespace, **key_kwargs)
         if cached_response is not None:
             return cached_response
         
-        # Get fresh response
-        response = await self.manager.chat_with_tools(messages, tools, provider=provider, **kwargs)
-        
-        # Cache the response
-        self.cache.put(messages, provider or 'default', response, **kwargs)
-        
-        return response
+        # Get a fresh response, shared with concurrent identical requests, and cache it
+        return await self._single_flight(
+            key,
+            lambda: self.manager.chat_with_tools(messages, tools, provider=provider, **kwargs),
+            lambda response: self._store(key, messages, cache_provider, response, semantic_namespace, **key_kwargs),
+        )
     
     def enable_cache(self) -> None:
         """Enable caching."""
@@ -315,14 +806,23 @@ class CachedLLMManager:
     def clear_cache(self) -> None:
         """Clear cache."""
         self.cache.clear()
+        if self.semantic_cache is not None:
+            self.semantic_cache.clear()
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics.
         
         Returns:
-            Dict[str, Any]: Cache statistics
+            Dict[str, Any]: Cache statistics, including coalesced requests
         """
-        return self.cache.get_stats()
+        stats = {
+            **self.cache.get_stats(),
+            'coalesced': self._coalesced,
+            'in_flight': len(self._in_flight)
+        }
+        if self.semantic_cache is not None:
+            stats['semantic'] = self.semantic_cache.get_stats()
+        return stats
     
     def __getattr__(self, name):
         """Delegate other methods to the underlying manager."""
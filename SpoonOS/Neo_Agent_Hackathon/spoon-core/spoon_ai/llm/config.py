@@ -46,6 +46,9 @@ class ProviderConfig:
     retry_attempts: int = 3
     custom_headers: Dict[str, str] = field(default_factory=dict)
     extra_params: Dict[str, Any] = field(default_factory=dict)
+    max_concurrent_requests: Optional[int] = None
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
 
     def __post_init__(self):
         """Validate configuration after initialization."""
@@ -61,6 +64,10 @@ class ProviderConfig:
             raise ConfigurationError(f"timeout must be positive, got {self.timeout}")
         if self.retry_attempts < 0:
             raise ConfigurationError(f"retry_attempts must be non-negative, got {self.retry_attempts}")
+        for limit in ('max_concurrent_requests', 'requests_per_minute', 'tokens_per_minute'):
+            value = getattr(self, limit)
+            if value is not None and value <= 0:
+                raise ConfigurationError(f"{limit} must be positive, got {value}")
 
     def model_dump(self) -> Dict[str, Any]:
         """Convert the configuration to a dictionary.
@@ -78,7 +85,10 @@ class ProviderConfig:
             'timeout': self.timeout,
             'retry_attempts': self.retry_attempts,
             'custom_headers': self.custom_headers.copy(),
-            'extra_params': self.extra_params.copy()
+            'extra_params': self.extra_params.copy(),
+            'max_concurrent_requests': self.max_concurrent_requests,
+            'requests_per_minute': self.requests_per_minute,
+            'tokens_per_minute': self.tokens_per_minute
         }
 
 
@@ -141,7 +151,10 @@ class ConfigurationManager:
                 timeout=provider_config.get('timeout', 30),
                 retry_attempts=provider_config.get('retry_attempts', 3),
                 custom_headers=provider_config.get('custom_headers', {}),
-                extra_params=provider_config.get('extra_params', {})
+                extra_params=provider_config.get('extra_params', {}),
+                max_concurrent_requests=provider_config.get('max_concurrent_requests'),
+                requests_per_minute=provider_config.get('requests_per_minute'),
+                tokens_per_minute=provider_config.get('tokens_per_minute')
             )
 
             # Cache the validated config
@@ -210,7 +223,10 @@ class ConfigurationManager:
             'model': f'{provider_name.upper()}_MODEL',
             'max_tokens': f'{provider_name.upper()}_MAX_TOKENS',
             'temperature': f'{provider_name.upper()}_TEMPERATURE',
-            'timeout': f'{provider_name.upper()}_TIMEOUT'
+            'timeout': f'{provider_name.upper()}_TIMEOUT',
+            'max_concurrent_requests': f'{provider_name.upper()}_MAX_CONCURRENT_REQUESTS',
+            'requests_per_minute': f'{provider_name.upper()}_REQUESTS_PER_MINUTE',
+            'tokens_per_minute': f'{provider_name.upper()}_TOKENS_PER_MINUTE'
         }
 
         for config_key, env_key in env_mappings.items():
@@ -229,7 +245,7 @@ class ConfigurationManager:
                 continue
 
             # Convert string values to appropriate types
-            if config_key in ['max_tokens', 'timeout']:
+            if config_key in ['max_tokens', 'timeout', 'max_concurrent_requests', 'requests_per_minute', 'tokens_per_minute']:
                 try:
                     config[config_key] = int(env_value)
                 except ValueError:
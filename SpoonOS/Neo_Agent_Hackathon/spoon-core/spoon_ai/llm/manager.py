@@ -4,12 +4,14 @@ LLM Manager - Central orchestrator for managing providers, fallback, and load ba
 
 import asyncio
 import random
+import time
 from typing import List, Dict, Any, Optional, AsyncGenerator, Set
 from logging import getLogger
 
 from contextlib import asynccontextmanager
 import threading
 from dataclasses import dataclass, field
+from enum import Enum
 from datetime import datetime, timedelta
 
 from spoon_ai.schema import Message, LLMResponseChunk
@@ -18,9 +20,12 @@ from .registry import LLMProviderRegistry, get_global_registry
 from .config import ConfigurationManager
 from .monitoring import DebugLogger, MetricsCollector, get_debug_logger, get_metrics_collector
 from .response_normalizer import ResponseNormalizer, get_response_normalizer
+from .rate_limiter import ProviderRateLimiter, estimate_request_tokens
+from .token_counter import TokenCounter, get_token_counter
 from .errors import ProviderError, ConfigurationError, ProviderUnavailableError
 from spoon_ai.callbacks.base import BaseCallbackHandler
 from spoon_ai.callbacks.manager import CallbackManager
+from spoon_ai.callbacks.stream_writer import get_stream_writer
 
 logger = getLogger(__name__)
 
@@ -68,6 +73,96 @@ class ProviderState:
         self.last_error_time = None
         self.backoff_until = None
 
+class CircuitState(str, Enum):
+    """Circuit breaker states."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass
+class CircuitBreaker:
+    """Per-provider circuit breaker driven by sliding-window failure rates.
+
+    Closed circuits pass traffic. A circuit opens when the failure rate over
+    the last ``window_seconds`` reaches ``failure_rate_threshold`` with at
+    least ``min_requests`` requests. After ``open_duration`` it lets up to
+    ``half_open_probes`` probe requests through: a successful probe closes
+    it, a failed one re-opens it for twice as long (up to
+    ``max_open_duration``).
+    """
+    failure_rate_threshold: float = 0.5
+    min_requests: int = 10
+    window_seconds: float = 60.0
+    open_duration: float = 30.0
+    max_open_duration: float = 300.0
+    half_open_probes: int = 1
+    state: CircuitState = CircuitState.CLOSED
+    opened_at: Optional[float] = None
+    current_open_duration: float = 0.0
+    probes_in_flight: int = 0
+    times_opened: int = 0
+
+    def allow_request(self) -> bool:
+        """Check whether a request may go through, reserving a probe slot if half-open."""
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() < self.opened_at + self.current_open_duration:
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self.probes_in_flight = 0
+        if self.state == CircuitState.HALF_OPEN:
+            if self.probes_in_flight >= self.half_open_probes:
+                return False
+            self.probes_in_flight += 1
+        return True
+
+    def is_open(self) -> bool:
+        """Check whether requests would currently be rejected."""
+        if self.state == CircuitState.OPEN:
+            return time.monotonic() < self.opened_at + self.current_open_duration
+        return self.state == CircuitState.HALF_OPEN and self.probes_in_flight >= self.half_open_probes
+
+    def record_success(self) -> None:
+        if self.state == CircuitState.HALF_OPEN:
+            self.state = CircuitState.CLOSED
+            self.opened_at = None
+            self.current_open_duration = 0.0
+            self.probes_in_flight = 0
+
+    def record_failure(self, total_requests: int, failed_requests: int) -> bool:
+        """Record a failure given the window counts; return True if the circuit opened."""
+        if self.state == CircuitState.HALF_OPEN:
+            self._open(min(self.current_open_duration * 2, self.max_open_duration))
+            return True
+        if self.state == CircuitState.CLOSED and total_requests >= self.min_requests:
+            if failed_requests / total_requests >= self.failure_rate_threshold:
+                self._open(self.open_duration)
+                return True
+        return False
+
+    def record_cancelled(self) -> None:
+        """Release a probe slot held by a request that ended without an outcome."""
+        if self.state == CircuitState.HALF_OPEN and self.probes_in_flight > 0:
+            self.probes_in_flight -= 1
+
+    def _open(self, duration: float) -> None:
+        self.state = CircuitState.OPEN
+        self.opened_at = time.monotonic()
+        self.current_open_duration = duration
+        self.probes_in_flight = 0
+        self.times_opened += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        retry_in = None
+        if self.state == CircuitState.OPEN:
+            retry_in = max(0.0, self.opened_at + self.current_open_duration - time.monotonic())
+        return {
+            "state": self.state.value,
+            "times_opened": self.times_opened,
+            "retry_in": retry_in,
+        }
+
+
 class FallbackStrategy:
     """Handles fallback logic between providers."""
 
@@ -120,25 +215,207 @@ class FallbackStrategy:
         )
 
 
+@dataclass
+class HedgingPolicy:
+    """Settings for hedged requests.
+
+    A hedge is sent to the next provider in the chain when the primary has
+    not answered within ``percentile`` of its recent successful latencies.
+    Hedges are capped at ``max_hedge_ratio`` of requests plus a small burst.
+    """
+    percentile: float = 95.0
+    min_samples: int = 20
+    default_delay: float = 2.0
+    min_delay: float = 0.05
+    max_hedge_ratio: float = 0.1
+    budget_burst: int = 3
+
+
+class HedgingStrategy:
+    """Sends a backup request when the primary provider is slow.
+
+    Whichever of the primary and the hedge succeeds first wins and the other
+    is cancelled. If both fail, the remaining providers are tried in order.
+    """
+
+    def __init__(self, policy: HedgingPolicy, metrics_collector: MetricsCollector, fallback_strategy: FallbackStrategy):
+        self.policy = policy
+        self.metrics_collector = metrics_collector
+        self.fallback_strategy = fallback_strategy
+        self._stats = {'requests': 0, 'hedged': 0, 'hedge_wins': 0, 'primary_wins': 0, 'budget_exhausted': 0}
+
+    def hedge_delay(self, provider: str, method: str) -> float:
+        """Seconds to wait on the primary before sending a hedge."""
+        delay = self.metrics_collector.get_latency_percentile(
+            provider, self.policy.percentile, method, self.policy.min_samples
+        )
+        if delay is None:
+            delay = self.policy.default_delay
+        return max(delay, self.policy.min_delay)
+
+    def _has_budget(self) -> bool:
+        allowed = self.policy.max_hedge_ratio * self._stats['requests'] + self.policy.budget_burst
+        return self._stats['hedged'] < allowed
+
+    async def execute(self, providers: List[str], method: str, operation) -> LLMResponse:
+        """Execute operation on the first provider, hedging to the second if it is slow.
+
+        Args:
+            providers: Provider names in preference order (at least two)
+            method: Provider method name, used to look up latency percentiles
+            operation: Async operation taking a provider name
+
+        Returns:
+            LLMResponse: Response from the first provider to succeed
+        """
+        self._stats['requests'] += 1
+        primary, backup = providers[0], providers[1]
+        primary_task = asyncio.ensure_future(operation(primary))
+        tasks = {primary_task: primary}
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=self.hedge_delay(primary, method))
+            if not done:
+                if self._has_budget():
+                    self._stats['hedged'] += 1
+                    logger.info(f"Provider {primary} is slow, hedging request to {backup}")
+                    tasks[asyncio.ensure_future(operation(backup))] = backup
+                else:
+                    self._stats['budget_exhausted'] += 1
+
+            pending = set(tasks)
+            last_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = None
+                for task in done:
+                    if task.exception() is None:
+                        winner = winner or task
+                    else:
+                        last_error = task.exception()
+                        logger.warning(f"Provider {tasks[task]} failed: {last_error}")
+                if winner is not None:
+                    self._stats['hedge_wins' if tasks[winner] == backup else 'primary_wins'] += 1
+                    return winner.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        # Every attempt failed: continue down the chain like a plain fallback
+        remaining = [p for p in providers if p not in tasks.values()]
+        if not remaining:
+            raise ProviderError(
+                "fallback",
+                f"All providers failed. Last error: {str(last_error)}",
+                original_error=last_error,
+                context={"attempted_providers": providers}
+            )
+        self.fallback_strategy.debug_logger.log_fallback(primary, remaining[0], str(last_error))
+        return await self.fallback_strategy.execute_with_fallback(remaining, operation)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hedge rate and win statistics."""
+        requests = self._stats['requests']
+        hedged = self._stats['hedged']
+        return {
+            **self._stats,
+            'hedge_rate': hedged / requests if requests else 0.0,
+            'hedge_win_rate': self._stats['hedge_wins'] / hedged if hedged else 0.0,
+        }
+
+
+@dataclass
+class ProviderLoadStats:
+    """Live latency, in-flight and ejection state for one provider."""
+    ewma_latency: Optional[float] = None
+    ewma_error_rate: float = 0.0
+    in_flight: int = 0
+    samples: int = 0
+    consecutive_failures: int = 0
+    ejected_until: Optional[float] = None
+    ejections: int = 0
+
+    def is_ejected(self, now: float) -> bool:
+        """Check if the provider is currently ejected from selection."""
+        return self.ejected_until is not None and now < self.ejected_until
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ewma_latency": self.ewma_latency,
+            "ewma_error_rate": self.ewma_error_rate,
+            "in_flight": self.in_flight,
+            "samples": self.samples,
+            "consecutive_failures": self.consecutive_failures,
+            "ejected": self.is_ejected(time.monotonic()),
+            "ejections": self.ejections,
+        }
+
+
 class LoadBalancer:
-    """Handles load balancing between multiple provider instances."""
+    """Handles load balancing between multiple provider instances.
+
+    Besides the static strategies, ``adaptive`` picks the cheaper of two random
+    providers (power of two choices) by EWMA latency times outstanding
+    requests, and ``least_outstanding`` picks the provider with the fewest
+    in-flight requests. Providers that fail repeatedly or whose latency is far
+    above their peers are ejected for a growing period and then re-admitted.
+    """
 
-    def __init__(self):
+    ADAPTIVE_STRATEGIES = ("adaptive", "least_outstanding")
+
+    def __init__(self,
+                 metrics_collector: Optional[MetricsCollector] = None,
+                 ewma_alpha: float = 0.3,
+                 failure_penalty: float = 4.0,
+                 consecutive_failures_to_eject: int = 5,
+                 outlier_latency_factor: float = 3.0,
+                 min_samples_for_outlier: int = 10,
+                 base_ejection_time: float = 30.0,
+                 max_ejection_time: float = 300.0):
+        """Initialize load balancer.
+
+        Args:
+            metrics_collector: Source of average latencies for providers that
+                have no live samples yet
+            ewma_alpha: Weight of the newest sample in the latency/error EWMAs
+            failure_penalty: Cost multiplier per unit of EWMA error rate
+            consecutive_failures_to_eject: Failures in a row that eject a provider
+            outlier_latency_factor: Eject a provider whose EWMA latency exceeds
+                this multiple of the median of its peers
+            min_samples_for_outlier: Samples needed before latency ejection
+            base_ejection_time: Seconds of the first ejection; each further
+                ejection of the same provider lasts one more multiple of this
+            max_ejection_time: Upper bound for an ejection
+        """
         self.provider_weights: Dict[str, float] = {}
         self.provider_health: Dict[str, bool] = {}
+        self.provider_load: Dict[str, ProviderLoadStats] = {}
+        self.metrics_collector = metrics_collector
+        self.ewma_alpha = ewma_alpha
+        self.failure_penalty = failure_penalty
+        self.consecutive_failures_to_eject = consecutive_failures_to_eject
+        self.outlier_latency_factor = outlier_latency_factor
+        self.min_samples_for_outlier = min_samples_for_outlier
+        self.base_ejection_time = base_ejection_time
+        self.max_ejection_time = max_ejection_time
 
     def select_provider(self, providers: List[str], strategy: str = "round_robin") -> str:
         """Select a provider based on load balancing strategy.
 
         Args:
             providers: List of available providers
-            strategy: Load balancing strategy ('round_robin', 'weighted', 'random')
+            strategy: Load balancing strategy ('round_robin', 'weighted', 'random',
+                'adaptive', 'least_outstanding')
 
         Returns:
             str: Selected provider name
         """
-        # Filter out unhealthy providers
-        healthy_providers = [p for p in providers if self.provider_health.get(p, True)]
+        # Filter out unhealthy and ejected providers
+        now = time.monotonic()
+        healthy_providers = [
+            p for p in providers
+            if self.provider_health.get(p, True) and not self._load(p).is_ejected(now)
+        ]
 
         if not healthy_providers:
             # If no healthy providers, use all providers as fallback
@@ -148,6 +425,10 @@ class LoadBalancer:
             return random.choice(healthy_providers)
         elif strategy == "weighted":
             return self._weighted_selection(healthy_providers)
+        elif strategy == "adaptive":
+            return self._power_of_two_selection(healthy_providers)
+        elif strategy == "least_outstanding":
+            return self._least_outstanding_selection(healthy_providers)
         else:  # round_robin (default)
             return self._round_robin_selection(healthy_providers)
 
@@ -179,6 +460,108 @@ class LoadBalancer:
 
         return providers[-1]  # Fallback
 
+    def _power_of_two_selection(self, providers: List[str]) -> str:
+        """Pick the cheaper of two randomly sampled providers."""
+        if len(providers) == 1:
+            return providers[0]
+        first, second = random.sample(providers, 2)
+        return first if self._cost(first) <= self._cost(second) else second
+
+    def _least_outstanding_selection(self, providers: List[str]) -> str:
+        """Pick the provider with the fewest in-flight requests, breaking ties by cost."""
+        return min(providers, key=lambda p: (self._load(p).in_flight, self._cost(p)))
+
+    def _load(self, provider: str) -> ProviderLoadStats:
+        stats = self.provider_load.get(provider)
+        if stats is None:
+            stats = self.provider_load[provider] = ProviderLoadStats()
+        return stats
+
+    def _latency(self, provider: str) -> float:
+        """EWMA latency, falling back to the collector's average; 0 when unknown."""
+        stats = self._load(provider)
+        if stats.ewma_latency is not None:
+            return stats.ewma_latency
+        if self.metrics_collector is not None:
+            collected = self.metrics_collector.get_provider_stats(provider)
+            if collected is not None and collected.total_requests:
+                return collected.average_duration
+        return 0.0
+
+    def _cost(self, provider: str) -> float:
+        """Expected wait for a new request: latency scaled by queue depth and errors."""
+        stats = self._load(provider)
+        return self._latency(provider) * (stats.in_flight + 1) * (1.0 + self.failure_penalty * stats.ewma_error_rate)
+
+    def record_request_start(self, provider: str) -> None:
+        """Count a request as in flight for a provider."""
+        self._load(provider).in_flight += 1
+
+    def record_request_end(self, provider: str, duration: float, success: bool) -> None:
+        """Fold a finished request into the provider's live stats.
+
+        Args:
+            provider: Provider name
+            duration: Request duration in seconds
+            success: Whether the request succeeded
+        """
+        stats = self._load(provider)
+        stats.in_flight = max(0, stats.in_flight - 1)
+        stats.samples += 1
+        alpha = self.ewma_alpha
+        if stats.ewma_latency is None:
+            stats.ewma_latency = duration
+        else:
+            stats.ewma_latency += alpha * (duration - stats.ewma_latency)
+        stats.ewma_error_rate += alpha * ((0.0 if success else 1.0) - stats.ewma_error_rate)
+
+        now = time.monotonic()
+        if success:
+            stats.consecutive_failures = 0
+            if stats.ejected_until is not None and not stats.is_ejected(now):
+                stats.ejected_until = None  # re-admitted and serving again
+        else:
+            stats.consecutive_failures += 1
+            if stats.consecutive_failures >= self.consecutive_failures_to_eject:
+                self._eject(provider, now, f"{stats.consecutive_failures} consecutive failures")
+                return
+        if self._is_latency_outlier(provider):
+            self._eject(provider, now, f"EWMA latency {stats.ewma_latency:.3f}s")
+
+    def record_request_cancelled(self, provider: str) -> None:
+        """Release the in-flight slot of a request that was cancelled."""
+        stats = self._load(provider)
+        stats.in_flight = max(0, stats.in_flight - 1)
+
+    def _is_latency_outlier(self, provider: str) -> bool:
+        stats = self._load(provider)
+        if stats.samples < self.min_samples_for_outlier:
+            return False
+        now = time.monotonic()
+        peers = sorted(
+            other.ewma_latency for name, other in self.provider_load.items()
+            if name != provider and other.ewma_latency is not None
+            and other.samples >= self.min_samples_for_outlier and not other.is_ejected(now)
+        )
+        if not peers:
+            return False
+        median = peers[len(peers) // 2] if len(peers) % 2 else (peers[len(peers) // 2 - 1] + peers[len(peers) // 2]) / 2
+        return median > 0 and stats.ewma_latency > self.outlier_latency_factor * median
+
+    def _eject(self, provider: str, now: float, reason: str) -> None:
+        stats = self._load(provider)
+        if stats.is_ejected(now):
+            return
+        stats.ejections += 1
+        duration = min(self.base_ejection_time * stats.ejections, self.max_ejection_time)
+        stats.ejected_until = now + duration
+        # Start fresh on re-admission so one bad spell does not keep it out
+        stats.consecutive_failures = 0
+        stats.ewma_latency = None
+        stats.ewma_error_rate = 0.0
+        stats.samples = 0
+        logger.warning(f"Ejected provider {provider} for {duration:.0f}s: {reason}")
+
     def update_provider_health(self, provider: str, is_healthy: bool) -> None:
         """Update provider health status."""
         self.provider_health[provider] = is_healthy
@@ -189,6 +572,10 @@ class LoadBalancer:
         self.provider_weights[provider] = weight
         logger.debug(f"Set {provider} weight: {weight}")
 
+    def get_load_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get live load statistics for every provider seen so far."""
+        return {provider: stats.to_dict() for provider, stats in self.provider_load.items()}
+
 
 class LLMManager:
     """Central orchestrator for LLM providers with fallback and load balancing."""
@@ -198,16 +585,18 @@ class LLMManager:
                  debug_logger: Optional[DebugLogger] = None,
                  metrics_collector: Optional[MetricsCollector] = None,
                  response_normalizer: Optional[ResponseNormalizer] = None,
-                 registry: Optional[LLMProviderRegistry] = None):
+                 registry: Optional[LLMProviderRegistry] = None,
+                 token_counter: Optional[TokenCounter] = None):
         """Initialize LLM Manager with enhanced provider state tracking."""
         self.config_manager = config_manager or ConfigurationManager()
         self.debug_logger = debug_logger or get_debug_logger()
         self.metrics_collector = metrics_collector or get_metrics_collector()
         self.response_normalizer = response_normalizer or get_response_normalizer()
         self.registry = registry or get_global_registry()
+        self.token_counter = token_counter or get_token_counter()
 
         self.fallback_strategy = FallbackStrategy(self.debug_logger)
-        self.load_balancer = LoadBalancer()
+        self.load_balancer = LoadBalancer(self.metrics_collector)
 
         # Enhanced provider state management
         self.provider_states: Dict[str, ProviderState] = {}
@@ -220,6 +609,11 @@ class LLMManager:
         self.default_provider: Optional[str] = None
         self.load_balancing_enabled: bool = False
         self.load_balancing_strategy: str = "round_robin"
+        self.hedging: Optional[HedgingStrategy] = None
+        self.rate_limiters: Dict[str, ProviderRateLimiter] = {}
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self.circuit_breaker_settings: Dict[str, Any] = {}
+        self._rate_limit_settings: Dict[str, tuple] = {}
 
         # Initialize providers from configuration
         self._initialize_providers()
@@ -350,64 +744,160 @@ class LLMManager:
         # Get provider instance
         try:
             config = self.config_manager.load_provider_config(provider_name)
-            provider_instance = self.registry.get_provider(provider_name, config.model_dump())
+            config_dict = config.model_dump()
+            provider_instance = self.registry.get_provider(provider_name, config_dict)
         except Exception as e:
             logger.error(f"Failed to get provider instance {provider_name}: {e}")
             raise ProviderError(provider_name, f"Failed to get provider instance: {str(e)}", original_error=e)
 
-        # Log request
-        request_id = self.debug_logger.log_request(provider_name, method, kwargs)
-        start_time = asyncio.get_event_loop().time()
+        # Fail fast while the provider's circuit is open
+        breaker = self._get_circuit_breaker(provider_name)
+        if not breaker.allow_request():
+            raise ProviderUnavailableError(provider_name, context={"circuit": breaker.to_dict()})
+
+        priority = kwargs.pop('priority', None)
+        limiter = None
+        reserved_tokens = 0
+        used_tokens = None
+        admitted = False
+        settled = False  # whether the breaker has seen this request's outcome
 
         try:
-            # Execute the operation
-            operation = getattr(provider_instance, method)
-            if not callable(operation):
-                raise ProviderError(provider_name, f"Method {method} not available on provider")
+            # Wait for admission under the provider's concurrency and rate limits
+            limiter = self._get_rate_limiter(provider_name, config_dict)
+            if limiter is not None:
+                reserved_tokens = self._estimate_request_tokens(args[0] if args else None, kwargs, config_dict)
+                await limiter.acquire(priority, reserved_tokens)
+            admitted = True
+
+            # Log request
+            request_id = self.debug_logger.log_request(provider_name, method, kwargs)
+            start_time = asyncio.get_event_loop().time()
+            self.load_balancer.record_request_start(provider_name)
+
+            try:
+                # Execute the operation
+                operation = getattr(provider_instance, method)
+                if not callable(operation):
+                    raise ProviderError(provider_name, f"Method {method} not available on provider")
                 
-            response = await operation(*args, **kwargs)
+                response = await operation(*args, **kwargs)
 
-            # Calculate duration and add metadata
-            duration = asyncio.get_event_loop().time() - start_time
-            response.duration = duration
-            response.request_id = request_id
+                # Calculate duration and add metadata
+                duration = asyncio.get_event_loop().time() - start_time
+                response.duration = duration
+                response.request_id = request_id
 
-            # Log successful response
-            self.debug_logger.log_response(request_id, response, duration)
+                # Log successful response
+                self.debug_logger.log_response(request_id, response, duration)
 
-            # Record metrics
-            tokens = response.usage.get('total_tokens', 0) if response.usage else 0
-            self.metrics_collector.record_request(
-                provider_name, method, duration, True, tokens, response.model
-            )
+                # Record metrics
+                tokens = response.usage.get('total_tokens', 0) if response.usage else 0
+                used_tokens = tokens or None
+                self.metrics_collector.record_request(
+                    provider_name, method, duration, True, tokens, response.model
+                )
 
-            # Mark provider as healthy
-            self.load_balancer.update_provider_health(provider_name, True)
+                # Mark provider as healthy
+                breaker.record_success()
+                settled = True
+                self.load_balancer.record_request_end(provider_name, duration, True)
+                self.load_balancer.update_provider_health(provider_name, breaker.state != CircuitState.OPEN)
 
-            return response
+                return response
 
-        except Exception as e:
-            # Calculate duration
-            duration = asyncio.get_event_loop().time() - start_time
+            except asyncio.CancelledError:
+                # Abandoned rather than failed, so only release the in-flight slot
+                self.load_balancer.record_request_cancelled(provider_name)
+                raise
 
-            # Log error
-            self.debug_logger.log_error(request_id, e, {"provider": provider_name, "method": method})
+            except Exception as e:
+                # Calculate duration
+                duration = asyncio.get_event_loop().time() - start_time
+
+                # Log error
+                self.debug_logger.log_error(request_id, e, {"provider": provider_name, "method": method})
+
+                # Record metrics
+                self.metrics_collector.record_request(
+                    provider_name, method, duration, False, error=str(e)
+                )
+
+                # Update provider health; only an open circuit marks it unhealthy
+                tripped = breaker.record_failure(
+                    *self.metrics_collector.get_request_counts(provider_name, breaker.window_seconds)
+                )
+                settled = True
+                if tripped:
+                    logger.warning(f"Circuit opened for {provider_name} for {breaker.current_open_duration:.0f}s")
+                self.load_balancer.record_request_end(provider_name, duration, False)
+                self.load_balancer.update_provider_health(provider_name, breaker.state != CircuitState.OPEN)
+
+                # If the circuit tripped on a critical error, mark provider for reinitialization
+                if tripped and self._is_critical_error(e):
+                    logger.warning(f"Critical error detected for {provider_name}, marking for reinitialization")
+                    state = self._get_provider_state(provider_name)
+                    state.is_initialized = False
+
+                raise
+        finally:
+            # Cancelled, or failed before the provider was called: free any probe slot
+            if not settled:
+                breaker.record_cancelled()
+            if admitted and limiter is not None:
+                limiter.release(reserved_tokens, used_tokens)
+
+    def _estimate_request_tokens(self, prompt: Any, kwargs: Dict[str, Any], config: Dict[str, Any]) -> int:
+        """Pre-flight token estimate for a request: prompt tokens plus max_tokens."""
+        max_tokens = kwargs.get('max_tokens', config.get('max_tokens')) or 0
+        model = kwargs.get('model') or config.get('model')
+        if isinstance(prompt, list) and all(isinstance(message, Message) for message in prompt):
+            return self.token_counter.count_tokens(prompt, model) + max_tokens
+        if isinstance(prompt, str):
+            return self.token_counter.count_text(prompt, model) + max_tokens
+        return estimate_request_tokens(prompt, max_tokens)
+
+    def count_tokens(self, messages: List[Message], model: Optional[str] = None) -> int:
+        """Count prompt tokens for messages before sending them.
 
-            # Record metrics
-            self.metrics_collector.record_request(
-                provider_name, method, duration, False, error=str(e)
-            )
+        Args:
+            messages: Conversation messages
+            model: Model whose tokenizer to use (heuristic if unknown)
 
-            # Update provider health
-            self.load_balancer.update_provider_health(provider_name, False)
+        Returns:
+            int: Token count
+        """
+        return self.token_counter.count_tokens(messages, model)
 
-            # If this is a critical error, mark provider for reinitialization
-            if self._is_critical_error(e):
-                logger.warning(f"Critical error detected for {provider_name}, marking for reinitialization")
-                state = self._get_provider_state(provider_name)
-                state.is_initialized = False
+    def _get_circuit_breaker(self, provider_name: str) -> CircuitBreaker:
+        """Get or create the circuit breaker for a provider."""
+        breaker = self.circuit_breakers.get(provider_name)
+        if breaker is None:
+            breaker = self.circuit_breakers[provider_name] = CircuitBreaker(**self.circuit_breaker_settings)
+        return breaker
 
-            raise
+    def configure_circuit_breakers(self, **settings: Any) -> None:
+        """Set circuit breaker thresholds for all providers.
+
+        Args:
+            **settings: ``CircuitBreaker`` fields such as ``failure_rate_threshold``,
+                ``min_requests``, ``window_seconds`` and ``open_duration``
+        """
+        self.circuit_breaker_settings = settings
+        self.circuit_breakers = {}
+
+    def _get_rate_limiter(self, provider_name: str, config: Dict[str, Any]) -> Optional[ProviderRateLimiter]:
+        """Get the admission limiter for a provider, or None if it has no limits."""
+        limits = tuple(config.get(key) for key in ('max_concurrent_requests', 'requests_per_minute', 'tokens_per_minute'))
+        if not any(limits):
+            self.rate_limiters.pop(provider_name, None)
+            return None
+        limiter = self.rate_limiters.get(provider_name)
+        if limiter is None or self._rate_limit_settings.get(provider_name) != limits:
+            limiter = ProviderRateLimiter(provider_name, *limits)
+            self.rate_limiters[provider_name] = limiter
+            self._rate_limit_settings[provider_name] = limits
+        return limiter
 
     def _is_critical_error(self, error: Exception) -> bool:
         """Determine if an error requires provider reinitialization."""
@@ -494,7 +984,10 @@ class LLMManager:
                 "last_error": str(state.last_error) if state.last_error else None,
                 "last_error_time": state.last_error_time.isoformat() if state.last_error_time else None,
                 "backoff_until": state.backoff_until.isoformat() if state.backoff_until else None,
-                "health_status": self.load_balancer.provider_health.get(provider_name, True)
+                "health_status": self.load_balancer.provider_health.get(provider_name, True),
+                "circuit": self._get_circuit_breaker(provider_name).to_dict(),
+                "load": self.load_balancer.provider_load[provider_name].to_dict()
+                if provider_name in self.load_balancer.provider_load else None
             }
         
         return status
@@ -522,6 +1015,7 @@ class LLMManager:
                 state.last_error = None
                 state.last_error_time = None
                 state.backoff_until = None
+                self.circuit_breakers.pop(provider_name, None)
                 
                 logger.info(f"Reset provider state: {provider_name}")
                 
@@ -577,11 +1071,14 @@ class LLMManager:
         Args:
             messages: List of conversation messages
             provider: Specific provider to use (optional)
-            **kwargs: Additional parameters
+            **kwargs: Additional parameters; ``hedge=False`` opts this call
+                out of hedging
 
         Returns:
             LLMResponse: Normalized response
         """
+        hedge = kwargs.pop('hedge', True)
+
         # Determine provider(s) to use
         providers = self._get_providers_for_request(provider)
 
@@ -591,8 +1088,10 @@ class LLMManager:
                 provider_name, 'chat', messages, **kwargs
             )
 
-        # Execute with fallback
-        if len(providers) > 1:
+        # Execute with hedging or fallback
+        if len(providers) > 1 and hedge and self.hedging is not None:
+            response = await self.hedging.execute(providers, 'chat', chat_operation)
+        elif len(providers) > 1:
             response = await self.fallback_strategy.execute_with_fallback(
                 providers, chat_operation
             )
@@ -626,13 +1125,32 @@ class LLMManager:
         all_callbacks = internal_callbacks + (callbacks or [])
         callback_manager = CallbackManager.from_callbacks(all_callbacks)
 
+        # Streams hold a provider slot for their whole duration, so they are
+        # admitted under the same concurrency and rate limits as chat()
+        priority = kwargs.pop('priority', None)
+        config_dict = self.config_manager.load_provider_config(provider_name).model_dump()
+        limiter = self._get_rate_limiter(provider_name, config_dict)
+        reserved_tokens = 0
+        if limiter is not None:
+            reserved_tokens = self._estimate_request_tokens(messages, kwargs, config_dict)
+            await limiter.acquire(priority, reserved_tokens)
+        used_tokens = None
+
         # Log request
         request_id = self.debug_logger.log_request(provider_name, 'chat_stream', kwargs)
         start_time = asyncio.get_event_loop().time()
 
+        # Forward chunks to an enclosing consumer (e.g. a graph stream in "messages" mode)
+        stream_writer = get_stream_writer()
+
         try:
             # Stream from provider with callbacks
             async for chunk in provider_instance.chat_stream(messages,callbacks=all_callbacks,**kwargs):
+                usage = getattr(chunk, 'usage', None)
+                if usage and usage.get('total_tokens'):
+                    used_tokens = usage['total_tokens']
+                if stream_writer is not None:
+                    await stream_writer(chunk)
                 yield chunk
 
             # Log successful completion
@@ -649,6 +1167,9 @@ class LLMManager:
                 provider_name, 'chat_stream', duration, False, error=str(e)
             )
             raise
+        finally:
+            if limiter is not None:
+                limiter.release(reserved_tokens, used_tokens)
     
     def _get_internal_callbacks(self) -> List[BaseCallbackHandler]:
         """Get internal monitoring callbacks."""
@@ -809,6 +1330,11 @@ class LLMManager:
 
         providers = self._build_provider_chain()
 
+        # Skip providers whose circuit is open; if all are open, keep them and fail fast
+        closed_providers = [p for p in providers if not self._get_circuit_breaker(p).is_open()]
+        if closed_providers:
+            providers = closed_providers
+
         # Use load balancing if enabled and multiple providers available
         if self.load_balancing_enabled and len(providers) > 1:
             primary_provider = self.load_balancer.select_provider(
@@ -840,9 +1366,10 @@ class LLMManager:
         """Enable load balancing with specified strategy.
 
         Args:
-            strategy: Load balancing strategy ('round_robin', 'weighted', 'random')
+            strategy: Load balancing strategy ('round_robin', 'weighted', 'random',
+                'adaptive', 'least_outstanding')
         """
-        valid_strategies = ['round_robin', 'weighted', 'random']
+        valid_strategies = ['round_robin', 'weighted', 'random', 'adaptive', 'least_outstanding']
         if strategy not in valid_strategies:
             raise ConfigurationError(f"Invalid load balancing strategy: {strategy}")
 
@@ -850,6 +1377,20 @@ class LLMManager:
         self.load_balancing_strategy = strategy
         logger.info(f"Enabled load balancing with strategy: {strategy}")
 
+    def enable_hedging(self, policy: Optional[HedgingPolicy] = None) -> None:
+        """Enable hedged chat requests.
+
+        Args:
+            policy: Hedging settings (defaults to ``HedgingPolicy()``)
+        """
+        self.hedging = HedgingStrategy(policy or HedgingPolicy(), self.metrics_collector, self.fallback_strategy)
+        logger.info(f"Enabled request hedging at p{self.hedging.policy.percentile:g}")
+
+    def disable_hedging(self) -> None:
+        """Disable hedged chat requests."""
+        self.hedging = None
+        logger.info("Disabled request hedging")
+
     def disable_load_balancing(self) -> None:
         """Disable load balancing."""
         self.load_balancing_enabled = False
@@ -907,6 +1448,9 @@ class LLMManager:
                 "load_balancing_strategy": self.load_balancing_strategy,
                 "registered_providers": self.registry.list_providers()
             },
+            "load": self.load_balancer.get_load_stats(),
+            "hedging": self.hedging.get_stats() if self.hedging is not None else None,
+            "rate_limits": {name: limiter.get_stats() for name, limiter in self.rate_limiters.items()},
             "providers": self.metrics_collector.get_all_stats(),
             "summary": self.metrics_collector.get_summary()
         }
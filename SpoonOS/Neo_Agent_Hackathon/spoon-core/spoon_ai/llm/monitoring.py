@@ -2,9 +2,10 @@
 Comprehensive monitoring, debugging, and metrics collection for LLM operations.
 """
 
+import math
 import time
 import uuid
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from collections import defaultdict, deque
@@ -397,6 +398,49 @@ class MetricsCollector:
         
         return metrics
     
+    def get_request_counts(self, provider: str, window_seconds: float) -> Tuple[int, int]:
+        """Count requests and failures for a provider over the most recent window.
+        
+        Args:
+            provider: Provider name
+            window_seconds: Length of the sliding window in seconds
+            
+        Returns:
+            Tuple[int, int]: (total requests, failed requests)
+        """
+        cutoff = datetime.now() - timedelta(seconds=window_seconds)
+        total = failed = 0
+        # Newest entries are at the right, so stop at the first one outside the window
+        for metric in reversed(self.rolling_metrics):
+            if metric['timestamp'] < cutoff:
+                break
+            if metric['provider'] == provider:
+                total += 1
+                if not metric['success']:
+                    failed += 1
+        return total, failed
+    
+    def get_latency_percentile(self, provider: str, percentile: float, method: Optional[str] = None,
+                               min_samples: int = 1) -> Optional[float]:
+        """Get a latency percentile of successful requests in the rolling window.
+        
+        Args:
+            provider: Provider name
+            percentile: Percentile between 0 and 100
+            method: Filter by method (optional)
+            min_samples: Return None when fewer samples are available
+            
+        Returns:
+            Optional[float]: Duration in seconds, or None without enough samples
+        """
+        durations = sorted(
+            m['duration'] for m in self.get_rolling_metrics(provider, method) if m['success']
+        )
+        if not durations or len(durations) < min_samples:
+            return None
+        rank = max(0, min(len(durations) - 1, math.ceil(percentile / 100.0 * len(durations)) - 1))
+        return durations[rank]
+    
     def get_summary(self) -> Dict[str, Any]:
         """Get overall summary statistics.
         
@@ -0,0 +1,231 @@
+"""
+Per-provider admission control: concurrency limits, token buckets and a priority queue.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+_PRIORITY_NAMES = {
+    'interactive': PRIORITY_INTERACTIVE,
+    'batch': PRIORITY_BATCH,
+}
+
+
+def resolve_priority(priority: Union[int, str, None]) -> int:
+    """Map 'interactive'/'batch' or an int to a priority (lower runs first)."""
+    if priority is None:
+        return PRIORITY_INTERACTIVE
+    if isinstance(priority, str):
+        try:
+            return _PRIORITY_NAMES[priority]
+        except KeyError:
+            raise ValueError(f"Unknown request priority: {priority}") from None
+    return int(priority)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate_per_minute``.
+
+    The bucket may go into debt when a request turns out to cost more than
+    was reserved for it; later requests then wait until the debt is repaid.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until ``amount`` tokens are available (0 if they are now)."""
+        self._refill()
+        # A request larger than the bucket only has to wait for a full bucket
+        missing = min(amount, self.capacity) - self.tokens
+        return missing / self.rate if missing > 0 else 0.0
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= amount
+
+    def refund(self, amount: float) -> None:
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class ProviderRateLimiter:
+    """Admits requests to one provider within its concurrency and rate limits.
+
+    Waiting requests are ordered by priority, then arrival. The head of the
+    queue is admitted as soon as a concurrency slot is free and both buckets
+    can cover it; lower-priority requests never overtake it.
+    """
+
+    def __init__(self,
+                 provider: str,
+                 max_concurrent_requests: Optional[int] = None,
+                 requests_per_minute: Optional[int] = None,
+                 tokens_per_minute: Optional[int] = None):
+        self.provider = provider
+        self.max_concurrent_requests = max_concurrent_requests
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._active = 0
+        self._queue: List[Tuple[int, int, float, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._stats = {
+            'admitted': 0,
+            'queued': 0,
+            'max_queue_depth': 0,
+            'total_wait_time': 0.0,
+            'max_wait_time': 0.0,
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for *_, future in self._queue if not future.done())
+
+    def _wait_for(self, tokens: float) -> Optional[float]:
+        """Seconds until a request costing ``tokens`` fits, or None if a slot is missing."""
+        if self.max_concurrent_requests is not None and self._active >= self.max_concurrent_requests:
+            return None
+        wait = 0.0
+        if self.request_bucket is not None:
+            wait = max(wait, self.request_bucket.time_until(1))
+        if self.token_bucket is not None and tokens:
+            wait = max(wait, self.token_bucket.time_until(tokens))
+        return wait
+
+    def _admit(self, tokens: float) -> None:
+        self._active += 1
+        if self.request_bucket is not None:
+            self.request_bucket.consume(1)
+        if self.token_bucket is not None and tokens:
+            self.token_bucket.consume(tokens)
+        self._stats['admitted'] += 1
+
+    def _dispatch(self) -> None:
+        """Admit queued requests from the head while limits allow."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._queue:
+            _, _, tokens, future = self._queue[0]
+            if future.done():  # cancelled while waiting
+                heapq.heappop(self._queue)
+                continue
+            wait = self._wait_for(tokens)
+            if wait is None:
+                return  # a release will dispatch again
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._queue)
+            self._admit(tokens)
+            future.set_result(None)
+
+    async def acquire(self, priority: Union[int, str, None] = None, tokens: float = 0) -> float:
+        """Wait for admission and return the time spent queued.
+
+        Args:
+            priority: 'interactive', 'batch' or an int; lower runs first
+            tokens: Estimated tokens the request will use
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        rank = resolve_priority(priority)
+        if not self._queue and self._wait_for(tokens) == 0:
+            self._admit(tokens)
+            return 0.0
+
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (rank, next(self._seq), tokens, future))
+        self._stats['queued'] += 1
+        self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], self.queue_depth)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(tokens)  # admitted just as the caller gave up
+            else:
+                self._dispatch()  # the head may have been the one cancelled
+            raise
+
+        waited = time.monotonic() - start
+        self._stats['total_wait_time'] += waited
+        self._stats['max_wait_time'] = max(self._stats['max_wait_time'], waited)
+        return waited
+
+    def release(self, reserved_tokens: float = 0, used_tokens: Optional[float] = None) -> None:
+        """Free a concurrency slot and settle the token reservation.
+
+        Args:
+            reserved_tokens: Tokens reserved at admission
+            used_tokens: Tokens actually used, when known
+        """
+        self._active = max(0, self._active - 1)
+        if self.token_bucket is not None and used_tokens is not None:
+            difference = reserved_tokens - used_tokens
+            if difference > 0:
+                self.token_bucket.refund(difference)
+            elif difference < 0:
+                self.token_bucket.consume(-difference)
+        if self._queue:
+            self._dispatch()
+
+    @asynccontextmanager
+    async def limit(self, priority: Union[int, str, None] = None, tokens: float = 0) -> AsyncIterator[Dict[str, Any]]:
+        """Hold an admission for the duration of a request.
+
+        Yields a dict whose ``used_tokens`` can be set to the actual usage.
+        """
+        await self.acquire(priority, tokens)
+        usage: Dict[str, Any] = {'used_tokens': None}
+        try:
+            yield usage
+        finally:
+            self.release(tokens, usage['used_tokens'])
+
+    def get_stats(self) -> Dict[str, Any]:
+        queued = self._stats['queued']
+        return {
+            **self._stats,
+            'active': self._active,
+            'queue_depth': self.queue_depth,
+            'avg_wait_time': self._stats['total_wait_time'] / queued if queued else 0.0,
+            'max_concurrent_requests': self.max_concurrent_requests,
+            'requests_per_minute': self.request_bucket.rate * 60 if self.request_bucket else None,
+            'tokens_per_minute': self.token_bucket.rate * 60 if self.token_bucket else None,
+        }
+
+
+def estimate_request_tokens(messages: Any, max_tokens: Optional[int] = None) -> int:
+    """Rough token estimate (4 characters per token) for rate-limit reservations."""
+    chars = 0
+    if isinstance(messages, str):
+        chars = len(messages)
+    elif isinstance(messages, list):
+        for message in messages:
+            content = getattr(message, 'content', None)
+            if content is None and isinstance(message, dict):
+                content = message.get('content')
+            chars += len(content) if isinstance(content, str) else 0
+    return chars // 4 + 1 + (max_tokens or 0)
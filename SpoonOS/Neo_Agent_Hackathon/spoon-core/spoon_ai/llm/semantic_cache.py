@@ -0,0 +1,279 @@
+"""
+Semantic (embedding-similarity) cache tier for LLM responses.
+
+The exact-match cache misses prompts that differ only in wording or
+whitespace. This tier embeds the last user message and returns a cached
+response whose prompt is similar enough, provided everything else about the
+request (earlier messages, provider, parameters) is identical. It is opt-in
+per namespace, so only prompt families where a near-duplicate answer is
+acceptable (intent classification, routing) use it.
+"""
+
+import hashlib
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from logging import getLogger
+
+from .interface import LLMResponse
+from spoon_ai.schema import Message
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+logger = getLogger(__name__)
+
+EmbeddingFunction = Callable[[str], Sequence[float]]
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class HashingEmbedder:
+    """Deterministic local embedding based on hashed word and character n-grams.
+
+    Needs no model or network, so it is suitable for tests and offline use.
+    Texts that share most of their words and character trigrams land close
+    together, which is enough to catch whitespace, casing and small wording
+    changes. Plug in a real embedding model for paraphrase-level matching.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dim, 1.0 if (value >> 63) & 1 else -1.0
+
+    def __call__(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        words = _TOKEN_RE.findall(text.lower())
+        for word in words:
+            index, sign = self._bucket("w:" + word)
+            vector[index] += 2.0 * sign
+        joined = " ".join(words)
+        for i in range(len(joined) - 2):
+            index, sign = self._bucket("c:" + joined[i:i + 3])
+            vector[index] += sign
+        return vector
+
+
+def _normalize(vector: Sequence[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else list(vector)
+
+
+class VectorIndex:
+    """Brute-force cosine-similarity index over normalized vectors.
+
+    Uses a NumPy matrix when NumPy is installed and plain Python otherwise.
+    Removal swaps the last row into the freed slot, so add and remove are O(1)
+    and a search is a single matrix-vector product.
+    """
+
+    def __init__(self):
+        self._ids: List[Any] = []
+        self._positions: Dict[Any, int] = {}
+        self._rows: List[List[float]] = []
+        self._matrix = None  # NumPy cache of _rows, rebuilt lazily after changes
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, item_id: Any, vector: Sequence[float]) -> None:
+        if item_id in self._positions:
+            self.remove(item_id)
+        self._positions[item_id] = len(self._ids)
+        self._ids.append(item_id)
+        self._rows.append(_normalize(vector))
+        self._matrix = None
+
+    def remove(self, item_id: Any) -> None:
+        position = self._positions.pop(item_id, None)
+        if position is None:
+            return
+        last_id = self._ids.pop()
+        last_row = self._rows.pop()
+        if position < len(self._ids):
+            self._ids[position] = last_id
+            self._rows[position] = last_row
+            self._positions[last_id] = position
+        self._matrix = None
+
+    def search(self, vector: Sequence[float], k: int = 1) -> List[Tuple[Any, float]]:
+        """Return up to ``k`` (id, cosine similarity) pairs, best first."""
+        if not self._ids:
+            return []
+        query = _normalize(vector)
+        if HAS_NUMPY:
+            if self._matrix is None:
+                self._matrix = np.asarray(self._rows, dtype=np.float32)
+            scores = self._matrix @ np.asarray(query, dtype=np.float32)
+            if k == 1:
+                best = int(scores.argmax())
+                return [(self._ids[best], float(scores[best]))]
+            order = np.argsort(-scores)[:k]
+            return [(self._ids[i], float(scores[i])) for i in order]
+        scored = [(sum(a * b for a, b in zip(row, query)), i) for i, row in enumerate(self._rows)]
+        scored.sort(reverse=True)
+        return [(self._ids[i], score) for score, i in scored[:k]]
+
+
+@dataclass
+class _SemanticEntry:
+    response: LLMResponse
+    expires_at: float
+    prompt: str
+
+
+class SemanticResponseCache:
+    """Similarity-based response cache, partitioned by namespace and request context.
+
+    A lookup only considers entries whose request matched on everything but
+    the last user message; among those it returns the nearest neighbour if
+    its cosine similarity is at least the namespace's threshold.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Optional[EmbeddingFunction] = None,
+        threshold: float = 0.95,
+        default_ttl: float = 3600,
+        max_entries_per_namespace: int = 1000,
+        namespaces: Optional[Sequence[str]] = None,
+    ):
+        """Initialize cache.
+
+        Args:
+            embed_fn: Text embedding function (defaults to ``HashingEmbedder()``)
+            threshold: Minimum cosine similarity for a hit
+            default_ttl: Time to live in seconds
+            max_entries_per_namespace: Oldest entries are dropped beyond this
+            namespaces: Namespaces enabled up front; others must be enabled
+                with ``enable_namespace``
+        """
+        self.embed_fn = embed_fn or HashingEmbedder()
+        self.threshold = threshold
+        self.default_ttl = default_ttl
+        self.max_entries_per_namespace = max_entries_per_namespace
+        self._thresholds: Dict[str, float] = {}
+        # namespace -> context key -> index; entries are keyed by a sequence number
+        self._indexes: Dict[str, Dict[str, VectorIndex]] = {}
+        self._entries: Dict[str, Dict[int, Tuple[str, _SemanticEntry]]] = {}
+        self._seq = 0
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        for namespace in namespaces or []:
+            self.enable_namespace(namespace)
+
+    def enable_namespace(self, namespace: str, threshold: Optional[float] = None) -> None:
+        """Opt a namespace in, optionally with its own similarity threshold."""
+        self._thresholds[namespace] = self.threshold if threshold is None else threshold
+        self._indexes.setdefault(namespace, {})
+        self._entries.setdefault(namespace, {})
+
+    def disable_namespace(self, namespace: str) -> None:
+        self._thresholds.pop(namespace, None)
+        self._indexes.pop(namespace, None)
+        self._entries.pop(namespace, None)
+
+    def is_enabled(self, namespace: Optional[str]) -> bool:
+        return namespace is not None and namespace in self._thresholds
+
+    @staticmethod
+    def _split(messages: List[Message]) -> Tuple[Optional[str], List[Message]]:
+        """Separate the last user message from the rest of the conversation."""
+        for i in range(len(messages) - 1, -1, -1):
+            if messages[i].role == "user":
+                return messages[i].content or "", messages[:i] + messages[i + 1:]
+        return None, messages
+
+    @staticmethod
+    def _context_key(context: List[Message], provider: str, **kwargs) -> str:
+        data = repr((
+            provider,
+            sorted((k, repr(v)) for k, v in kwargs.items() if k not in ('request_id', 'timestamp', 'priority')),
+        ))
+        key_hash = hashlib.sha256(data.encode())
+        key_hash.update(b"".join(msg.digest() for msg in context))
+        return key_hash.hexdigest()
+
+    def get(self, messages: List[Message], provider: str, namespace: Optional[str], **kwargs) -> Optional[LLMResponse]:
+        if not self.is_enabled(namespace):
+            return None
+        prompt, context = self._split(messages)
+        index = self._indexes[namespace].get(self._context_key(context, provider, **kwargs)) if prompt else None
+        if not index:
+            self._stats['misses'] += 1
+            return None
+
+        # Walk neighbours best first, dropping expired ones, until a live entry
+        # is found or the scores fall below the threshold; widen the search if
+        # every candidate returned so far had expired
+        vector = self.embed_fn(prompt)
+        threshold = self._thresholds[namespace]
+        now = time.time()
+        k = 4
+        while len(index):
+            matches = index.search(vector, k=k)
+            for entry_id, score in matches:
+                if score < threshold:
+                    self._stats['misses'] += 1
+                    return None
+                _, entry = self._entries[namespace][entry_id]
+                if entry.expires_at <= now:
+                    self._drop(namespace, entry_id)
+                    continue
+                self._stats['hits'] += 1
+                logger.debug(f"Semantic cache hit in '{namespace}' (similarity {score:.3f})")
+                return entry.response
+            if len(matches) < k:
+                break
+            k *= 2
+
+        self._stats['misses'] += 1
+        return None
+
+    def put(self, messages: List[Message], provider: str, response: LLMResponse, namespace: Optional[str], **kwargs) -> None:
+        if not self.is_enabled(namespace):
+            return
+        prompt, context = self._split(messages)
+        if not prompt:
+            return
+        context_key = self._context_key(context, provider, **kwargs)
+        self._seq += 1
+        entries = self._entries[namespace]
+        entries[self._seq] = (context_key, _SemanticEntry(response, time.time() + self.default_ttl, prompt))
+        self._indexes[namespace].setdefault(context_key, VectorIndex()).add(self._seq, self.embed_fn(prompt))
+
+        # dicts keep insertion order, so the first entry is the oldest
+        while len(entries) > self.max_entries_per_namespace:
+            self._drop(namespace, next(iter(entries)))
+            self._stats['evictions'] += 1
+
+    def _drop(self, namespace: str, entry_id: int) -> None:
+        context_key, _ = self._entries[namespace].pop(entry_id)
+        index = self._indexes[namespace].get(context_key)
+        if index is not None:
+            index.remove(entry_id)
+            if not len(index):
+                del self._indexes[namespace][context_key]
+
+    def clear(self) -> None:
+        for namespace in self._thresholds:
+            self._indexes[namespace] = {}
+            self._entries[namespace] = {}
+
+    def get_stats(self) -> Dict[str, Any]:
+        total_requests = self._stats['hits'] + self._stats['misses']
+        return {
+            **self._stats,
+            'size': sum(len(entries) for entries in self._entries.values()),
+            'namespaces': sorted(self._thresholds),
+            'hit_rate': self._stats['hits'] / total_requests if total_requests > 0 else 0,
+            'total_requests': total_requests,
+        }
@@ -0,0 +1,272 @@
+"""
+Token counting for messages and prompts.
+
+Counts come from a per-model tokenizer when one is available and fall back to
+a characters-per-token heuristic otherwise. Tokenizers are loaded lazily, the
+first time a model is counted, and per-message counts are cached so repeated
+counting of a growing conversation only tokenizes new messages.
+"""
+
+import fnmatch
+import math
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List, Optional, Protocol, Sequence, Tuple, Union
+from logging import getLogger
+
+from spoon_ai.schema import Message
+
+try:
+    import tiktoken
+    HAS_TIKTOKEN = True
+except ImportError:
+    HAS_TIKTOKEN = False
+
+try:
+    from tokenizers import Tokenizer as HFTokenizer
+    HAS_TOKENIZERS = True
+except ImportError:
+    HAS_TOKENIZERS = False
+
+logger = getLogger(__name__)
+
+CHARS_PER_TOKEN = 4.0
+TOKENS_PER_MESSAGE = 3
+
+HEURISTIC = "heuristic"
+
+
+class Tokenizer(Protocol):
+    """Anything that can count the tokens in a string."""
+
+    def count(self, text: str) -> int:
+        ...
+
+
+class TiktokenTokenizer:
+    """Tokenizer backed by a tiktoken encoding."""
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+
+class HuggingFaceTokenizer:
+    """Tokenizer backed by a ``tokenizer.json`` file (requires ``tokenizers``)."""
+
+    def __init__(self, path: Union[str, Path]):
+        if not HAS_TOKENIZERS:
+            raise ImportError("The 'tokenizers' package is required to load tokenizer.json files")
+        self.tokenizer = HFTokenizer.from_file(str(path))
+
+    def count(self, text: str) -> int:
+        return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+def _message_text_parts(message: Message) -> List[str]:
+    """The parts of a message that are sent to the model, in counting order."""
+    parts = []
+    content = message.content
+    if isinstance(content, str):
+        parts.append(content)
+    elif content is not None:
+        parts.append(repr(content))
+    if message.role == "assistant" and message.tool_calls and not isinstance(message.content, list):
+        parts.append(repr(message.tool_calls))
+    if message.role == "tool" and message.tool_call_id:
+        parts.append(message.tool_call_id)
+    parts.append(message.role or "")
+    if message.name:
+        parts.append(message.name)
+    return parts
+
+
+def _tool_calls_key(message: Message) -> Optional[tuple]:
+    if not message.tool_calls:
+        return None
+    return tuple((call.id, call.type, call.function.name, call.function.arguments) for call in message.tool_calls)
+
+
+def heuristic_message_tokens(message: Message) -> int:
+    """Approximate tokens for one message: characters / 4 plus per-message overhead."""
+    chars = sum(len(part) for part in _message_text_parts(message))
+    return math.ceil(chars / CHARS_PER_TOKEN) + TOKENS_PER_MESSAGE
+
+
+class TokenCounter:
+    """Counts tokens with per-model tokenizers and caches per-message counts.
+
+    Tokenizers are resolved for a model in this order: loaders registered
+    with ``register_tokenizer`` (glob patterns on the model name), a
+    ``<model>.json`` or ``<encoding>.json`` Hugging Face tokenizer file in
+    ``tokenizer_dir``, then the tiktoken encoding for the model. tiktoken
+    encodings are only used when they can be loaded from tiktoken's local
+    cache (``TIKTOKEN_CACHE_DIR``) or ``allow_download`` is set. Models with
+    no tokenizer use the heuristic.
+    """
+
+    def __init__(
+        self,
+        tokenizer_dir: Optional[Union[str, Path]] = None,
+        allow_download: Optional[bool] = None,
+        max_cache_size: int = 50_000,
+        default_encoding: Optional[str] = None,
+    ):
+        """Initialize token counter.
+
+        Args:
+            tokenizer_dir: Directory with tokenizer files (defaults to
+                ``SPOON_TOKENIZER_DIR``)
+            allow_download: Let tiktoken fetch encodings that are not cached
+                locally (defaults to ``SPOON_TOKENIZER_ALLOW_DOWNLOAD``)
+            max_cache_size: Maximum number of cached per-message counts
+            default_encoding: tiktoken encoding for models tiktoken does not
+                know; None uses the heuristic for them
+        """
+        tokenizer_dir = tokenizer_dir or os.getenv("SPOON_TOKENIZER_DIR")
+        self.tokenizer_dir = Path(tokenizer_dir) if tokenizer_dir else None
+        if allow_download is None:
+            allow_download = os.getenv("SPOON_TOKENIZER_ALLOW_DOWNLOAD", "").lower() in ("1", "true", "yes")
+        self.allow_download = allow_download
+        self.max_cache_size = max_cache_size
+        self.default_encoding = default_encoding
+        self._loaders: List[Tuple[str, Callable[[], Tokenizer]]] = []
+        # model -> (tokenizer name, tokenizer or None for the heuristic)
+        self._resolved: Dict[Optional[str], Tuple[str, Optional[Tokenizer]]] = {}
+        self._tokenizers: Dict[str, Optional[Tokenizer]] = {}
+        self._cache: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._stats = {'hits': 0, 'misses': 0}
+
+    def register_tokenizer(self, model_pattern: str, loader: Callable[[], Tokenizer]) -> None:
+        """Use ``loader()`` for models matching a glob pattern such as ``"claude-*"``.
+
+        The loader runs once, the first time a matching model is counted.
+        """
+        self._loaders.append((model_pattern, loader))
+        self._resolved.clear()
+
+    def _load_named(self, name: str, loader: Callable[[], Tokenizer]) -> Optional[Tokenizer]:
+        if name not in self._tokenizers:
+            try:
+                self._tokenizers[name] = loader()
+                logger.debug(f"Loaded tokenizer {name}")
+            except Exception as e:
+                logger.info(f"Tokenizer {name} unavailable, using heuristic counts: {e}")
+                self._tokenizers[name] = None
+        return self._tokenizers[name]
+
+    def _resolve(self, model: Optional[str]) -> Tuple[str, Optional[Tokenizer]]:
+        resolved = self._resolved.get(model)
+        if resolved is not None:
+            return resolved
+
+        resolved = (HEURISTIC, None)
+        if model:
+            for pattern, loader in self._loaders:
+                if fnmatch.fnmatch(model, pattern):
+                    resolved = (pattern, self._load_named(pattern, loader))
+                    break
+            else:
+                resolved = self._resolve_from_files(model)
+        if resolved[1] is None and resolved[0] != HEURISTIC:
+            resolved = (HEURISTIC, None)
+        self._resolved[model] = resolved
+        return resolved
+
+    def _resolve_from_files(self, model: str) -> Tuple[str, Optional[Tokenizer]]:
+        encoding_name = self.default_encoding
+        if HAS_TIKTOKEN:
+            try:
+                encoding_name = tiktoken.encoding_name_for_model(model)
+            except KeyError:
+                pass
+
+        if self.tokenizer_dir is not None:
+            for name in (model, encoding_name):
+                path = self.tokenizer_dir / f"{name}.json" if name else None
+                if path is not None and path.is_file():
+                    return str(path), self._load_named(str(path), lambda path=path: HuggingFaceTokenizer(path))
+
+        tiktoken_local = self.allow_download or bool(os.getenv("TIKTOKEN_CACHE_DIR"))
+        if encoding_name and HAS_TIKTOKEN and tiktoken_local:
+            return encoding_name, self._load_named(
+                encoding_name, lambda: TiktokenTokenizer(tiktoken.get_encoding(encoding_name))
+            )
+        return HEURISTIC, None
+
+    def tokenizer_name(self, model: Optional[str]) -> str:
+        """Name of the tokenizer used for a model, or ``"heuristic"``."""
+        return self._resolve(model)[0]
+
+    def count_text(self, text: str, model: Optional[str] = None) -> int:
+        """Count tokens in a plain string."""
+        _, tokenizer = self._resolve(model)
+        if tokenizer is None:
+            return math.ceil(len(text) / CHARS_PER_TOKEN)
+        return tokenizer.count(text)
+
+    def _count_uncached(self, message: Message, tokenizer: Optional[Tokenizer]) -> int:
+        if tokenizer is None:
+            return heuristic_message_tokens(message)
+        return sum(tokenizer.count(part) for part in _message_text_parts(message) if part) + TOKENS_PER_MESSAGE
+
+    def count_messages(self, messages: Sequence[Message], model: Optional[str] = None) -> List[int]:
+        """Count tokens for each message, reusing cached counts.
+
+        Counts are cached on the message id, content digest and tool calls,
+        so an edited message is recounted even if its id is unchanged.
+        """
+        name, tokenizer = self._resolve(model)
+        counts = []
+        cache = self._cache
+        for message in messages:
+            key = (
+                name,
+                message.id,
+                message.digest(),
+                message.name,
+                message.tool_call_id,
+                _tool_calls_key(message),
+            )
+            count = cache.get(key)
+            if count is not None:
+                cache.move_to_end(key)
+                self._stats['hits'] += 1
+            else:
+                count = self._count_uncached(message, tokenizer)
+                self._stats['misses'] += 1
+                cache[key] = count
+                if len(cache) > self.max_cache_size:
+                    cache.popitem(last=False)
+            counts.append(count)
+        return counts
+
+    def count_tokens(self, messages: Sequence[Message], model: Optional[str] = None) -> int:
+        """Total tokens for a list of messages (at least 1)."""
+        return max(1, sum(self.count_messages(messages, model)))
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self._stats, 'size': len(self._cache)}
+
+
+_global_token_counter: Optional[TokenCounter] = None
+
+
+def get_token_counter() -> TokenCounter:
+    """Get the shared token counter."""
+    global _global_token_counter
+    if _global_token_counter is None:
+        _global_token_counter = TokenCounter()
+    return _global_token_counter
+
+
+def set_token_counter(counter: TokenCounter) -> None:
+    """Replace the shared token counter."""
+    global _global_token_counter
+    _global_token_counter = counter
@@ -5,7 +5,7 @@ This module provides memory management utilities for maintaining and optimizing
 conversation history in chat applications.
 """
 
-from .short_term_manager import ShortTermMemoryManager, TrimStrategy, MessageTokenCounter
+from .short_term_manager import ShortTermMemoryManager, TrimStrategy, MessageTokenCounter, SummaryWatermark
 from .remove_message import RemoveMessage, REMOVE_ALL_MESSAGES
 from .mem0_client import SpoonMem0
 
@@ -13,6 +13,7 @@ __all__ = [
     "ShortTermMemoryManager",
     "TrimStrategy",
     "MessageTokenCounter",
+    "SummaryWatermark",
     "RemoveMessage",
     "REMOVE_ALL_MESSAGES",
     "SpoonMem0",
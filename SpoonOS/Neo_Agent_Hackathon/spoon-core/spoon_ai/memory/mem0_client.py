@@ -1,7 +1,10 @@
 import asyncio
 import logging
 import os
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
 from spoon_ai.schema import Message
 
@@ -13,7 +16,15 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 class SpoonMem0:
-    """Lightweight wrapper around Mem0's MemoryClient with safe defaults."""
+    """Lightweight wrapper around Mem0's MemoryClient with safe defaults.
+
+    Writes are synchronous unless ``write_behind`` is set in the config, in
+    which case ``aadd_memory`` queues them on a ``Mem0WriteQueue`` tuned by
+    ``write_batch_size`` (default 8), ``write_flush_interval`` (seconds,
+    default 2.0), ``write_queue_size`` (default 1000) and ``write_overflow``
+    (``"drop_oldest"``, ``"drop_newest"`` or ``"block"``). Queued writes are
+    only guaranteed to reach Mem0 after ``aflush()`` or ``aclose()``.
+    """
 
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.config = config or {}
@@ -24,6 +35,20 @@ class SpoonMem0:
         self.limit = self.config.get("limit")
         self.filters = self.config.get("filters") or {}
         self.metadata = self._build_metadata()
+        search_cache_size = self.config.get("search_cache_size", 256)
+        self.search_cache: Optional[MemorySearchCache] = (
+            MemorySearchCache(search_cache_size, self.config.get("search_cache_ttl", 60.0))
+            if search_cache_size else None
+        )
+        self.write_queue: Optional[Mem0WriteQueue] = None
+        if self.config.get("write_behind"):
+            self.write_queue = Mem0WriteQueue(
+                self,
+                max_batch_size=self.config.get("write_batch_size", 8),
+                flush_interval=self.config.get("write_flush_interval", 2.0),
+                max_pending=self.config.get("write_queue_size", 1000),
+                overflow=self.config.get("write_overflow", "drop_oldest"),
+            )
         if MemoryClient is None:
             logger.warning("mem0ai is not installed. Memory features will be disabled.")
             self.client = None
@@ -79,6 +104,14 @@ class SpoonMem0:
         elif self.limit:
             search_kwargs["limit"] = self.limit
 
+        cache_key = self._search_cache_key(query, search_kwargs.get("limit"))
+        generation = 0
+        if self.search_cache is not None:
+            cached = self.search_cache.get(active_user, cache_key)
+            if cached is not None:
+                return list(cached)
+            generation = self.search_cache.generation(active_user)
+
         try:
             results = self.client.search(query=query, **search_kwargs)
         except TypeError:
@@ -95,9 +128,22 @@ class SpoonMem0:
             logger.warning("Mem0 search failed: %s", exc)
             return []
 
-        return self._extract_memories(results)
+        memories = self._extract_memories(results)
+        if self.search_cache is not None:
+            self.search_cache.put(active_user, cache_key, memories, generation)
+        return memories
+
+    @staticmethod
+    def _search_cache_key(query: str, limit: Optional[int]) -> Tuple[str, Optional[int]]:
+        return query.strip(), limit
 
     async def asearch_memory(self, query: str, user_id: Optional[str] = None) -> List[str]:
+        if self.search_cache is not None and query and self.client:
+            # Serve cache hits without a thread hop
+            key = self._search_cache_key(query, self.limit or None)
+            cached = self.search_cache.get(user_id or self.user_id, key, record_miss=False)
+            if cached is not None:
+                return list(cached)
         return await asyncio.to_thread(self.search_memory, query, user_id)
 
     def add_memory(self, messages: List[Any], user_id: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> None:
@@ -139,14 +185,31 @@ class SpoonMem0:
                 logger.warning("Mem0 add failed after fallback: %s", exc)
         except Exception as exc:
             logger.warning("Mem0 add failed: %s", exc)
+        finally:
+            if self.search_cache is not None:
+                self.search_cache.invalidate(active_user)
 
     def add_text(self, data: str, user_id: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> None:
         """Convenience helper for adding a single text memory."""
         self.add_memory([{"role": "user", "content": data}], user_id=user_id, metadata=metadata)
 
     async def aadd_memory(self, messages: List[Any], user_id: Optional[str] = None) -> None:
+        """Store messages; queued for a batched background write when ``write_behind`` is set."""
+        if self.write_queue is not None:
+            await self.write_queue.put(messages, user_id)
+            return
         await asyncio.to_thread(self.add_memory, messages, user_id)
 
+    async def aflush(self) -> None:
+        """Write any queued memories now."""
+        if self.write_queue is not None:
+            await self.write_queue.flush()
+
+    async def aclose(self) -> None:
+        """Flush queued memories and stop the background writer."""
+        if self.write_queue is not None:
+            await self.write_queue.close()
+
     def _format_messages(self, messages: List[Any]) -> List[Dict[str, str]]:
         formatted: List[Dict[str, str]] = []
         for message in messages:
@@ -238,3 +301,224 @@ class SpoonMem0:
             return []
 
         return self._extract_memories(results)
+
+
+class MemorySearchCache:
+    """LRU cache of search results keyed by user and query.
+
+    Writing memories for a user bumps that user's generation, which
+    invalidates every cached result for them, including searches that were
+    still in flight when the write landed. ``ttl`` bounds staleness from
+    writes made by other processes.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # (user, key) -> (expires at, user generation, memories)
+        self._entries: "OrderedDict[Any, Tuple[float, int, List[str]]]" = OrderedDict()
+        self._generations: Dict[Optional[str], int] = {}
+        self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+        self._lock = threading.Lock()  # searches and writes run in worker threads
+
+    def generation(self, user: Optional[str]) -> int:
+        return self._generations.get(user, 0)
+
+    def get(self, user: Optional[str], key: Any, record_miss: bool = True) -> Optional[List[str]]:
+        with self._lock:
+            entry = self._entries.get((user, key))
+            if entry is None or entry[0] <= time.monotonic() or entry[1] != self.generation(user):
+                if record_miss:
+                    self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end((user, key))
+            self._stats['hits'] += 1
+            return entry[2]
+
+    def put(self, user: Optional[str], key: Any, memories: List[str], generation: int) -> None:
+        """Cache ``memories`` unless the user was written to since ``generation`` was read."""
+        with self._lock:
+            if generation != self.generation(user):
+                return
+            self._entries[(user, key)] = (time.monotonic() + self.ttl, generation, list(memories))
+            self._entries.move_to_end((user, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user: Optional[str]) -> None:
+        with self._lock:
+            self._generations[user] = self.generation(user) + 1
+            self._stats['invalidations'] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, 'size': len(self._entries)}
+
+
+class Mem0WriteQueue:
+    """Bounded write-behind queue that batches Mem0 writes per user.
+
+    ``put`` returns as soon as the interaction is queued. A background
+    writer sends each user's queued interactions as one ``add_memory`` call
+    once ``max_batch_size`` have accumulated or ``flush_interval`` seconds
+    have passed. At most ``max_pending`` interactions are held; when full,
+    ``overflow`` decides what happens to a new one:
+
+    - ``"drop_oldest"``: discard the oldest queued interaction
+    - ``"drop_newest"``: discard the new interaction
+    - ``"block"``: wait until a write frees space (backpressure)
+
+    Queued memories are not visible to searches until they are written.
+    """
+
+    OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+    def __init__(
+        self,
+        mem0: SpoonMem0,
+        max_batch_size: int = 8,
+        flush_interval: float = 2.0,
+        max_pending: int = 1000,
+        overflow: str = "drop_oldest",
+    ):
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.mem0 = mem0
+        self.max_batch_size = max(1, max_batch_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max(1, max_pending)
+        self.overflow = overflow
+        # user id -> [time the oldest interaction was queued, queued interactions]
+        self._buckets: "OrderedDict[Optional[str], List[Any]]" = OrderedDict()
+        self._pending = 0
+        self._wake: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._closed = False
+        self._stats = {'queued': 0, 'dropped': 0, 'batches_written': 0, 'interactions_written': 0}
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._wake = asyncio.Event()
+            self._space = asyncio.Event()
+            self._write_lock = asyncio.Lock()
+            self._worker = asyncio.create_task(self._run())
+
+    async def put(self, messages: List[Any], user_id: Optional[str] = None) -> bool:
+        """Queue one interaction; returns False if it was dropped."""
+        if not messages:
+            return True
+        if self._closed:
+            raise RuntimeError("Mem0 write queue is closed")
+        self._ensure_worker()
+
+        while self._pending >= self.max_pending:
+            if self.overflow == "drop_newest":
+                self._stats['dropped'] += 1
+                logger.warning("Mem0 write queue full; dropping new memory")
+                return False
+            if self.overflow == "drop_oldest":
+                self._drop_oldest()
+                break
+            self._space.clear()
+            self._wake.set()
+            await self._space.wait()
+
+        user = user_id or self.mem0.user_id
+        bucket = self._buckets.get(user)
+        if bucket is None:
+            bucket = self._buckets[user] = [time.monotonic(), []]
+        bucket[1].append(list(messages))
+        self._pending += 1
+        self._stats['queued'] += 1
+        if len(bucket[1]) >= self.max_batch_size:
+            self._wake.set()
+        return True
+
+    def _drop_oldest(self) -> None:
+        user, (_, interactions) = next(iter(self._buckets.items()))
+        interactions.pop(0)
+        if not interactions:
+            del self._buckets[user]
+        self._pending -= 1
+        self._stats['dropped'] += 1
+        logger.warning("Mem0 write queue full; dropping oldest queued memory")
+
+    def _take(self, user: Optional[str]) -> List[List[Any]]:
+        queued_at, interactions = self._buckets[user]
+        batch, rest = interactions[:self.max_batch_size], interactions[self.max_batch_size:]
+        if rest:
+            self._buckets[user] = [queued_at, rest]
+        else:
+            del self._buckets[user]
+        self._pending -= len(batch)
+        self._space.set()
+        return batch
+
+    async def _write(self, user: Optional[str], batch: List[List[Any]]) -> None:
+        messages = [message for interaction in batch for message in interaction]
+        try:
+            await asyncio.to_thread(self.mem0.add_memory, messages, user)
+        except Exception as exc:  # add_memory logs its own failures
+            logger.warning("Mem0 batched write failed: %s", exc)
+            return
+        self._stats['batches_written'] += 1
+        self._stats['interactions_written'] += len(batch)
+
+    async def _flush_ready(self, force: bool = False) -> None:
+        """Write every batch that is full, has waited ``flush_interval``, or all when forced."""
+        async with self._write_lock:
+            now = time.monotonic()
+            for user in list(self._buckets):
+                while user in self._buckets:
+                    queued_at, interactions = self._buckets[user]
+                    due = force or now - queued_at >= self.flush_interval
+                    if not due and len(interactions) < self.max_batch_size:
+                        break
+                    await self._write(user, self._take(user))
+
+    async def _run(self) -> None:
+        try:
+            while not self._closed:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                # A blocked producer needs space now, whatever the batch sizes
+                await self._flush_ready(force=self._pending >= self.max_pending)
+        except asyncio.CancelledError:
+            # Cancelled without close(), e.g. asyncio.run() tearing down the
+            # loop: write what is still queued rather than losing it
+            if self._pending:
+                await self._flush_ready(force=True)
+            raise
+
+    async def flush(self) -> None:
+        """Write everything queued so far."""
+        if self._write_lock is None:
+            return
+        await self._flush_ready(force=True)
+
+    async def close(self) -> None:
+        """Stop accepting writes, flush the queue and stop the writer."""
+        self._closed = True
+        if self._worker is not None:
+            self._wake.set()
+            try:
+                await self._worker
+            except Exception as exc:
+                logger.warning("Mem0 writer stopped with an error: %s", exc)
+            self._worker = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, 'pending': self._pending, 'users': len(self._buckets)}
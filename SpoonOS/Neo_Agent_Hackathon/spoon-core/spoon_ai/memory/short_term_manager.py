@@ -1,13 +1,15 @@
 """Short-term memory management for conversation history."""
 
+import hashlib
 import logging
-import math
 import uuid
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from typing import List, Optional, Dict, Any, Tuple, Set
 
 from spoon_ai.schema import Message, SystemMessage
+from spoon_ai.llm.token_counter import TokenCounter, get_token_counter, heuristic_message_tokens
 from spoon_ai.graph.checkpointer import InMemoryCheckpointer
 from spoon_ai.graph.types import StateSnapshot
 from .remove_message import RemoveMessage, REMOVE_ALL_MESSAGES
@@ -23,54 +25,69 @@ class TrimStrategy(str, Enum):
 
 
 class MessageTokenCounter:
-    """Approximate token counter aligned with LangChain semantics."""
+    """Token counter for message lists, aligned with LangChain semantics.
+
+    Delegates to a ``TokenCounter``, which uses the model's tokenizer when one
+    is available locally and the characters / 4 approximation otherwise, and
+    caches per-message counts.
+    """
+
+    def __init__(self, token_counter: Optional[TokenCounter] = None):
+        self.token_counter = token_counter or get_token_counter()
 
     async def count_tokens(
         self, messages: List[Message], model: Optional[str] = None
     ) -> int:
-        return self._approximate_count(messages)
+        return self.token_counter.count_tokens(messages, model)
+
+    async def count_message_tokens(
+        self, messages: List[Message], model: Optional[str] = None
+    ) -> List[int]:
+        """Per-message token counts, in order."""
+        return self.token_counter.count_messages(messages, model)
 
     @staticmethod
     def _approximate_count(messages: List[Message]) -> int:
-        chars_per_token = 4.0
-        extra_tokens_per_message = 3.0
-        token_count = 0.0
-
-        for message in messages:
-            message_chars = 0
-
-            content = message.content
-            if isinstance(content, str):
-                message_chars += len(content)
-            elif content is not None:
-                message_chars += len(repr(content))
-
-            if (
-                message.role == "assistant"
-                and message.tool_calls
-                and not isinstance(message.content, list)
-            ):
-                message_chars += len(repr(message.tool_calls))
+        return max(1, sum(heuristic_message_tokens(message) for message in messages))
 
-            if message.role == "tool" and message.tool_call_id:
-                message_chars += len(message.tool_call_id)
 
-            message_chars += len(message.role or "")
+def _ensure_message_ids(messages: List[Message]) -> None:
+    for message in messages:
+        if not getattr(message, "id", None):
+            message.id = str(uuid.uuid4())
+
 
-            if message.name:
-                message_chars += len(message.name)
+def _split_pinned(messages: List[Message]) -> Tuple[List[Message], List[Message]]:
+    """Split off the leading system messages, which are never summarized."""
+    index = 0
+    while index < len(messages) and messages[index].role == "system":
+        index += 1
+    return messages[:index], messages[index:]
 
-            token_count += math.ceil(message_chars / chars_per_token)
-            token_count += extra_tokens_per_message
 
-        total = math.ceil(token_count)
-        return max(1, total)
+def _prefix_digest(messages: List[Message], count: int) -> bytes:
+    """Digest identifying the first ``count`` messages of a conversation."""
+    prefix_hash = hashlib.blake2b(digest_size=16)
+    for message in messages[:count]:
+        prefix_hash.update(message.digest())
+        prefix_hash.update((message.tool_call_id or "").encode())
+        for call in message.tool_calls or []:
+            prefix_hash.update(call.id.encode())
+    return prefix_hash.digest()
 
 
-def _ensure_message_ids(messages: List[Message]) -> None:
-    for message in messages:
-        if not getattr(message, "id", None):
-            message.id = str(uuid.uuid4())
+@dataclass(frozen=True)
+class SummaryWatermark:
+    """A rolling summary and the conversation prefix it covers.
+
+    ``covered`` counts conversation messages (after the leading system
+    messages) folded into ``summary``; ``digest`` identifies them, so a
+    watermark is only reused for the conversation it was built from.
+    """
+
+    summary: str
+    covered: int
+    digest: bytes
 
 
 class ShortTermMemoryManager:
@@ -105,12 +122,38 @@ class ShortTermMemoryManager:
                     return idx
         return None
 
+    @staticmethod
+    def _map_tool_messages_to_assistants(messages: List[Message]) -> Dict[int, Optional[int]]:
+        """Map each tool message index to the nearest earlier assistant that issued its call.
+
+        Equivalent to ``_find_assistant_index_for_tool`` for every tool
+        message, in a single forward pass.
+        """
+        latest_issuer: Dict[str, int] = {}
+        parents: Dict[int, Optional[int]] = {}
+        for idx, message in enumerate(messages):
+            if message.role == "tool" and message.tool_call_id:
+                parents[idx] = latest_issuer.get(message.tool_call_id)
+            if message.role == "assistant" and message.tool_calls:
+                for call in message.tool_calls:
+                    latest_issuer[call.id] = idx
+        return parents
+
+    async def _message_token_costs(self, messages: List[Message], model: Optional[str]) -> List[int]:
+        """Token cost of each message, computed once per trim or summary pass."""
+        count_message_tokens = getattr(self.token_counter, "count_message_tokens", None)
+        if count_message_tokens is not None:
+            return list(await count_message_tokens(messages, model))
+        # Custom counters without a batch API are assumed to be additive per message
+        return [await self.token_counter.count_tokens([message], model) for message in messages]
+
     async def _apply_tool_call_dependencies(
         self,
         messages: List[Message],
         keep_indices: Set[int],
         max_tokens: Optional[int] = None,
         model: Optional[str] = None,
+        token_costs: Optional[List[int]] = None,
     ) -> Set[int]:
         """
         Ensure tool messages are only kept when their originating assistant messages are also kept.
@@ -120,15 +163,20 @@ class ShortTermMemoryManager:
             return keep_indices
 
         updated_indices = set(keep_indices)
+        parents = self._map_tool_messages_to_assistants(messages)
+        if max_tokens is not None and token_costs is None:
+            token_costs = await self._message_token_costs(messages, model)
+        kept_tokens = sum(token_costs[i] for i in updated_indices) if max_tokens is not None else 0
 
-        for idx in sorted(list(keep_indices)):
-            message = messages[idx]
-            if message.role != "tool" or not message.tool_call_id:
+        for idx in sorted(keep_indices):
+            if idx not in parents:
                 continue
 
-            assistant_idx = self._find_assistant_index_for_tool(messages, idx)
+            assistant_idx = parents[idx]
             if assistant_idx is None:
-                updated_indices.discard(idx)
+                if idx in updated_indices:
+                    updated_indices.discard(idx)
+                    kept_tokens -= token_costs[idx] if max_tokens is not None else 0
                 continue
 
             if assistant_idx in updated_indices:
@@ -138,14 +186,12 @@ class ShortTermMemoryManager:
                 updated_indices.add(assistant_idx)
                 continue
 
-            proposed_indices = sorted(updated_indices | {assistant_idx})
-            proposed_messages = [messages[i] for i in proposed_indices]
-            token_cost = await self.token_counter.count_tokens(proposed_messages, model)
-
-            if token_cost <= max_tokens:
+            if max(1, kept_tokens + token_costs[assistant_idx]) <= max_tokens:
                 updated_indices.add(assistant_idx)
-            else:
+                kept_tokens += token_costs[assistant_idx]
+            elif idx in updated_indices:
                 updated_indices.discard(idx)
+                kept_tokens -= token_costs[idx]
 
         return updated_indices
 
@@ -157,7 +203,11 @@ class ShortTermMemoryManager:
         keep_system: bool = True,
         model: Optional[str] = None,
     ) -> List[Message]:
-        """Trim messages using a LangChain-style heuristic."""
+        """Trim messages using a LangChain-style heuristic.
+
+        Each message is costed once and the budget is tracked as a running
+        sum, so trimming is linear in the history length.
+        """
         if not messages:
             return []
 
@@ -166,12 +216,13 @@ class ShortTermMemoryManager:
         if strategy not in {TrimStrategy.FROM_END, TrimStrategy.FROM_START}:
             raise ValueError(f"Unsupported trim strategy: {strategy}")
 
-        total_tokens = await self.token_counter.count_tokens(messages, model)
+        token_costs = await self._message_token_costs(messages, model)
+        total_tokens = max(1, sum(token_costs))
         if total_tokens <= max_tokens:
             return messages
 
         system_message: Optional[Message] = None
-        remaining = messages
+        offset = 0
         if (
             keep_system
             and strategy == TrimStrategy.FROM_END
@@ -179,24 +230,25 @@ class ShortTermMemoryManager:
             and messages[0].role == "system"
         ):
             system_message = messages[0]
-            remaining = messages[1:]
+            offset = 1
+        remaining = messages[offset:]
 
         if strategy == TrimStrategy.FROM_END:
-            kept: List[Message] = []
-            for message in reversed(remaining):
-                trial = [message] + kept
-                candidate = ([system_message] if system_message else []) + trial
-                token_cost = await self.token_counter.count_tokens(candidate, model)
-                if token_cost <= max_tokens or not kept:
-                    kept = trial
+            kept: List[Message] = []  # newest first
+            used = token_costs[0] if system_message is not None else 0
+            for idx in range(len(messages) - 1, offset - 1, -1):
+                if used + token_costs[idx] <= max_tokens or not kept:
+                    kept.append(messages[idx])
+                    used += token_costs[idx]
+            kept.reverse()
             trimmed = ([system_message] if system_message else []) + kept
         else:
-            kept: List[Message] = []
-            for message in remaining:
-                trial = kept + [message]
-                token_cost = await self.token_counter.count_tokens(trial, model)
-                if token_cost <= max_tokens or not kept:
-                    kept = trial
+            kept = []
+            used = 0
+            for idx, message in enumerate(remaining):
+                if used + token_costs[idx] <= max_tokens or not kept:
+                    kept.append(message)
+                    used += token_costs[idx]
                 else:
                     break
             trimmed = kept
@@ -216,6 +268,7 @@ class ShortTermMemoryManager:
             trimmed_indices,
             max_tokens=max_tokens,
             model=model,
+            token_costs=token_costs,
         )
         trimmed = [messages[i] for i in sorted(trimmed_indices)]
 
@@ -320,6 +373,97 @@ class ShortTermMemoryManager:
 
         return messages_for_llm, removals, summary_text
 
+    def resolve_watermark(
+        self, messages: List[Message], watermark: Optional[SummaryWatermark]
+    ) -> Optional[SummaryWatermark]:
+        """Return ``watermark`` if it still covers a prefix of ``messages``, else None."""
+        if watermark is None:
+            return None
+        _, conversation = _split_pinned(messages)
+        if watermark.covered > len(conversation):
+            return None
+        if _prefix_digest(conversation, watermark.covered) != watermark.digest:
+            return None
+        return watermark
+
+    def apply_summary(
+        self, messages: List[Message], watermark: Optional[SummaryWatermark]
+    ) -> Tuple[List[Message], List[RemoveMessage]]:
+        """Replace the prefix covered by ``watermark`` with its summary.
+
+        The watermark must already be resolved against ``messages``. Returns
+        the messages to send and removal directives for the covered messages.
+        """
+        if watermark is None or not watermark.covered:
+            return list(messages), []
+
+        pinned, conversation = _split_pinned(messages)
+        covered = conversation[:watermark.covered]
+        _ensure_message_ids(covered)
+        summary_message = SystemMessage(
+            id=f"summary-{watermark.digest.hex()}",
+            content=f"[CONVERSATION SUMMARY]\n{watermark.summary}",
+        )
+        removals = [RemoveMessage(id=message.id) for message in covered]
+        return pinned + [summary_message] + conversation[watermark.covered:], removals
+
+    async def summarize_incremental(
+        self,
+        messages: List[Message],
+        watermark: Optional[SummaryWatermark] = None,
+        messages_to_keep: int = 5,
+        summary_model: Optional[str] = None,
+        llm_manager=None,
+        llm_provider: Optional[str] = None,
+        priority: Optional[str] = None,
+    ) -> Optional[SummaryWatermark]:
+        """Fold the messages added since ``watermark`` into its summary.
+
+        Only the previous summary text and the messages between the watermark
+        and the last ``messages_to_keep`` are sent to the LLM. Returns the
+        advanced watermark, or the resolved ``watermark`` unchanged when there
+        is nothing to fold or the call fails.
+        """
+        watermark = self.resolve_watermark(messages, watermark)
+        covered = watermark.covered if watermark else 0
+        _, conversation = _split_pinned(messages)
+
+        cut = max(len(conversation) - messages_to_keep, covered)
+        # Keep tool results together with the assistant message that requested them
+        while covered < cut < len(conversation) and conversation[cut].role == "tool":
+            cut -= 1
+        if cut <= covered or not llm_manager:
+            return watermark
+
+        if watermark:
+            summary_prompt = (
+                "This is a summary of the conversation to date: "
+                f"{watermark.summary}\n\n"
+                "Extend the summary by taking into account the new messages above:"
+            )
+        else:
+            summary_prompt = "Create a summary of the conversation above:"
+
+        chat_kwargs = {
+            "messages": conversation[covered:cut] + [Message(role="user", content=summary_prompt)],
+            "provider": llm_provider,
+        }
+        if summary_model is not None:
+            chat_kwargs["model"] = summary_model
+        if priority is not None:
+            chat_kwargs["priority"] = priority
+
+        try:
+            response = await llm_manager.chat(**chat_kwargs)
+        except Exception as exc:
+            logger.error("Failed to extend summary: %s", exc)
+            return watermark
+        if not response.content:
+            return watermark
+
+        logger.info("Summarized %d new messages (%d covered)", cut - covered, cut)
+        return SummaryWatermark(response.content, cut, _prefix_digest(conversation, cut))
+
     def save_checkpoint(
         self,
         thread_id: str,
@@ -1,10 +1,11 @@
+import hashlib
 import json
 from enum import Enum
 from typing import Any, List, Literal, Optional, Union
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class Function(BaseModel):
@@ -90,6 +91,25 @@ class Message(BaseModel):
     name: Optional[str] = Field(default=None)
     tool_call_id: Optional[str] = Field(default=None)
 
+    # (role, content, digest) from the last digest() call
+    _digest_cache: Optional[tuple] = PrivateAttr(default=None)
+
+    def digest(self) -> bytes:
+        """Return a 16-byte digest of the message role and content.
+
+        The digest is memoized on the message and reused for as long as the
+        role and content objects are unchanged, so hashing a long
+        conversation only costs the messages that are new or were edited.
+        """
+        cached = self._digest_cache
+        if cached is not None and cached[0] is self.role and cached[1] is self.content:
+            return cached[2]
+        content = self.content
+        payload = json.dumps([self.role, content]).encode()
+        digest = hashlib.blake2b(payload, digest_size=16).digest()
+        self._digest_cache = (self.role, content, digest)
+        return digest
+
 class SystemMessage(Message):
     role: ROLE_TYPE = Field(default=Role.SYSTEM.value)  # type: ignore
 
@@ -0,0 +1,408 @@
+"""
+Benchmark harness for the spoon_ai.graph execution engine.
+
+Runs synthetic graphs built from stub nodes (and a local fake LLM provider
+registered through ``spoon_ai.llm.registry.register_provider``) and reports
+throughput, allocation and latency figures as JSON that can be diffed between
+releases.
+
+Usage:
+    python tests/benchmarks/graph_benchmark.py                      # all presets
+    python tests/benchmarks/graph_benchmark.py -p linear_chain -n 50
+    python tests/benchmarks/graph_benchmark.py -o before.json
+    python tests/benchmarks/graph_benchmark.py --compare before.json after.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import math
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Annotated, Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, TypedDict
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from spoon_ai.graph import END, InMemoryCheckpointer, SQLiteCheckpointer, StateGraph, add_messages  # noqa: E402
+from spoon_ai.llm.interface import (  # noqa: E402
+    LLMProviderInterface,
+    LLMResponse,
+    ProviderCapability,
+    ProviderMetadata,
+)
+from spoon_ai.llm.registry import get_global_registry, register_provider  # noqa: E402
+from spoon_ai.schema import LLMResponseChunk, Message  # noqa: E402
+
+FAKE_PROVIDER_NAME = "benchmark_fake"
+
+
+# ---------------------------------------------------------------------------
+# Fake LLM provider
+# ---------------------------------------------------------------------------
+
+
+@register_provider(FAKE_PROVIDER_NAME, [
+    ProviderCapability.CHAT,
+    ProviderCapability.COMPLETION,
+    ProviderCapability.TOOLS,
+    ProviderCapability.STREAMING,
+])
+class FakeLLMProvider(LLMProviderInterface):
+    """Deterministic in-process provider with configurable latency.
+
+    Config keys: ``latency`` (seconds per call, default 0) and ``reply``
+    (response text, default echoes the last message).
+    """
+
+    def __init__(self):
+        self.latency = 0.0
+        self.reply: Optional[str] = None
+        self.calls = 0
+
+    async def initialize(self, config: Dict[str, Any]) -> None:
+        self.latency = float(config.get("latency", 0.0))
+        self.reply = config.get("reply")
+
+    async def _respond(self, text: str) -> LLMResponse:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        else:
+            await asyncio.sleep(0)
+        content = self.reply if self.reply is not None else f"echo: {text}"
+        return LLMResponse(
+            content=content,
+            provider=FAKE_PROVIDER_NAME,
+            model="fake",
+            finish_reason="stop",
+            native_finish_reason="stop",
+            usage={"prompt_tokens": len(text) // 4, "completion_tokens": len(content) // 4},
+        )
+
+    async def chat(self, messages: List[Message], **kwargs) -> LLMResponse:
+        return await self._respond(messages[-1].content or "" if messages else "")
+
+    async def chat_stream(self, messages: List[Message], callbacks=None, **kwargs) -> AsyncIterator[LLMResponseChunk]:
+        response = await self.chat(messages, **kwargs)
+        yield LLMResponseChunk(
+            content=response.content,
+            delta=response.content,
+            provider=FAKE_PROVIDER_NAME,
+            model="fake",
+            finish_reason="stop",
+        )
+
+    async def completion(self, prompt: str, **kwargs) -> LLMResponse:
+        return await self._respond(prompt)
+
+    async def chat_with_tools(self, messages: List[Message], tools: List[Dict], **kwargs) -> LLMResponse:
+        return await self.chat(messages, **kwargs)
+
+    def get_metadata(self) -> ProviderMetadata:
+        return ProviderMetadata(
+            name=FAKE_PROVIDER_NAME,
+            version="1.0.0",
+            capabilities=list(self._declared_capabilities),
+            max_tokens=128000,
+            supports_system_messages=True,
+        )
+
+    async def health_check(self) -> bool:
+        return True
+
+    async def cleanup(self) -> None:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Scenarios
+# ---------------------------------------------------------------------------
+
+
+class BenchState(TypedDict, total=False):
+    counter: int
+    messages: Annotated[List[Any], add_messages]
+    data: Dict[str, Any]
+    payload: Dict[str, Any]
+
+
+@dataclass
+class Scenario:
+    """A benchmark preset: a graph, its input and the steps one run executes."""
+
+    name: str
+    description: str
+    build: Callable[[Dict[str, Any]], Any]
+    initial_state: Callable[[Dict[str, Any]], Dict[str, Any]]
+    steps: Callable[[Dict[str, Any]], int]
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+def _increment(state: Dict[str, Any]) -> Dict[str, Any]:
+    return {"counter": state.get("counter", 0) + 1}
+
+
+def _chain(graph: StateGraph, names: List[str]) -> StateGraph:
+    for current, following in zip(names, names[1:]):
+        graph.add_edge(current, following)
+    graph.add_edge(names[-1], END)
+    graph.set_entry_point(names[0])
+    return graph
+
+
+def _build_linear_chain(params: Dict[str, Any]):
+    graph = StateGraph(BenchState)
+    names = [f"step_{i}" for i in range(params["length"])]
+    for name in names:
+        graph.add_node(name, _increment)
+    return _chain(graph, names).compile(checkpointer=InMemoryCheckpointer())
+
+
+def _build_wide_parallel(params: Dict[str, Any]):
+    graph = StateGraph(BenchState)
+    names = [f"branch_{i}" for i in range(params["width"])]
+    for name in names:
+        graph.add_node(name, lambda state, _name=name: {"data": {_name: state.get("counter", 0)}})
+    graph.add_node("join", _increment)
+    graph.add_parallel_group("fan_out", names, {"branch_isolation": params.get("branch_isolation", True)})
+    graph.add_edge(names[0], "join")
+    graph.add_edge("join", END)
+    graph.set_entry_point(names[0])
+    return graph.compile(checkpointer=InMemoryCheckpointer())
+
+
+def _build_deep_messages(params: Dict[str, Any]):
+    graph = StateGraph(BenchState)
+    names = [f"turn_{i}" for i in range(params["turns"])]
+    for i, name in enumerate(names):
+        graph.add_node(name, lambda state, _i=i: {"messages": [{"role": "assistant", "content": f"turn {_i}"}]})
+    return _chain(graph, names).compile(checkpointer=InMemoryCheckpointer())
+
+
+def _build_heavy_checkpoint(params: Dict[str, Any]):
+    graph = StateGraph(BenchState)
+    names = [f"step_{i}" for i in range(params["length"])]
+    for name in names:
+        graph.add_node(name, lambda state, _name=name: {"counter": state.get("counter", 0) + 1, "data": {_name: True}})
+    return _chain(graph, names).compile(checkpointer=SQLiteCheckpointer(":memory:"))
+
+
+def _build_llm_chain(params: Dict[str, Any]):
+    provider = get_global_registry().get_provider(FAKE_PROVIDER_NAME, {"latency": params.get("latency", 0.0)})
+    provider.latency = params.get("latency", 0.0)
+
+    async def call_llm(state: Dict[str, Any]) -> Dict[str, Any]:
+        response = await provider.chat([Message(role="user", content=f"step {state.get('counter', 0)}")])
+        return {"counter": state.get("counter", 0) + 1, "messages": [{"role": "assistant", "content": response.content}]}
+
+    graph = StateGraph(BenchState)
+    names = [f"llm_{i}" for i in range(params["length"])]
+    for name in names:
+        graph.add_node(name, call_llm)
+    return _chain(graph, names).compile(checkpointer=InMemoryCheckpointer())
+
+
+def _base_state(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {"counter": 0, "messages": [], "data": {}}
+
+
+def _deep_messages_state(params: Dict[str, Any]) -> Dict[str, Any]:
+    history = [{"role": "user" if i % 2 else "assistant", "content": f"message {i}"} for i in range(params["history"])]
+    return {"counter": 0, "messages": history, "data": {}}
+
+
+def _heavy_state(params: Dict[str, Any]) -> Dict[str, Any]:
+    blob = "x" * params["payload_bytes"]
+    return {"counter": 0, "messages": [], "data": {}, "payload": {f"k{i}": blob for i in range(params["payload_keys"])}}
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario(
+            "linear_chain", "Long chain of trivial nodes",
+            _build_linear_chain, _base_state, lambda p: p["length"], {"length": 200},
+        ),
+        Scenario(
+            "wide_parallel", "One isolated fan-out group followed by a join node",
+            _build_wide_parallel, _base_state, lambda p: p["width"] + 1, {"width": 64, "branch_isolation": True},
+        ),
+        Scenario(
+            "deep_messages", "Nodes appending to a long message history",
+            _build_deep_messages, _deep_messages_state, lambda p: p["turns"], {"turns": 50, "history": 2000},
+        ),
+        Scenario(
+            "heavy_checkpoint", "Large state checkpointed to SQLite on every step",
+            _build_heavy_checkpoint, _heavy_state, lambda p: p["length"],
+            {"length": 50, "payload_keys": 32, "payload_bytes": 4096},
+        ),
+        Scenario(
+            "llm_chain", "Chain of nodes calling the fake LLM provider",
+            _build_llm_chain, _base_state, lambda p: p["length"], {"length": 50, "latency": 0.0},
+        ),
+    )
+}
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class BenchmarkResult:
+    scenario: str
+    params: Dict[str, Any]
+    iterations: int
+    steps_per_run: int
+    steps_per_sec: float
+    runs_per_sec: float
+    latency_ms: Dict[str, float]
+    alloc_bytes_per_step: float
+    peak_alloc_bytes: int
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(math.ceil(pct / 100.0 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+async def _run_scenario(scenario: Scenario, params: Dict[str, Any], iterations: int, warmup: int) -> BenchmarkResult:
+    compiled = scenario.build(params)
+    steps = scenario.steps(params)
+    max_iterations = steps + 10
+
+    async def run_once() -> float:
+        state = scenario.initial_state(params)
+        start = time.perf_counter()
+        await compiled.invoke(state, {"max_iterations": max_iterations})
+        return time.perf_counter() - start
+
+    for _ in range(warmup):
+        await run_once()
+
+    gc.collect()
+    latencies = [await run_once() for _ in range(iterations)]
+    total = sum(latencies)
+
+    # Allocation pass: tracemalloc slows execution, so it is measured separately.
+    gc.collect()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        await run_once()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return BenchmarkResult(
+        scenario=scenario.name,
+        params=params,
+        iterations=iterations,
+        steps_per_run=steps,
+        steps_per_sec=steps * iterations / total if total else 0.0,
+        runs_per_sec=iterations / total if total else 0.0,
+        latency_ms={
+            "mean": total / iterations * 1000.0,
+            "p50": _percentile(latencies, 50) * 1000.0,
+            "p95": _percentile(latencies, 95) * 1000.0,
+            "p99": _percentile(latencies, 99) * 1000.0,
+            "max": latencies[-1] * 1000.0,
+        },
+        alloc_bytes_per_step=(peak - before) / steps if steps else 0.0,
+        peak_alloc_bytes=peak - before,
+    )
+
+
+async def run_benchmarks(
+    presets: Optional[List[str]] = None,
+    iterations: int = 20,
+    warmup: int = 2,
+    overrides: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Run the selected presets and return a JSON-serializable report."""
+    names = presets or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise ValueError(f"Unknown preset(s): {', '.join(unknown)}. Available: {', '.join(SCENARIOS)}")
+
+    results = []
+    for name in names:
+        scenario = SCENARIOS[name]
+        params = {**scenario.params, **{k: v for k, v in (overrides or {}).items() if k in scenario.params}}
+        results.append(asdict(await _run_scenario(scenario, params, iterations, warmup)))
+
+    return {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare_reports(before: Dict[str, Any], after: Dict[str, Any]) -> List[Tuple[str, str, float, float, float]]:
+    """Rows of (scenario, metric, before, after, relative change) for shared scenarios."""
+    old = {result["scenario"]: result for result in before.get("results", [])}
+    rows = []
+    for result in after.get("results", []):
+        previous = old.get(result["scenario"])
+        if previous is None:
+            continue
+        for metric, getter in (
+            ("steps_per_sec", lambda r: r["steps_per_sec"]),
+            ("p99_ms", lambda r: r["latency_ms"]["p99"]),
+            ("alloc_bytes_per_step", lambda r: r["alloc_bytes_per_step"]),
+        ):
+            a, b = getter(previous), getter(result)
+            rows.append((result["scenario"], metric, a, b, (b - a) / a if a else 0.0))
+    return rows
+
+
+def _parse_override(text: str) -> Tuple[str, Any]:
+    key, _, value = text.partition("=")
+    try:
+        return key, json.loads(value)
+    except json.JSONDecodeError:
+        return key, value
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the spoon_ai graph engine")
+    parser.add_argument("-p", "--preset", action="append", choices=list(SCENARIOS), help="preset to run (repeatable)")
+    parser.add_argument("-n", "--iterations", type=int, default=20)
+    parser.add_argument("-w", "--warmup", type=int, default=2)
+    parser.add_argument("-s", "--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="override a preset parameter, e.g. -s length=500")
+    parser.add_argument("-o", "--output", help="write the JSON report to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="diff two JSON reports")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        before, after = (json.loads(Path(path).read_text()) for path in args.compare)
+        for scenario, metric, a, b, change in compare_reports(before, after):
+            print(f"{scenario:<18} {metric:<22} {a:>14.2f} {b:>14.2f} {change:>+8.1%}")
+        return 0
+
+    logging.getLogger("spoon_ai").setLevel(logging.WARNING)
+    overrides = dict(_parse_override(item) for item in args.set)
+    report = asyncio.run(run_benchmarks(args.preset, args.iterations, args.warmup, overrides))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text)
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+"""
+Smoke tests for the graph benchmark harness (tiny presets, no timing asserts).
+"""
+
+import pytest
+
+from graph_benchmark import FAKE_PROVIDER_NAME, SCENARIOS, compare_reports, run_benchmarks
+from spoon_ai.llm.registry import get_global_registry
+
+
+@pytest.mark.asyncio
+async def test_all_presets_produce_report():
+    overrides = {"length": 3, "width": 3, "turns": 3, "history": 10, "payload_keys": 2, "payload_bytes": 16}
+    report = await run_benchmarks(iterations=2, warmup=0, overrides=overrides)
+
+    results = {result["scenario"]: result for result in report["results"]}
+    assert set(results) == set(SCENARIOS)
+    for result in results.values():
+        assert result["steps_per_sec"] > 0
+        assert result["latency_ms"]["p99"] >= result["latency_ms"]["p50"]
+
+    rows = compare_reports(report, report)
+    assert rows and all(change == 0 for *_, change in rows)
+
+
+def test_fake_provider_is_registered():
+    assert get_global_registry().is_registered(FAKE_PROVIDER_NAME)
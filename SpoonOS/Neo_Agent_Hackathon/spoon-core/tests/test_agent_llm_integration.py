@@ -297,6 +297,32 @@ class TestAgentLLMIntegration:
         execution_time = end_time - start_time
         assert execution_time < 1.0  # Should complete in less than 1 second
     
+    @pytest.mark.asyncio
+    async def test_agent_flushes_queued_memories(self, tool_manager):
+        """Test that run() flushes write-behind Mem0 writes and shutdown() closes the client."""
+        from spoon_ai.llm.manager import LLMManager
+        from spoon_ai.memory.mem0_client import SpoonMem0
+
+        manager = Mock(spec=LLMManager)
+        manager.chat_with_tools = AsyncMock(return_value=LLMResponse(
+            content="NEO is up", provider="openai", model="gpt-4.1", finish_reason="stop", native_finish_reason="stop"))
+        with patch('spoon_ai.chat.get_llm_manager', return_value=manager):
+            chatbot = ChatBot(llm_provider="openai")
+        agent = ToolCallAgent(name="memory_agent", llm=chatbot, available_tools=tool_manager)
+
+        mem0 = SpoonMem0({"user_id": "alice", "write_behind": True, "write_flush_interval": 60})
+        mem0.client = Mock(add=Mock(), search=Mock(return_value={"results": []}))
+        chatbot.mem0_client = mem0
+        chatbot.mem0_user_id = "alice"
+
+        await agent.run("Price of NEO?")
+        assert mem0.client.add.call_count == 1
+        assert mem0.write_queue.pending == 0
+
+        await agent.shutdown(timeout=1)
+        with pytest.raises(RuntimeError):
+            await mem0.aadd_memory([{"role": "user", "content": "late"}])
+
     def test_agent_configuration_compatibility(self):
         """Test that agent configuration works with both architectures."""
         # Test with manager architecture
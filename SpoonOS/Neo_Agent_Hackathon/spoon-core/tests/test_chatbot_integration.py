@@ -257,6 +257,99 @@ class TestAgentIntegration:
         assert "Agent response" in result
 
 
+class TestIncrementalSummary:
+    """Test watermark-based and background summarization."""
+
+    @pytest.fixture
+    def mock_llm_manager(self):
+        manager = Mock(spec=LLMManager)
+        manager.summary_calls = []
+        manager.release = asyncio.Event()
+        manager.release.set()
+
+        async def chat(messages, **kwargs):
+            prompt = messages[-1].content
+            if prompt.startswith(("Create a summary", "This is a summary")):
+                manager.summary_calls.append((messages, kwargs))
+                await manager.release.wait()
+                return ManagerLLMResponse(content=f"summary {len(manager.summary_calls)}", provider="openai",
+                                          model="gpt-4.1", finish_reason="stop", native_finish_reason="stop")
+            manager.last_request = messages
+            return ManagerLLMResponse(content="ok", provider="openai", model="gpt-4.1",
+                                      finish_reason="stop", native_finish_reason="stop")
+
+        manager.chat = AsyncMock(side_effect=chat)
+        return manager
+
+    def make_chatbot(self, mock_llm_manager, **config):
+        from spoon_ai.llm.token_counter import TokenCounter
+        from spoon_ai.memory.short_term_manager import MessageTokenCounter
+
+        with patch('spoon_ai.chat.get_llm_manager', return_value=mock_llm_manager):
+            return ChatBot(
+                llm_provider="openai",
+                token_counter=MessageTokenCounter(TokenCounter(allow_download=False)),
+                short_term_memory_config={"max_tokens": 200, "messages_to_keep": 2, **config},
+            )
+
+    @staticmethod
+    def history(count):
+        # 10 heuristic tokens per message
+        return [{"role": "user", "content": f"message {i:02d} " + "x" * 13} for i in range(count)]
+
+    @pytest.mark.asyncio
+    async def test_only_new_messages_are_summarized(self, mock_llm_manager):
+        chatbot = self.make_chatbot(mock_llm_manager, incremental_summary=True)
+
+        await chatbot.ask(self.history(19), system_msg="be brief")
+        assert mock_llm_manager.summary_calls == []
+
+        await chatbot.ask(self.history(24), system_msg="be brief")
+        sent, _ = mock_llm_manager.summary_calls[0]
+        assert [m.content[:10] for m in sent[:-1]] == [f"message {i:02d}" for i in range(22)]
+        assert [m.content for m in mock_llm_manager.last_request[:2]] == ["be brief", "[CONVERSATION SUMMARY]\nsummary 1"]
+        assert len(mock_llm_manager.last_request) == 4
+
+        # Below the limit again: the summary is reused without another call
+        await chatbot.ask(self.history(30), system_msg="be brief")
+        assert len(mock_llm_manager.summary_calls) == 1
+
+        await chatbot.ask(self.history(50), system_msg="be brief")
+        sent, _ = mock_llm_manager.summary_calls[1]
+        assert [m.content[:10] for m in sent[:-1]] == [f"message {i:02d}" for i in range(22, 48)]
+        assert "summary 1" in sent[-1].content
+        assert chatbot.latest_summary == "summary 2"
+        assert len(chatbot.latest_removals) == 48
+
+        # A different conversation does not reuse the watermark
+        await chatbot.ask([{"role": "user", "content": "new topic"}])
+        assert len(mock_llm_manager.last_request) == 1
+
+    @pytest.mark.asyncio
+    async def test_background_summary_never_blocks_ask(self, mock_llm_manager):
+        chatbot = self.make_chatbot(mock_llm_manager, background_summary=True)
+        mock_llm_manager.release.clear()
+
+        # 170 tokens: past the 80% trigger, within the limit
+        assert await chatbot.ask(self.history(17)) == "ok"
+        assert len(mock_llm_manager.last_request) == 17
+        await asyncio.sleep(0)
+        assert len(mock_llm_manager.summary_calls) == 1
+        assert mock_llm_manager.summary_calls[0][1]["priority"] == "batch"
+
+        # Over the limit while the summary is still running: trimmed, not blocked
+        assert await asyncio.wait_for(chatbot.ask(self.history(25)), timeout=1) == "ok"
+        assert len(mock_llm_manager.last_request) == 20
+        assert len(mock_llm_manager.summary_calls) == 1
+
+        mock_llm_manager.release.set()
+        assert await chatbot.wait_for_background_summary() == "summary 1"
+
+        await chatbot.ask(self.history(25))
+        assert mock_llm_manager.last_request[0].content == "[CONVERSATION SUMMARY]\nsummary 1"
+        assert len(mock_llm_manager.last_request) == 1 + 25 - 15
+
+
 class TestPerformanceOptimization:
     """Test performance optimizations and caching."""
     
@@ -16,11 +16,15 @@ import asyncio
 from typing import List, Dict, Any, Annotated, TypedDict, Literal
 from unittest.mock import Mock, AsyncMock, patch
 import operator
+import time
 
 from spoon_ai.graph import (
     StateGraph, 
     CompiledGraph,
     InMemoryCheckpointer,
+    SQLiteCheckpointer,
+    CopyOnWriteState,
+    FrozenState,
     Command,
     StateSnapshot,
     interrupt,
@@ -386,5 +390,722 @@ class TestCompiledGraph:
         assert checkpoints[0] == snapshot
 
 
+class TestSQLiteCheckpointer:
+    """Test the disk-backed delta checkpointer."""
+
+    @staticmethod
+    def _snapshot(values, iteration, checkpoint_id=None):
+        from datetime import datetime
+        metadata = {"iteration": iteration}
+        if checkpoint_id:
+            metadata["checkpoint_id"] = checkpoint_id
+        return StateSnapshot(
+            values=values,
+            next=("node_a",),
+            config={},
+            metadata=metadata,
+            created_at=datetime.now(),
+        )
+
+    def test_stores_only_changed_keys(self, tmp_path):
+        checkpointer = SQLiteCheckpointer(tmp_path / "checkpoints.db")
+        big = ["x" * 100] * 50
+        checkpointer.save_checkpoint("t1", self._snapshot({"messages": big, "counter": 0}, 1, "c0"))
+        checkpointer.save_checkpoint("t1", self._snapshot({"messages": big, "counter": 1}, 2, "c1"))
+
+        writes = checkpointer._conn.execute(
+            "SELECT key FROM checkpoint_writes WHERE thread_id = ? AND seq = 1", ("t1",)
+        ).fetchall()
+        assert writes == [("counter",)]
+
+        latest = checkpointer.get_checkpoint("t1")
+        assert latest.values == {"messages": big, "counter": 1}
+        assert latest.parent_config == {"configurable": {"thread_id": "t1", "checkpoint_id": "c0"}}
+        assert checkpointer.get_checkpoint("t1", "c0").values["counter"] == 0
+
+    def test_removed_keys_and_history(self, tmp_path):
+        checkpointer = SQLiteCheckpointer(tmp_path / "checkpoints.db")
+        checkpointer.save_checkpoint("t1", self._snapshot({"a": 1, "b": 2}, 1))
+        checkpointer.save_checkpoint("t1", self._snapshot({"a": 1}, 2))
+        checkpointer.save_checkpoint("t1", self._snapshot({"a": 3}, 3))
+
+        history = checkpointer.list_checkpoints("t1")
+        assert [s.values for s in history] == [{"a": 1, "b": 2}, {"a": 1}, {"a": 3}]
+        tuples = list(checkpointer.iter_checkpoint_history({"configurable": {"thread_id": "t1"}}))
+        assert [t.checkpoint["values"] for t in tuples] == [{"a": 1, "b": 2}, {"a": 1}, {"a": 3}]
+
+    def test_survives_restart_and_prunes(self, tmp_path):
+        path = tmp_path / "checkpoints.db"
+        checkpointer = SQLiteCheckpointer(path, max_checkpoints_per_thread=3, full_snapshot_interval=10)
+        for i in range(6):
+            checkpointer.save_checkpoint("t1", self._snapshot({"fixed": "v", "i": i}, i))
+        checkpointer.close()
+
+        reopened = SQLiteCheckpointer(path, max_checkpoints_per_thread=3, full_snapshot_interval=10)
+        history = reopened.list_checkpoints("t1")
+        assert [s.values["i"] for s in history] == [3, 4, 5]
+        assert all(s.values["fixed"] == "v" for s in history)
+
+        reopened.save_checkpoint("t1", self._snapshot({"fixed": "v", "i": 6}, 6))
+        assert reopened.get_checkpoint("t1").values == {"fixed": "v", "i": 6}
+        reopened.clear_thread("t1")
+        assert reopened.get_checkpoint("t1") is None
+
+    @pytest.mark.asyncio
+    async def test_compiled_graph_uses_compile_checkpointer(self, tmp_path):
+        graph = StateGraph(BasicState)
+        graph.add_node("increment", lambda state: {"counter": state["counter"] + 1})
+        graph.set_entry_point("increment")
+
+        checkpointer = SQLiteCheckpointer(tmp_path / "checkpoints.db")
+        compiled = graph.compile(checkpointer=checkpointer)
+        await compiled.invoke({"counter": 0, "messages": [], "data": {}}, {"configurable": {"thread_id": "run"}})
+
+        snapshot = checkpointer.get_checkpoint("run")
+        assert snapshot is not None
+        assert snapshot.values["counter"] == 0
+
+    @pytest.mark.asyncio
+    async def test_in_place_mutations_are_persisted(self, tmp_path):
+        def append(value):
+            def node(state):
+                state["data"].setdefault("log", []).append(value)
+                return {"counter": state["counter"] + 1}
+            return node
+
+        graph = StateGraph(BasicState)
+        graph.add_node("first", append("a"))
+        graph.add_node("second", append("b"))
+        graph.add_node("third", append("c"))
+        graph.add_edge("first", "second")
+        graph.add_edge("second", "third")
+        graph.set_entry_point("first")
+
+        path = tmp_path / "checkpoints.db"
+        compiled = graph.compile(checkpointer=SQLiteCheckpointer(path, full_snapshot_interval=100))
+        await compiled.invoke({"counter": 0, "messages": [], "data": {}}, {"configurable": {"thread_id": "run"}})
+        compiled.checkpointer.close()
+
+        logs = [s.values["data"].get("log") for s in SQLiteCheckpointer(path).list_checkpoints("run")]
+        # Checkpoints are taken before each node runs
+        assert logs == [None, ["a"], ["a", "b"]]
+
+
+class TestCopyOnWriteState:
+    """Test copy-on-write state snapshots."""
+
+    def test_snapshot_tracks_changed_keys(self):
+        state = CopyOnWriteState({"messages": ["a"], "counter": 0})
+        first = state.snapshot()
+        assert first.changed_keys == {"messages", "counter"}
+        assert state.snapshot() is first
+
+        state["counter"] = 1
+        del state["messages"]
+        second = state.snapshot()
+        assert second.changed_keys == {"counter", "messages"}
+        assert second.previous is first
+        assert dict(second) == {"counter": 1}
+        assert dict(first) == {"messages": ["a"], "counter": 0}
+
+    def test_deep_chains_are_flattened(self):
+        state = CopyOnWriteState({"fixed": "v"})
+        snapshots = []
+        for i in range(50):
+            state["i"] = i
+            snapshots.append(state.snapshot())
+        assert [s["i"] for s in snapshots] == list(range(50))
+        assert all(s["fixed"] == "v" for s in snapshots)
+        assert isinstance(snapshots[-1], FrozenState)
+        assert snapshots[-1].copy() == {"fixed": "v", "i": 49}
+
+    @pytest.mark.asyncio
+    async def test_reducers_do_not_mutate_snapshotted_values(self):
+        graph = StateGraph(BasicState)
+        graph.add_node("append", lambda state: {"messages": ["m"], "data": {"k": len(state["messages"])}})
+        graph.set_entry_point("append")
+        compiled = graph.compile()
+
+        state = CopyOnWriteState({"messages": ["a"], "data": {"x": 1}})
+        before = state.snapshot()
+        compiled._update_state_with_reducers(state, {"messages": ["b"], "data": {"y": 2}})
+        compiled._update_state_with_reducers(state, {"messages": ["c"], "data": {"z": 3}})
+
+        assert before["messages"] == ["a"]
+        assert before["data"] == {"x": 1}
+        assert state["messages"] == ["a", "b", "c"]
+        assert state["data"] == {"x": 1, "y": 2, "z": 3}
+
+        after = state.snapshot()
+        compiled._update_state_with_reducers(state, {"messages": ["d"]})
+        assert after["messages"] == ["a", "b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_sqlite_checkpointer_serializes_only_changed_keys(self, tmp_path):
+        checkpointer = SQLiteCheckpointer(tmp_path / "checkpoints.db")
+        graph = StateGraph(BasicState)
+        graph.add_node("a", lambda state: {"counter": state["counter"] + 1})
+        graph.add_node("b", lambda state: {"counter": state["counter"] + 1})
+        graph.add_edge("a", "b")
+        graph.set_entry_point("a")
+        compiled = graph.compile(checkpointer=checkpointer)
+
+        result = await compiled.invoke({"counter": 0, "messages": ["x"] * 10, "data": {}}, {"configurable": {"thread_id": "cow"}})
+        assert type(result) is dict
+        assert result["counter"] == 2
+
+        history = checkpointer.list_checkpoints("cow")
+        assert [s.values["counter"] for s in history] == [0, 1]
+        writes = checkpointer._conn.execute(
+            "SELECT key FROM checkpoint_writes WHERE thread_id = ? AND seq = 1", ("cow",)
+        ).fetchall()
+        assert writes == [("counter",)]
+
+
+class TestIsolatedParallelGroups:
+    """Test fan-out/fan-in parallel groups with per-branch deltas."""
+
+    @pytest.mark.asyncio
+    async def test_branches_merge_in_declaration_order(self):
+        from spoon_ai.graph.config import ParallelGroupConfig
+
+        graph = StateGraph(BasicState)
+        names = [f"branch_{i}" for i in range(12)]
+
+        def make_branch(index):
+            async def branch(state):
+                # finish in reverse order of declaration
+                await asyncio.sleep(0.001 * (len(names) - index))
+                state["counter"] = state["counter"] + index  # write lands in the branch delta
+                return {"messages": [f"m{index}"], "data": {f"k{index}": index}}
+            return branch
+
+        for i, name in enumerate(names):
+            graph.add_node(name, make_branch(i))
+        graph.add_parallel_group("fan", names, ParallelGroupConfig(branch_isolation=True))
+        graph.set_entry_point(names[0])
+
+        compiled = graph.compile()
+        result = await compiled.invoke({"counter": 100, "messages": ["start"], "data": {}})
+
+        assert result["messages"] == ["start"] + [f"m{i}" for i in range(12)]
+        assert result["data"] == {f"k{i}": i for i in range(12)}
+        # every branch read the pre-group value; the last declared branch wins
+        assert result["counter"] == 100 + 11
+
+    @pytest.mark.asyncio
+    async def test_unfinished_branches_are_not_merged(self):
+        from spoon_ai.graph.config import ParallelGroupConfig
+
+        async def fast(state):
+            state["data"] = {"fast": True}
+            return {"messages": ["fast"]}
+
+        async def slow(state):
+            state["counter"] = -1  # lands in the delta, then the branch is cancelled
+            del state["data"]
+            await asyncio.sleep(1)
+            return {"messages": ["slow"]}
+
+        async def broken(state):
+            state["counter"] = -2
+            raise ValueError("boom")
+
+        for strategy, loser, error_strategy in (("any", slow, "fail_fast"), ("all_complete", broken, "collect_errors")):
+            graph = StateGraph(BasicState)
+            graph.add_node("fast", fast)
+            graph.add_node("loser", loser)
+            graph.add_parallel_group("fan", ["fast", "loser"], ParallelGroupConfig(
+                join_strategy=strategy, error_strategy=error_strategy, branch_isolation=True))
+            graph.set_entry_point("fast")
+
+            result = await graph.compile().invoke({"counter": 7, "messages": [], "data": {}})
+
+            assert result["counter"] == 7
+            assert result["data"] == {"fast": True}
+            assert result["messages"] == ["fast"]
+
+    def test_branch_state_view(self):
+        from spoon_ai.graph.state import BranchState
+
+        base = {"a": 1, "b": 2}
+        view = BranchState(base)
+        view["a"] = 10
+        del view["b"]
+        view["c"] = 3
+
+        assert dict(view) == {"a": 10, "c": 3}
+        assert base == {"a": 1, "b": 2}
+        assert view.writes == {"a": 10, "c": 3}
+        assert view.deleted_keys == {"b"}
+
+
+class TestRoutingTable:
+    """Test the routing table precomputed at compile time."""
+
+    def _graph(self):
+        graph = StateGraph(BasicState)
+        for name in ("start", "price", "news", "done"):
+            graph.add_node(name, lambda state: {})
+        graph.set_entry_point("start")
+        return graph
+
+    @pytest.mark.asyncio
+    async def test_static_edges_resolved_at_compile(self):
+        from spoon_ai.graph import END
+
+        graph = self._graph()
+        graph.add_edge("start", "done")
+        graph.add_edge("start", "news")  # unreachable: first unconditional edge wins
+        graph.add_edge("done", END)
+        compiled = graph.compile()
+
+        assert compiled._routing.routes["start"].static_target == "done"
+        assert await compiled._determine_next_node("start", {}) == "done"
+        assert await compiled._determine_next_node("done", {}) == END
+
+    @pytest.mark.asyncio
+    async def test_routing_rules_precompiled(self):
+        graph = self._graph()
+        graph.add_pattern_routing("start", r"\bprice\b", "price", priority=10)
+        graph.add_routing_rule("start", "HEADLINES", "news")
+        compiled = graph.compile()
+
+        assert await compiled._determine_next_node("start", {"user_query": "What is the PRICE of NEO?"}) == "price"
+        assert await compiled._determine_next_node("start", {"user_query": "latest headlines"}) == "news"
+        assert await compiled._determine_next_node("start", {"user_query": "hello"}) is None
+
+    @pytest.mark.asyncio
+    async def test_table_rebuilt_when_graph_changes(self):
+        graph = self._graph()
+        compiled = graph.compile()
+        assert await compiled._determine_next_node("start", {}) is None
+
+        graph.add_edge("start", "news")
+        assert await compiled._determine_next_node("start", {}) == "news"
+
+
+class TestRouterDecisionCache:
+    """Test caching of LLM routing decisions."""
+
+    @pytest.mark.asyncio
+    async def test_llm_router_called_once_per_normalized_query(self):
+        from spoon_ai.graph.config import GraphConfig, RouterConfig
+
+        graph = StateGraph(BasicState)
+        for name in ("start", "price"):
+            graph.add_node(name, lambda state: {})
+        graph.set_entry_point("start")
+        graph.config = GraphConfig(router=RouterConfig(allow_llm=True))
+
+        calls = []
+
+        async def router(state, query):
+            calls.append(query)
+            return "price"
+
+        graph.set_llm_router(router)
+        graph.enable_router_cache(ttl=60, max_size=8)
+        compiled = graph.compile()
+
+        assert await compiled._determine_next_node("start", {"user_query": "NEO  price?"}) == "price"
+        assert await compiled._determine_next_node("start", {"user_query": "neo price?"}) == "price"
+        assert len(calls) == 1
+
+        stats = compiled.get_router_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_ttl_cache_expiry_and_eviction(self):
+        from spoon_ai.graph.cache import TTLCache
+
+        cache = TTLCache(max_size=2, ttl=None)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)  # evicts "b", the least recently used
+        assert "b" not in cache
+        assert cache.get_stats()["evictions"] == 1
+
+        cache.put("d", 4, ttl=-1)
+        assert cache.get("d") is None
+        assert cache.get_stats()["expirations"] == 1
+
+
+class TestExecutionMetrics:
+    """Test ring-buffered history and streaming per-node aggregates."""
+
+    def test_history_is_bounded_and_aggregates_are_cumulative(self):
+        graph = StateGraph(BasicState)
+        graph.add_node("work", lambda state: {})
+        graph.set_entry_point("work")
+        graph.enable_monitoring()
+        compiled = graph.compile()
+        compiled.max_execution_history = 5
+
+        for i in range(100):
+            compiled._record_execution_metrics("work", 0.0, (i + 1) / 1000.0, success=i % 10 != 0)
+
+        assert len(compiled.execution_history) == 5
+        assert compiled.execution_history[-1]["execution_time"] == pytest.approx(0.1)
+
+        metrics = compiled.get_execution_metrics()
+        stats = metrics["node_stats"]["work"]
+        assert metrics["total_executions"] == 100
+        assert metrics["success_rate"] == pytest.approx(0.9)
+        assert stats["errors"] == 10
+        assert stats["p50"] == pytest.approx(0.050, rel=0.06)
+        assert stats["p99"] == pytest.approx(0.099, rel=0.06)
+
+        compiled.reset_execution_metrics()
+        assert compiled.get_execution_metrics()["total_executions"] == 0
+
+
+class TestBatchInvoke:
+    """Test concurrent batch invocation of a compiled graph."""
+
+    def _graph(self):
+        graph = StateGraph(BasicState)
+
+        async def increment(state):
+            await asyncio.sleep(0.01 * (3 - state["counter"] % 3))
+            if state["counter"] < 0:
+                raise ValueError("negative counter")
+            return {"counter": state["counter"] + 1}
+
+        graph.add_node("increment", increment)
+        graph.set_entry_point("increment")
+        return graph
+
+    @pytest.mark.asyncio
+    async def test_results_in_input_order_with_isolated_checkpoints(self):
+        checkpointer = InMemoryCheckpointer()
+        compiled = self._graph().compile(checkpointer=checkpointer)
+        inputs = [{"counter": i, "messages": [], "data": {}} for i in range(6)]
+
+        results = await compiled.abatch(inputs, {"configurable": {"thread_id": "job"}}, max_concurrency=2)
+
+        assert [r["counter"] for r in results] == [1, 2, 3, 4, 5, 6]
+        assert len(checkpointer.checkpoints) == 6
+        assert all(key.endswith(f"job-{i}") for i, key in enumerate(sorted(checkpointer.checkpoints)))
+        stored = [snapshot.config["configurable"] for snapshots in checkpointer.checkpoints.values() for snapshot in snapshots]
+        assert stored and all(set(configurable) == {"thread_id", "checkpoint_ns"} for configurable in stored)
+
+    @pytest.mark.asyncio
+    async def test_return_exceptions_and_as_completed(self):
+        compiled = self._graph().compile()
+        inputs = [{"counter": c, "messages": [], "data": {}} for c in (0, -1, 2)]
+
+        results = await compiled.abatch(inputs, return_exceptions=True)
+        assert results[0]["counter"] == 1
+        assert isinstance(results[1], GraphExecutionError)
+        assert results[2]["counter"] == 3
+
+        with pytest.raises(GraphExecutionError):
+            await compiled.abatch(inputs)
+
+        seen = {}
+        async for index, result in compiled.abatch_as_completed(inputs, return_exceptions=True):
+            seen[index] = result
+        assert sorted(seen) == [0, 1, 2]
+        assert seen[2]["counter"] == 3
+
+
+class TestNodeCache:
+    """Test memoization of deterministic nodes."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("backend", ["memory", "disk"])
+    async def test_cache_hit_skips_node(self, backend, tmp_path):
+        from spoon_ai.graph import NodeCacheConfig
+
+        calls = []
+
+        def fetch(state):
+            calls.append(state["data"]["symbol"])
+            return {"data": {"price": len(calls)}}
+
+        graph = StateGraph(BasicState)
+        graph.add_node("fetch", fetch, cache=NodeCacheConfig(
+            keys=["data"], backend=backend, path=str(tmp_path / "nodes.db"),
+        ))
+        graph.set_entry_point("fetch")
+        graph.enable_monitoring()
+        compiled = graph.compile()
+
+        first = await compiled.invoke({"counter": 0, "messages": [], "data": {"symbol": "NEO"}})
+        second = await compiled.invoke({"counter": 5, "messages": [], "data": {"symbol": "NEO"}})
+        await compiled.invoke({"counter": 0, "messages": [], "data": {"symbol": "GAS"}})
+
+        assert calls == ["NEO", "GAS"]
+        assert first["data"] == second["data"] == {"symbol": "NEO", "price": 1}
+        stats = compiled.get_execution_metrics()["node_stats"]["fetch"]
+        assert stats["cache_hits"] == 1
+        assert stats["cache_misses"] == 2
+        assert compiled.get_node_cache_stats()["fetch"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_key_function_errors_are_node_errors(self):
+        from spoon_ai.graph import NodeCacheConfig
+
+        def broken_key(state):
+            raise KeyError("symbol")
+
+        graph = StateGraph(BasicState)
+        graph.add_node("fetch", lambda state: {}, cache=NodeCacheConfig(key_fn=broken_key))
+        graph.set_entry_point("fetch")
+        compiled = graph.compile()
+
+        with pytest.raises(NodeExecutionError) as excinfo:
+            await compiled._execute_node("fetch", {"data": {}})
+        assert isinstance(excinfo.value.original_error, KeyError)
+
+    def test_sqlite_cache_evicts_least_recently_used(self, tmp_path):
+        from spoon_ai.graph.cache import SQLiteCache
+
+        cache = SQLiteCache(tmp_path / "cache.db", max_size=3, ttl=None)
+        for i in range(3):
+            cache.put(f"k{i}", i)
+            time.sleep(0.01)
+        cache.put("k1", "updated")  # replacing a key never evicts
+        time.sleep(0.01)
+        cache.get("k0")
+        assert len(cache) == 3
+        cache.put("k3", 3)
+        cache.put("k4", 4)
+
+        assert len(cache) == 3
+        assert "k2" not in cache and "k1" not in cache
+        assert cache.get("k0") == 0
+        assert cache.get_stats()["evictions"] == 2
+        cache.invalidate("k0")
+        cache.clear()
+        cache.put("k5", 5)
+        assert len(cache) == 1
+
+    def test_sqlite_cache_namespaces_share_a_file(self, tmp_path):
+        from spoon_ai.graph.cache import SQLiteCache
+
+        path = tmp_path / "cache.db"
+        parse = SQLiteCache(path, max_size=2, ttl=None, namespace="parse")
+        fetch = SQLiteCache(path, max_size=10, ttl=None, namespace="fetch")
+        for i in range(5):
+            fetch.put(f"k{i}", i)
+        for i in range(3):
+            parse.put(f"k{i}", f"p{i}")
+            time.sleep(0.01)
+
+        # parse's limit only evicts parse's own entries
+        assert len(parse) == 2 and len(fetch) == 5
+        assert fetch.get("k0") == 0 and parse.get("k0") is None
+        assert parse.get_stats()["evictions"] == 1
+
+        # a second handle on the same namespace sees writes made by the first
+        other = SQLiteCache(path, max_size=2, ttl=None, namespace="parse")
+        other.put("k9", "p9")
+        assert len(parse) == 2
+        parse.put("k8", "p8")
+        assert len(other) == 2
+        parse.clear()
+        assert len(other) == 0 and len(fetch) == 5
+
+    def test_decorator_cache_option(self):
+        from spoon_ai.graph import node_decorator
+
+        @node_decorator(cache={"keys": ["counter"], "ttl": 60})
+        def parse(state, context=None):
+            return {"counter": state["counter"]}
+
+        graph = StateGraph(BasicState)
+        graph.add_node("parse", parse)
+        assert graph.node_caches["parse"].config.ttl == 60
+
+        with pytest.raises(GraphConfigurationError):
+            graph.add_node("bad", lambda state: {}, cache={"backend": "redis"})
+
+
+class TestStreamModes:
+    """Test the updates/messages stream modes and their bounded buffer."""
+
+    def _chain(self, length, node_factory):
+        from spoon_ai.graph import END
+
+        graph = StateGraph(BasicState)
+        names = [f"n{i}" for i in range(length)]
+        for i, name in enumerate(names):
+            graph.add_node(name, node_factory(i))
+        for current, following in zip(names, names[1:]):
+            graph.add_edge(current, following)
+        graph.add_edge(names[-1], END)
+        graph.set_entry_point(names[0])
+        return graph.compile()
+
+    @pytest.mark.asyncio
+    async def test_updates_mode_yields_node_deltas(self):
+        compiled = self._chain(3, lambda i: (lambda state: {"counter": state["counter"] + 1}))
+
+        updates = [chunk async for chunk in compiled.stream({"counter": 0, "messages": [], "data": {}}, stream_mode="updates")]
+
+        assert updates == [{"n0": {"counter": 1}}, {"n1": {"counter": 2}}, {"n2": {"counter": 3}}]
+
+    @pytest.mark.asyncio
+    async def test_messages_mode_forwards_chunks_with_node(self):
+        from spoon_ai.callbacks import get_stream_writer
+
+        def factory(i):
+            async def talk(state):
+                writer = get_stream_writer()
+                for token in ("hel", "lo"):
+                    await writer(token)
+                return {"counter": i}
+            return talk
+
+        compiled = self._chain(2, factory)
+        events = [event async for event in compiled.stream({"counter": 0}, stream_mode=["messages", "updates"])]
+
+        assert events[:3] == [
+            ("messages", ("hel", {"node": "n0"})),
+            ("messages", ("lo", {"node": "n0"})),
+            ("updates", {"n0": {"counter": 0}}),
+        ]
+        assert events[-1] == ("updates", {"n1": {"counter": 1}})
+
+    @pytest.mark.asyncio
+    async def test_slow_consumer_applies_backpressure(self):
+        executed = []
+
+        def factory(i):
+            def step(state):
+                executed.append(i)
+                return {"counter": i}
+            return step
+
+        compiled = self._chain(20, factory)
+        seen = 0
+        async for _ in compiled.stream({"counter": 0}, stream_mode="updates", max_buffer=1):
+            seen += 1
+            await asyncio.sleep(0)
+            # the producer can run at most the buffer plus one blocked step ahead
+            assert len(executed) <= seen + 2
+        assert seen == 20
+
+    @pytest.mark.asyncio
+    async def test_emitted_events_are_not_mutated_later(self):
+        from spoon_ai.graph import END
+
+        class ItemsState(TypedDict):
+            items: Annotated[List[int], operator.add]
+
+        graph = StateGraph(ItemsState)
+        for i in range(3):
+            graph.add_node(f"n{i}", lambda state, i=i: {"items": [i + 1]})
+        graph.add_edge("n0", "n1")
+        graph.add_edge("n1", "n2")
+        graph.add_edge("n2", END)
+        graph.set_entry_point("n0")
+
+        events = [e async for e in graph.compile().stream({"items": [0]}, stream_mode=["values", "updates"])]
+
+        values = [payload["items"] for mode, payload in events if mode == "values"]
+        assert values == [[0, 1], [0, 1, 2], [0, 1, 2, 3]]
+        updates = [payload for mode, payload in events if mode == "updates"]
+        assert updates == [{"n0": {"items": [1]}}, {"n1": {"items": [2]}}, {"n2": {"items": [3]}}]
+
+    @pytest.mark.asyncio
+    async def test_unknown_mode_rejected(self):
+        compiled = self._chain(1, lambda i: (lambda state: {}))
+        with pytest.raises(ValueError):
+            async for _ in compiled.stream({}, stream_mode="debug"):
+                pass
+
+
+
+class TestGraphAgentMemory:
+    """Test the append-only session log and the message indexes."""
+
+    def test_appends_and_reloads(self, tmp_path):
+        from spoon_ai.graph import Memory
+
+        memory = Memory(storage_path=str(tmp_path), session_id="s1")
+        for i in range(5):
+            memory.add_message({"role": "user", "content": f"message {i}"})
+        memory.set_metadata("topic", "neo")
+        assert len(memory.session_file.read_text().splitlines()) == 6
+
+        reloaded = Memory(storage_path=str(tmp_path), session_id="s1")
+        assert reloaded.get_messages() == memory.get_messages()
+        assert reloaded.get_metadata("topic") == "neo"
+
+    def test_compaction_and_torn_records(self, tmp_path):
+        from spoon_ai.graph import Memory
+
+        memory = Memory(storage_path=str(tmp_path), session_id="s1")
+        memory.add_message({"content": "hello"})
+        for i in range(Memory.COMPACT_MIN_GARBAGE + 2):
+            memory.set_metadata("step", i)
+        assert len(memory.session_file.read_text().splitlines()) < 10
+
+        with open(memory.session_file, "a", encoding="utf-8") as f:
+            f.write('{"type": "message", "mess')
+        reloaded = Memory(storage_path=str(tmp_path), session_id="s1")
+        assert [m["content"] for m in reloaded.get_messages()] == ["hello"]
+        assert reloaded.get_metadata("step") == Memory.COMPACT_MIN_GARBAGE + 1
+
+        reloaded.clear()
+        assert Memory(storage_path=str(tmp_path), session_id="s1").get_messages() == []
+
+    def test_migrates_legacy_json_sessions(self, tmp_path):
+        import json
+        from spoon_ai.graph import Memory
+
+        legacy = {"messages": [{"content": "old", "timestamp": "2024-01-01T00:00:00"}], "metadata": {"a": 1}}
+        (tmp_path / "s1.json").write_text(json.dumps(legacy))
+
+        memory = Memory(storage_path=str(tmp_path), session_id="s1")
+        assert memory.get_messages() == legacy["messages"]
+        assert memory.get_metadata("a") == 1
+        assert memory.session_file.exists()
+
+    def test_indexes_match_linear_scan(self, tmp_path):
+        import random
+        from datetime import datetime, timedelta
+        from spoon_ai.graph import Memory
+
+        def reference_search(messages, query, limit):
+            hits = [m for m in reversed(messages) if query.lower() in str(m.get("content", "")).lower()]
+            return hits[:limit]
+
+        def reference_recent(messages, hours):
+            cutoff = datetime.now().timestamp() - hours * 3600
+            recent = []
+            for m in messages:
+                try:
+                    if datetime.fromisoformat(m["timestamp"]).timestamp() >= cutoff:
+                        recent.append(m)
+                except Exception:
+                    recent.append(m)
+            return recent
+
+        rng = random.Random(3)
+        words = ["Neo", "gas", "wallet", "swap", "bridge", "stake", "neon", "a", "ab"]
+        memory = Memory(storage_path=str(tmp_path), session_id="s1")
+        now = datetime.now()
+        for _ in range(300):
+            message = {"content": " ".join(rng.choice(words) for _ in range(rng.randint(0, 6)))}
+            roll = rng.random()
+            if roll < 0.8:
+                message["timestamp"] = (now - timedelta(hours=rng.uniform(0, 72))).isoformat()
+            elif roll < 0.9:
+                message["timestamp"] = "not a date"
+            memory.add_message(message)
+
+            if rng.random() < 0.1:
+                for query in ["neo", "NEO", "o g", "a", "ab", "", "swap stake", "xyz", "eon"]:
+                    limit = rng.randint(1, 50)
+                    assert memory.search_messages(query, limit) == reference_search(memory.messages, query, limit)
+                for hours in (1, 24, 100):
+                    assert memory.get_recent_messages(hours) == reference_recent(memory.messages, hours)
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
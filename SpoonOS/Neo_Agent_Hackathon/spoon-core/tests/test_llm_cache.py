@@ -0,0 +1,412 @@
+"""
+Tests for the LLM response cache.
+"""
+
+import json
+import time
+
+import pytest
+from unittest.mock import patch
+
+from spoon_ai.llm.cache import LLMResponseCache, estimate_response_size
+from spoon_ai.llm.interface import LLMResponse
+from spoon_ai.schema import Message
+
+
+def make_response(content: str) -> LLMResponse:
+    return LLMResponse(
+        content=content,
+        provider="openai",
+        model="mock-model",
+        finish_reason="stop",
+        native_finish_reason="stop"
+    )
+
+
+def prompt(text: str):
+    return [Message(role="user", content=text)]
+
+
+class TestLLMResponseCache:
+    """Test LRU, TTL and byte-budget behaviour."""
+
+    def test_lru_eviction_by_count(self):
+        cache = LLMResponseCache(max_size=2)
+        cache.put(prompt("a"), "openai", make_response("A"))
+        cache.put(prompt("b"), "openai", make_response("B"))
+        assert cache.get(prompt("a"), "openai").content == "A"
+
+        cache.put(prompt("c"), "openai", make_response("C"))  # evicts "b"
+
+        assert cache.get(prompt("b"), "openai") is None
+        assert cache.get(prompt("a"), "openai") is not None
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["size"] == 2
+
+    def test_byte_budget_evicts_and_rejects(self):
+        small = make_response("x" * 100)
+        budget = 3 * estimate_response_size(small)
+        cache = LLMResponseCache(max_size=100, max_bytes=budget)
+
+        for i in range(5):
+            cache.put(prompt(str(i)), "openai", make_response("x" * 100))
+        stats = cache.get_stats()
+        assert stats["size"] == 3
+        assert stats["bytes"] <= budget
+        assert cache.get(prompt("0"), "openai") is None
+
+        cache.put(prompt("huge"), "openai", make_response("x" * budget))
+        assert cache.get(prompt("huge"), "openai") is None
+        assert cache.get_stats()["rejected"] == 1
+        assert cache.get_stats()["size"] == 3
+
+    def test_cleanup_expired_uses_heap(self):
+        cache = LLMResponseCache(max_size=10, default_ttl=60)
+        with patch("spoon_ai.llm.cache.time.time", return_value=1000.0):
+            cache.put(prompt("short"), "openai", make_response("S"), ttl=10)
+            cache.put(prompt("long"), "openai", make_response("L"))
+            cache.put(prompt("short"), "openai", make_response("S2"), ttl=30)  # replaces, stale heap item
+
+        with patch("spoon_ai.llm.cache.time.time", return_value=1015.0):
+            assert cache.cleanup_expired() == 0
+        with patch("spoon_ai.llm.cache.time.time", return_value=1035.0):
+            assert cache.cleanup_expired() == 1
+            assert cache.get(prompt("long"), "openai").content == "L"
+        assert cache.get_stats()["expirations"] == 1
+        assert cache.get_stats()["bytes"] == estimate_response_size(make_response("L"))
+
+    def test_get_honours_per_entry_ttl(self):
+        cache = LLMResponseCache(max_size=10, default_ttl=3600)
+        with patch("spoon_ai.llm.cache.time.time", return_value=1000.0):
+            cache.put(prompt("short"), "openai", make_response("S"), ttl=1)
+            cache.put(prompt("long"), "openai", make_response("L"), ttl=7200)
+
+        with patch("spoon_ai.llm.cache.time.time", return_value=1010.0):
+            assert cache.get(prompt("short"), "openai") is None
+        with patch("spoon_ai.llm.cache.time.time", return_value=1000.0 + 5000):
+            assert cache.get(prompt("long"), "openai").content == "L"
+            # An explicit ttl override is still measured from creation
+            assert cache.get(prompt("long"), "openai", ttl=60) is None
+
+
+class TestCacheKey:
+    """Test incremental cache-key generation."""
+
+    def test_message_digest_is_memoized_until_content_changes(self):
+        msg = Message(role="user", content="hello")
+        digest = msg.digest()
+        with patch("spoon_ai.schema.hashlib.blake2b") as blake2b:
+            assert msg.digest() is digest
+            blake2b.assert_not_called()
+
+        msg.content = "hello again"
+        assert msg.digest() != digest
+        assert Message(role="user", content="hello").digest() == digest
+        assert Message(role="assistant", content="hello").digest() != digest
+
+    def test_key_only_hashes_new_messages(self):
+        cache = LLMResponseCache()
+        history = [Message(role="user" if i % 2 == 0 else "assistant", content=f"turn {i} " * 50) for i in range(100)]
+        key = cache.make_key(history, "openai", temperature=0.1)
+        assert cache.make_key(list(history), "openai", temperature=0.1) == key
+        assert cache.make_key(history, "openai", temperature=0.2) != key
+        assert cache.make_key(history, "anthropic", temperature=0.1) != key
+        assert cache.make_key(history, "openai", temperature=0.1, request_id="r1") == key
+
+        history.append(Message(role="user", content="new question"))
+        with patch("spoon_ai.schema.hashlib.blake2b", wraps=__import__("hashlib").blake2b) as blake2b:
+            assert cache.make_key(history, "openai", temperature=0.1) != key
+        assert blake2b.call_count == 1
+
+    def test_unchanged_tools_are_not_reserialized(self):
+        cache = LLMResponseCache()
+        tools = [{"type": "function", "function": {"name": f"tool_{i}", "parameters": {"type": "object"}}}
+                 for i in range(50)]
+        messages = prompt("a")
+        key = cache.make_key(messages, "openai", tools=tools)
+
+        with patch("spoon_ai.llm.cache.json.dumps", wraps=json.dumps) as dumps:
+            assert cache.make_key(messages, "openai", tools=tools) == key
+        # only the small provider/params header is serialized
+        assert [call.args[0]["params"] for call in dumps.call_args_list] == [{}]
+
+        # an equal copy keys the same; an in-place edit is noticed
+        assert cache.make_key(messages, "openai", tools=[dict(t) for t in tools]) == key
+        tools[0]["function"]["name"] = "renamed"
+        assert cache.make_key(messages, "openai", tools=tools) != key
+
+    def test_get_and_put_by_key(self):
+        cache = LLMResponseCache()
+        key = cache.make_key(prompt("a"), "openai")
+        cache.put_by_key(key, make_response("A"))
+        assert cache.get(prompt("a"), "openai").content == "A"
+        assert cache.get_by_key(key).content == "A"
+
+    @pytest.mark.asyncio
+    async def test_manager_computes_key_once_per_request(self):
+        from unittest.mock import AsyncMock, Mock
+        from spoon_ai.llm.cache import CachedLLMManager
+
+        manager = Mock(chat=AsyncMock(return_value=make_response("A")))
+        cache = LLMResponseCache()
+        cached = CachedLLMManager(manager, cache=cache)
+        with patch.object(cache, "make_key", wraps=cache.make_key) as make_key:
+            await cached.chat(prompt("a"))
+            await cached.chat(prompt("a"))
+        assert make_key.call_count == 2
+        assert manager.chat.await_count == 1
+
+
+class TestSQLiteResponseCache:
+    """Test the shared on-disk cache backend."""
+
+    def test_serialization_round_trip(self):
+        from spoon_ai.llm.cache import deserialize_response, serialize_response
+        from spoon_ai.schema import Function, ToolCall
+
+        response = make_response("x" * 2000)
+        response.tool_calls = [ToolCall(id="call_1", function=Function(name="lookup", arguments='{"q": 1}'))]
+        response.usage = {"prompt_tokens": 3, "completion_tokens": 500}
+
+        blob = serialize_response(response)
+        assert blob[:1] == b"z" and len(blob) < 600
+        restored = deserialize_response(blob)
+        assert restored.content == response.content
+        assert restored.tool_calls[0].function.name == "lookup"
+        assert restored.usage == response.usage
+        assert restored.timestamp == response.timestamp
+
+    def test_shared_between_instances_and_evicts(self, tmp_path):
+        from spoon_ai.llm.cache import SQLiteResponseCache
+
+        now = time.time()
+        path = tmp_path / "llm.db"
+        writer = SQLiteResponseCache(path, max_size=2)
+        reader = SQLiteResponseCache(path, max_size=2)
+
+        writer.put(prompt("a"), "openai", make_response("A"))
+        assert reader.get(prompt("a"), "openai").content == "A"
+
+        with patch("spoon_ai.llm.cache.time.time", return_value=now + 1):
+            writer.put(prompt("b"), "openai", make_response("B"))
+        with patch("spoon_ai.llm.cache.time.time", return_value=now + 2):
+            writer.put(prompt("c"), "openai", make_response("C"))
+
+        assert reader.get(prompt("a"), "openai") is None
+        stats = writer.get_stats()
+        assert stats["size"] == 2
+        assert stats["evictions"] == 1
+
+    def test_running_totals_match_table(self, tmp_path):
+        import sqlite3
+
+        from spoon_ai.llm.cache import SQLiteResponseCache
+
+        path = tmp_path / "llm.db"
+
+        def actual():
+            with sqlite3.connect(path) as conn:
+                return conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+
+        def totals(cache):
+            stats = cache.get_stats()
+            return stats["size"], stats["bytes"]
+
+        now = time.time()
+        cache = SQLiteResponseCache(path, max_size=3, default_ttl=60)
+        cache.put(prompt("a"), "openai", make_response("A"))
+        cache.put(prompt("b"), "openai", make_response("B"), ttl=1)
+        cache.put(prompt("a"), "openai", make_response("A" * 500))
+        assert totals(cache) == actual()
+        assert totals(cache)[0] == 2
+
+        with patch("spoon_ai.llm.cache.time.time", return_value=now + 5):
+            assert cache.cleanup_expired() == 1
+        assert totals(cache) == actual()
+
+        for name in "cdef":
+            cache.put(prompt(name), "openai", make_response(name))
+        assert totals(cache) == actual()
+        assert totals(cache)[0] == 3
+
+        # A second instance opening the same file sees the same totals
+        assert totals(SQLiteResponseCache(path, max_size=3)) == actual()
+
+        cache.clear()
+        assert totals(cache) == actual() == (0, 0)
+
+    def test_running_totals_seeded_from_existing_table(self, tmp_path):
+        import sqlite3
+
+        from spoon_ai.llm.cache import SQLiteResponseCache
+
+        path = tmp_path / "llm.db"
+        with sqlite3.connect(path) as conn:
+            conn.execute(SQLiteResponseCache._SCHEMA[0])
+            conn.execute(
+                "INSERT INTO llm_cache (key, payload, created_at, expires_at, last_accessed, size) "
+                "VALUES ('old', x'00', 0, 1e12, 0, 7)"
+            )
+
+        stats = SQLiteResponseCache(path).get_stats()
+        assert (stats["size"], stats["bytes"]) == (1, 7)
+
+    def test_ttl_semantics(self, tmp_path):
+        from spoon_ai.llm.cache import CachedLLMManager, SQLiteResponseCache
+
+        now = time.time()
+        cache = SQLiteResponseCache(tmp_path / "llm.db", default_ttl=60)
+        cache.put(prompt("a"), "openai", make_response("A"))
+        with patch("spoon_ai.llm.cache.time.time", return_value=now + 30):
+            assert cache.get(prompt("a"), "openai", ttl=10) is None
+        cache.put(prompt("a"), "openai", make_response("A"))
+        with patch("spoon_ai.llm.cache.time.time", return_value=now + 61):
+            assert cache.cleanup_expired() == 1
+
+        assert CachedLLMManager(manager=None, cache=cache).get_cache_stats()["expirations"] == 2
+
+
+class TestRequestCoalescing:
+    """Test single-flight deduplication in CachedLLMManager."""
+
+    def _manager(self, delay=0.05, fail=False):
+        import asyncio
+        from unittest.mock import Mock
+
+        calls = []
+
+        async def chat(messages, provider=None, **kwargs):
+            calls.append(messages[-1].content)
+            await asyncio.sleep(delay)
+            if fail:
+                raise RuntimeError("provider down")
+            return make_response(f"reply to {messages[-1].content}")
+
+        async def chat_with_tools(messages, tools, provider=None, **kwargs):
+            return await chat(messages, provider=provider, **kwargs)
+
+        return Mock(chat=chat, chat_with_tools=chat_with_tools), calls
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_share_one_call(self):
+        import asyncio
+        from spoon_ai.llm.cache import CachedLLMManager
+
+        manager, calls = self._manager()
+        cached = CachedLLMManager(manager, cache=LLMResponseCache())
+
+        results = await asyncio.gather(*(cached.chat(prompt("hi")) for _ in range(50)))
+        tools = [{"type": "function", "function": {"name": "t"}}]
+        await asyncio.gather(*(cached.chat_with_tools(prompt("tool"), tools) for _ in range(5)))
+
+        assert calls == ["hi", "tool"]
+        assert {r.content for r in results} == {"reply to hi"}
+        stats = cached.get_cache_stats()
+        assert stats["coalesced"] == 53
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_and_are_not_cached(self):
+        import asyncio
+        from spoon_ai.llm.cache import CachedLLMManager
+
+        manager, calls = self._manager(fail=True)
+        cached = CachedLLMManager(manager, cache=LLMResponseCache())
+
+        results = await asyncio.gather(*(cached.chat(prompt("hi")) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        with pytest.raises(RuntimeError):
+            await cached.chat(prompt("hi"))
+        assert calls == ["hi", "hi"]
+
+    @pytest.mark.asyncio
+    async def test_cancellation(self):
+        import asyncio
+        from spoon_ai.llm.cache import CachedLLMManager
+
+        manager, calls = self._manager(delay=0.2)
+        cached = CachedLLMManager(manager, cache=LLMResponseCache())
+
+        first = asyncio.ensure_future(cached.chat(prompt("hi")))
+        second = asyncio.ensure_future(cached.chat(prompt("hi")))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert (await second).content == "reply to hi"
+
+        lone = asyncio.ensure_future(cached.chat(prompt("bye")))
+        await asyncio.sleep(0.01)
+        lone.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await lone
+        await asyncio.sleep(0.01)
+        assert cached.get_cache_stats()["in_flight"] == 0
+        assert calls == ["hi", "bye"]
+
+
+class TestSemanticCache:
+    """Test the embedding-similarity tier."""
+
+    def test_near_duplicate_prompt_hits_within_namespace(self):
+        from spoon_ai.llm.semantic_cache import SemanticResponseCache
+
+        cache = SemanticResponseCache(namespaces=["intent"])
+        system = Message(role="system", content="Classify the intent.")
+        cache.put([system, *prompt("What is the price of NEO?")], "openai", make_response("price"), "intent")
+
+        hit = cache.get([system, *prompt("what is the   price of NEO ?")], "openai", "intent")
+        assert hit.content == "price"
+        assert cache.get([system, *prompt("Show me the latest news about GAS")], "openai", "intent") is None
+        # different context or a namespace that was not opted in never matches
+        other_system = Message(role="system", content="Summarize.")
+        assert cache.get([other_system, *prompt("What is the price of NEO?")], "openai", "intent") is None
+        assert cache.get([system, *prompt("What is the price of NEO?")], "openai", "routing") is None
+        assert cache.get_stats()["hits"] == 1
+
+    def test_expired_nearest_entry_does_not_hide_live_match(self):
+        from spoon_ai.llm.semantic_cache import SemanticResponseCache
+
+        now = time.time()
+        cache = SemanticResponseCache(namespaces=["intent"], threshold=0.8, default_ttl=60)
+        cache.put(prompt("What is the price of NEO?"), "openai", make_response("live"), "intent")
+        with patch("spoon_ai.llm.semantic_cache.time.time", return_value=now - 120):
+            for _ in range(5):
+                cache.put(prompt("what is the price of neo"), "openai", make_response("stale"), "intent")
+
+        hit = cache.get(prompt("what is the price of neo"), "openai", "intent")
+        assert hit.content == "live"
+        assert cache.get_stats()["size"] == 1
+        # below the threshold is still a miss, even with expired entries in the way
+        with patch("spoon_ai.llm.semantic_cache.time.time", return_value=now - 120):
+            cache.put(prompt("Show me the latest news about GAS"), "openai", make_response("stale"), "intent")
+        assert cache.get(prompt("Show me the latest news about GAS today"), "openai", "intent") is None
+        assert cache.get_stats()["size"] == 1
+
+    def test_vector_index_add_remove(self):
+        from spoon_ai.llm.semantic_cache import VectorIndex
+
+        index = VectorIndex()
+        index.add("a", [1.0, 0.0])
+        index.add("b", [0.0, 1.0])
+        index.add("c", [0.7, 0.7])
+        index.remove("a")
+        assert len(index) == 2
+        assert index.search([1.0, 0.1])[0][0] == "c"
+        assert [item for item, _ in index.search([0.0, 1.0], k=2)] == ["b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_cached_manager_consults_semantic_tier(self):
+        from unittest.mock import AsyncMock, Mock
+        from spoon_ai.llm.cache import CachedLLMManager
+        from spoon_ai.llm.semantic_cache import SemanticResponseCache
+
+        manager = Mock(chat=AsyncMock(return_value=make_response("intent: price")))
+        cached = CachedLLMManager(manager, cache=LLMResponseCache(), semantic_cache=SemanticResponseCache(namespaces=["intent"]))
+
+        await cached.chat(prompt("Price of NEO please"), semantic_namespace="intent")
+        response = await cached.chat(prompt("price of neo  please"), semantic_namespace="intent")
+        await cached.chat(prompt("price of neo  please"))
+
+        assert response.content == "intent: price"
+        assert manager.chat.await_count == 2
+        assert cached.get_cache_stats()["semantic"]["hits"] == 1
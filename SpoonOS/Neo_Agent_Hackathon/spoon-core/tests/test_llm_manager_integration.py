@@ -4,6 +4,7 @@ Integration tests for LLM Manager and related components.
 
 import pytest
 import asyncio
+import time
 from unittest.mock import Mock, AsyncMock, patch
 from spoon_ai.llm.manager import LLMManager, FallbackStrategy, LoadBalancer
 from spoon_ai.llm.registry import LLMProviderRegistry
@@ -11,7 +12,7 @@ from spoon_ai.llm.config import ConfigurationManager
 from spoon_ai.llm.monitoring import DebugLogger, MetricsCollector
 from spoon_ai.llm.response_normalizer import ResponseNormalizer
 from spoon_ai.llm.interface import LLMProviderInterface, LLMResponse, ProviderCapability
-from spoon_ai.llm.errors import ProviderError, ConfigurationError
+from spoon_ai.llm.errors import ProviderError, ConfigurationError, ProviderUnavailableError
 from spoon_ai.schema import Message
 from spoon_ai.utils.config_manager import ConfigManager as EnvConfigManager
 
@@ -129,6 +130,7 @@ class TestLLMManagerIntegration:
         
         metrics_collector = Mock(spec=MetricsCollector)
         metrics_collector.record_request = Mock()
+        metrics_collector.get_request_counts.return_value = (0, 0)
         
         response_normalizer = Mock(spec=ResponseNormalizer)
         response_normalizer.normalize_response.side_effect = lambda x: x
@@ -181,6 +183,25 @@ class TestLLMManagerIntegration:
         assert response.content == "Response from anthropic"
         assert response.provider == "anthropic"
     
+    @pytest.mark.asyncio
+    async def test_chat_stream_forwards_chunks_to_bound_writer(self, llm_manager):
+        """Chunks are mirrored to a context-bound stream writer."""
+        from spoon_ai.callbacks import bind_stream_writer, reset_stream_writer
+
+        forwarded = []
+
+        async def writer(chunk):
+            forwarded.append(chunk)
+
+        token = bind_stream_writer(writer)
+        try:
+            chunks = [chunk async for chunk in llm_manager.chat_stream([Message(role="user", content="Hi")])]
+        finally:
+            reset_stream_writer(token)
+
+        assert chunks == ["Chunk from openai"]
+        assert forwarded == chunks
+
     @pytest.mark.asyncio
     async def test_chat_with_tools(self, llm_manager):
         """Test chat with tools functionality."""
@@ -227,6 +248,101 @@ class TestLLMManagerIntegration:
         # Should have used different providers (with some randomness)
         assert len(set(responses)) >= 1  # At least one provider used
     
+    @pytest.mark.asyncio
+    async def test_hedged_chat(self, llm_manager, mock_registry):
+        """Test that a slow primary is hedged to the next provider and cancelled."""
+        from spoon_ai.llm.manager import HedgingPolicy
+
+        cancelled = []
+
+        class SlowProvider(MockProvider):
+            async def chat(self, messages: list, **kwargs) -> LLMResponse:
+                try:
+                    await asyncio.sleep(0.3)
+                except asyncio.CancelledError:
+                    cancelled.append(self.name)
+                    raise
+                return await super().chat(messages, **kwargs)
+
+        mock_registry._instances["openai"] = SlowProvider("openai")
+        llm_manager.metrics_collector.get_latency_percentile.return_value = None
+        llm_manager.set_fallback_chain(["openai", "anthropic"])
+        llm_manager.enable_hedging(HedgingPolicy(default_delay=0.02, max_hedge_ratio=0.0, budget_burst=1))
+        messages = [Message(role="user", content="Hello")]
+
+        response = await llm_manager.chat(messages)
+        assert response.provider == "anthropic"
+        await asyncio.sleep(0.01)  # let the loser observe its cancellation
+        assert cancelled == ["openai"]
+        assert llm_manager.load_balancer.provider_load["openai"].in_flight == 0
+
+        # Budget is spent, so the next call waits for the primary
+        response = await llm_manager.chat(messages)
+        assert response.provider == "openai"
+
+        # Per-call opt-out does not count against the hedger at all
+        response = await llm_manager.chat(messages, hedge=False)
+        assert response.provider == "openai"
+
+        stats = llm_manager.get_stats()["hedging"]
+        assert stats["requests"] == 2
+        assert stats["hedged"] == 1
+        assert stats["hedge_wins"] == 1
+        assert stats["primary_wins"] == 1
+        assert stats["budget_exhausted"] == 1
+        assert stats["hedge_rate"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_hedged_chat_falls_back_when_primary_fails(self, llm_manager, mock_registry):
+        """Test that a failing primary falls back without spending hedge budget."""
+        mock_registry._instances["openai"] = MockProvider("openai", should_fail=True)
+        llm_manager.metrics_collector.get_latency_percentile.return_value = 5.0
+        llm_manager.set_fallback_chain(["openai", "anthropic"])
+        llm_manager.enable_hedging()
+
+        response = await llm_manager.chat([Message(role="user", content="Hello")])
+
+        assert response.provider == "anthropic"
+        assert llm_manager.hedging.get_stats()["hedged"] == 0
+
+    @pytest.mark.asyncio
+    async def test_circuit_breaker_skips_open_provider(self, llm_manager, mock_registry):
+        """Test that the circuit opens on the window failure rate and probes after a pause."""
+        failing = MockProvider("openai", should_fail=True)
+        failing.chat = AsyncMock(side_effect=ProviderError("openai", "Mock provider failure"))
+        mock_registry._instances["openai"] = failing
+        llm_manager.set_fallback_chain(["openai", "anthropic"])
+        llm_manager.configure_circuit_breakers(min_requests=4, open_duration=10)
+        messages = [Message(role="user", content="Hello")]
+
+        # The breaker reads the sliding window from the metrics collector
+        llm_manager.metrics_collector.get_request_counts.return_value = (3, 1)
+        response = await llm_manager.chat(messages)
+        assert response.provider == "anthropic"
+        assert llm_manager.load_balancer.provider_health["openai"] is True
+
+        llm_manager.metrics_collector.get_request_counts.return_value = (4, 2)
+        await llm_manager.chat(messages)
+        status = llm_manager.get_provider_status()["openai"]
+        assert status["circuit"]["state"] == "open"
+        assert status["health_status"] is False
+
+        # Open providers are left out of the chain instead of being called
+        with patch("spoon_ai.llm.manager.time.monotonic", return_value=time.monotonic()):
+            await llm_manager.chat(messages)
+        assert failing.chat.await_count == 2
+        with pytest.raises(ProviderUnavailableError):
+            await llm_manager.chat(messages, provider="openai")
+
+        # After the pause one probe is let through; a success closes the circuit
+        failing.chat.side_effect = None
+        failing.chat.return_value = LLMResponse(content="ok", provider="openai", model="m", finish_reason="stop", native_finish_reason="stop")
+        with patch("spoon_ai.llm.manager.time.monotonic", return_value=time.monotonic() + 11):
+            response = await llm_manager.chat(messages)
+        assert response.provider == "openai"
+        assert llm_manager.get_provider_status()["openai"]["circuit"]["state"] == "closed"
+        assert llm_manager.load_balancer.provider_health["openai"] is True
+
     def test_set_fallback_chain(self, llm_manager):
         """Test setting fallback chain."""
         providers = ["openai", "anthropic"]
@@ -339,6 +455,263 @@ class TestFallbackStrategy:
             )
 
 
+class TestMetricsCollector:
+    """Test rolling latency percentiles."""
+
+    def test_latency_percentile(self):
+        """Test percentiles over successful requests in the window."""
+        collector = MetricsCollector()
+        for i in range(1, 101):
+            collector.record_request("openai", "chat", i / 100, True)
+        collector.record_request("openai", "chat", 50.0, False, error="boom")
+
+        assert collector.get_latency_percentile("openai", 50) == pytest.approx(0.5)
+        assert collector.get_latency_percentile("openai", 95, method="chat") == pytest.approx(0.95)
+        assert collector.get_latency_percentile("openai", 95, method="completion") is None
+        assert collector.get_latency_percentile("openai", 95, min_samples=200) is None
+        assert collector.get_request_counts("openai", 60) == (101, 1)
+        assert collector.get_request_counts("anthropic", 60) == (0, 0)
+
+
+class TestProviderRateLimiter:
+    """Test per-provider admission control."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit_and_priority_order(self):
+        """Test that queued interactive requests run before earlier batch ones."""
+        from spoon_ai.llm.rate_limiter import ProviderRateLimiter
+
+        limiter = ProviderRateLimiter("openai", max_concurrent_requests=1)
+        order = []
+
+        async def request(name, priority):
+            async with limiter.limit(priority):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        holder = asyncio.ensure_future(request("first", "interactive"))
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.ensure_future(request("batch-1", "batch")),
+            asyncio.ensure_future(request("batch-2", "batch")),
+            asyncio.ensure_future(request("interactive", "interactive")),
+        ]
+        await asyncio.sleep(0)
+        assert limiter.get_stats()["queue_depth"] == 3
+
+        await asyncio.gather(holder, *waiters)
+        assert order == ["first", "interactive", "batch-1", "batch-2"]
+        stats = limiter.get_stats()
+        assert stats["queue_depth"] == 0
+        assert stats["active"] == 0
+        assert stats["max_queue_depth"] == 3
+        assert stats["avg_wait_time"] > 0
+
+    @pytest.mark.asyncio
+    async def test_token_buckets(self):
+        """Test request and token buckets, including reconciliation of actual usage."""
+        from spoon_ai.llm.rate_limiter import ProviderRateLimiter
+
+        limiter = ProviderRateLimiter("openai", requests_per_minute=6000, tokens_per_minute=60000)
+        assert await limiter.acquire(tokens=59000) == 0.0
+        limiter.release(59000, used_tokens=60000)  # bucket is now empty
+
+        waited = await limiter.acquire(tokens=200)  # refills at 1000 tokens/s
+        limiter.release(200)
+        assert 0.1 < waited < 1.0
+        assert limiter.get_stats()["queued"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_block_queue(self):
+        """Test that a request cancelled while queued is skipped."""
+        from spoon_ai.llm.rate_limiter import ProviderRateLimiter
+
+        limiter = ProviderRateLimiter("openai", max_concurrent_requests=1)
+        await limiter.acquire()
+        cancelled = asyncio.ensure_future(limiter.acquire())
+        waiting = asyncio.ensure_future(limiter.acquire("batch"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+
+        limiter.release()
+        await asyncio.wait_for(waiting, 1)
+        assert limiter.get_stats()["active"] == 1
+
+    @pytest.mark.asyncio
+    async def test_manager_applies_provider_limits(self):
+        """Test that LLMManager enforces limits from the provider configuration."""
+        from spoon_ai.llm.config import ProviderConfig
+
+        active = []
+        peak = []
+
+        class SlowProvider(MockProvider):
+            async def chat(self, messages: list, **kwargs) -> LLMResponse:
+                assert "priority" not in kwargs
+                active.append(1)
+                peak.append(len(active))
+                await asyncio.sleep(0.01)
+                active.pop()
+                return await super().chat(messages, **kwargs)
+
+        registry = LLMProviderRegistry()
+        registry.register("openai", MockProvider)
+        registry._instances["openai"] = SlowProvider("openai")
+        config_manager = Mock(spec=ConfigurationManager)
+        config_manager.list_configured_providers.return_value = ["openai"]
+        config_manager.get_default_provider.return_value = "openai"
+        config_manager.get_fallback_chain.return_value = []
+        config_manager.get_available_providers_by_priority.return_value = ["openai"]
+        config_manager.load_provider_config.return_value = ProviderConfig(
+            name="openai", api_key="sk-test", max_concurrent_requests=2
+        )
+        with patch('spoon_ai.llm.manager.asyncio.create_task'):
+            manager = LLMManager(
+                config_manager=config_manager,
+                debug_logger=Mock(spec=DebugLogger),
+                metrics_collector=MetricsCollector(),
+                response_normalizer=Mock(spec=ResponseNormalizer, normalize_response=lambda x: x),
+                registry=registry
+            )
+
+        messages = [Message(role="user", content="Hello")]
+        await asyncio.gather(*(manager.chat(messages, priority="batch") for _ in range(6)))
+
+        assert max(peak) == 2
+        stats = manager.get_stats()["rate_limits"]["openai"]
+        assert stats["admitted"] == 6
+        assert stats["queued"] == 4
+        assert stats["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_manager_applies_provider_limits_to_streams(self):
+        """Test that chat_stream is admitted by the limiter and strips priority."""
+        from spoon_ai.llm.config import ProviderConfig
+
+        active = []
+        peak = []
+
+        class StreamingProvider(MockProvider):
+            async def chat_stream(self, messages: list, **kwargs):
+                assert "priority" not in kwargs
+                active.append(1)
+                peak.append(len(active))
+                try:
+                    for delta in ["a", "b"]:
+                        await asyncio.sleep(0.01)
+                        yield delta
+                finally:
+                    active.pop()
+
+        registry = LLMProviderRegistry()
+        registry.register("openai", MockProvider)
+        registry._instances["openai"] = StreamingProvider("openai")
+        config_manager = Mock(spec=ConfigurationManager)
+        config_manager.list_configured_providers.return_value = ["openai"]
+        config_manager.get_default_provider.return_value = "openai"
+        config_manager.get_fallback_chain.return_value = []
+        config_manager.get_available_providers_by_priority.return_value = ["openai"]
+        config_manager.load_provider_config.return_value = ProviderConfig(
+            name="openai", api_key="sk-test", max_concurrent_requests=1
+        )
+        with patch('spoon_ai.llm.manager.asyncio.create_task'):
+            manager = LLMManager(
+                config_manager=config_manager,
+                debug_logger=Mock(spec=DebugLogger),
+                metrics_collector=MetricsCollector(),
+                response_normalizer=Mock(spec=ResponseNormalizer, normalize_response=lambda x: x),
+                registry=registry
+            )
+        manager._ensure_provider_initialized = AsyncMock(return_value=True)
+
+        async def consume():
+            messages = [Message(role="user", content="Hello")]
+            return [chunk async for chunk in manager.chat_stream(messages, priority="interactive")]
+
+        results = await asyncio.gather(consume(), consume())
+        assert results == [["a", "b"], ["a", "b"]]
+        assert max(peak) == 1
+
+        # Closing a stream early gives its slot back
+        stream = manager.chat_stream([Message(role="user", content="Hello")])
+        assert await stream.__anext__() == "a"
+        await stream.aclose()
+        stats = manager.get_stats()["rate_limits"]["openai"]
+        assert stats["admitted"] == 3
+        assert stats["active"] == 0
+
+
+class TestCircuitBreaker:
+    """Test circuit breaker state transitions."""
+
+    def test_half_open_probe_failure_reopens_longer(self):
+        """Test that a failed probe re-opens the circuit with a doubled pause."""
+        from spoon_ai.llm.manager import CircuitBreaker, CircuitState
+
+        breaker = CircuitBreaker(min_requests=2, open_duration=5, half_open_probes=1)
+        with patch("spoon_ai.llm.manager.time.monotonic", return_value=100.0):
+            assert breaker.record_failure(1, 1) is False
+            assert breaker.record_failure(2, 1) is True
+            assert breaker.allow_request() is False
+
+        with patch("spoon_ai.llm.manager.time.monotonic", return_value=106.0):
+            assert breaker.allow_request() is True
+            assert breaker.state == CircuitState.HALF_OPEN
+            assert breaker.allow_request() is False  # probe already in flight
+            assert breaker.record_failure(2, 2) is True
+            assert breaker.current_open_duration == 10
+
+        with patch("spoon_ai.llm.manager.time.monotonic", return_value=117.0):
+            assert breaker.allow_request() is True
+            breaker.record_cancelled()
+            assert breaker.allow_request() is True
+            breaker.record_success()
+            assert breaker.state == CircuitState.CLOSED
+            assert breaker.times_opened == 2
+
+
+    @pytest.mark.asyncio
+    async def test_probe_released_when_admission_fails(self):
+        """Test that an error before the provider call frees the half-open probe."""
+        from spoon_ai.llm.config import ProviderConfig
+        from spoon_ai.llm.manager import CircuitState
+
+        registry = LLMProviderRegistry()
+        registry.register("openai", MockProvider)
+        registry._instances["openai"] = MockProvider("openai")
+        config_manager = Mock(spec=ConfigurationManager)
+        config_manager.list_configured_providers.return_value = ["openai"]
+        config_manager.get_default_provider.return_value = "openai"
+        config_manager.get_fallback_chain.return_value = []
+        config_manager.load_provider_config.return_value = ProviderConfig(
+            name="openai", api_key="sk-test", max_concurrent_requests=1
+        )
+        with patch('spoon_ai.llm.manager.asyncio.create_task'):
+            manager = LLMManager(
+                config_manager=config_manager,
+                debug_logger=Mock(spec=DebugLogger),
+                metrics_collector=MetricsCollector(),
+                response_normalizer=Mock(spec=ResponseNormalizer, normalize_response=lambda x: x),
+                registry=registry
+            )
+        manager._ensure_provider_initialized = AsyncMock(return_value=True)
+
+        breaker = manager._get_circuit_breaker("openai")
+        breaker._open(0)
+        messages = [Message(role="user", content="Hello")]
+        with patch.object(manager, "_estimate_request_tokens", side_effect=ValueError("bad prompt")):
+            with pytest.raises(ValueError):
+                await manager._execute_provider_operation("openai", "chat", messages)
+
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.probes_in_flight == 0
+        assert manager.rate_limiters["openai"].get_stats()["active"] == 0
+        response = await manager._execute_provider_operation("openai", "chat", messages)
+        assert response.content
+        assert breaker.state == CircuitState.CLOSED
+
+
 class TestLoadBalancer:
     """Test load balancer."""
     
@@ -406,6 +779,57 @@ class TestLoadBalancer:
         assert "provider2" not in selections
         assert all(s in ["provider1", "provider3"] for s in selections)
 
+    def test_adaptive_selection_prefers_fast_provider(self, load_balancer):
+        """Test that power-of-two-choices steers traffic away from a slow provider."""
+        providers = ["fast", "slow"]
+        for _ in range(5):
+            for provider, duration in (("fast", 0.1), ("slow", 0.25)):
+                load_balancer.record_request_start(provider)
+                load_balancer.record_request_end(provider, duration, True)
+
+        selections = [load_balancer.select_provider(providers, "adaptive") for _ in range(20)]
+        assert selections.count("fast") == 20
+
+        # Outstanding requests raise the cost of the fast provider
+        for _ in range(3):
+            load_balancer.record_request_start("fast")
+        assert load_balancer.select_provider(providers, "adaptive") == "slow"
+        assert load_balancer.select_provider(providers, "least_outstanding") == "slow"
+
+    def test_ejection_and_readmission(self):
+        """Test outlier ejection on failures and latency, with timed re-admission."""
+        from unittest.mock import patch
+
+        balancer = LoadBalancer(consecutive_failures_to_eject=3, base_ejection_time=10)
+        providers = ["provider1", "provider2", "provider3"]
+        with patch("spoon_ai.llm.manager.time.monotonic", return_value=100.0):
+            for _ in range(3):
+                balancer.record_request_start("provider1")
+                balancer.record_request_end("provider1", 0.1, False)
+            assert balancer.get_load_stats()["provider1"]["ejected"] is True
+            assert "provider1" not in {balancer.select_provider(providers, "round_robin") for _ in range(6)}
+
+
+        with patch("spoon_ai.llm.manager.time.monotonic", return_value=111.0):
+            assert "provider1" in {balancer.select_provider(providers, "round_robin") for _ in range(6)}
+            balancer.record_request_start("provider1")
+            balancer.record_request_end("provider1", 0.1, True)
+            assert balancer.provider_load["provider1"].ejected_until is None
+            assert balancer.provider_load["provider1"].ejections == 1
+
+    def test_latency_outlier_is_ejected(self):
+        """Test that a provider far slower than its peers is ejected."""
+        balancer = LoadBalancer(min_samples_for_outlier=3)
+        for _ in range(3):
+            for provider, duration in (("provider1", 0.1), ("provider2", 0.12), ("provider3", 1.0)):
+                balancer.record_request_start(provider)
+                balancer.record_request_end(provider, duration, True)
+
+        stats = balancer.get_load_stats()
+        assert stats["provider3"]["ejected"] is True
+        assert stats["provider1"]["ejected"] is False
+        assert all(s["in_flight"] == 0 for s in stats.values())
+
 
 class TestConfigurationPlaceholders:
     """Ensure placeholder values are surfaced as configuration errors."""
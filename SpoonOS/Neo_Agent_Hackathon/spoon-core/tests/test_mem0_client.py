@@ -0,0 +1,203 @@
+"""
+Tests for batched Mem0 writes.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from unittest.mock import AsyncMock, Mock, patch
+
+from spoon_ai.chat import ChatBot
+from spoon_ai.llm.interface import LLMResponse
+from spoon_ai.llm.manager import LLMManager
+from spoon_ai.memory.mem0_client import SpoonMem0, Mem0WriteQueue
+
+
+class FakeMemoryClient:
+    """Records add() and search() calls; writes block while ``gate`` is clear."""
+
+    def __init__(self):
+        self.adds = []
+        self.searches = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def add(self, messages, **kwargs):
+        self.gate.wait(timeout=5)
+        self.adds.append((messages, kwargs.get("user_id")))
+
+    def search(self, query, **kwargs):
+        self.searches.append((query, kwargs.get("user_id")))
+        return {"results": [{"memory": f"{kwargs.get('user_id')} memory {len(self.adds)}"}]}
+
+
+def make_mem0(**config):
+    mem0 = SpoonMem0({"user_id": "alice", **config})
+    mem0.client = FakeMemoryClient()
+    return mem0
+
+
+def interaction(i):
+    return [{"role": "user", "content": f"q{i}"}, {"role": "assistant", "content": f"a{i}"}]
+
+
+class TestMem0WriteQueue:
+    """Test batching, flushing and overflow handling."""
+
+    @pytest.mark.asyncio
+    async def test_batches_per_user_on_size_and_close(self):
+        mem0 = make_mem0(write_behind=True, write_batch_size=3, write_flush_interval=60)
+
+        for i in range(4):
+            await mem0.aadd_memory(interaction(i))
+        await mem0.aadd_memory(interaction(9), user_id="bob")
+        await asyncio.sleep(0.1)
+
+        # The first three of alice's interactions fill a batch and are written as one call
+        assert [(len(messages), user) for messages, user in mem0.client.adds] == [(6, "alice")]
+
+        await mem0.aclose()
+        assert sorted((len(messages), user) for messages, user in mem0.client.adds) == [
+            (2, "alice"), (2, "bob"), (6, "alice")
+        ]
+        assert mem0.write_queue.get_stats()["pending"] == 0
+        with pytest.raises(RuntimeError):
+            await mem0.aadd_memory(interaction(10))
+
+    @pytest.mark.asyncio
+    async def test_flushes_on_interval(self):
+        mem0 = make_mem0(write_behind=True, write_batch_size=100, write_flush_interval=0.05)
+        await mem0.aadd_memory(interaction(0))
+        assert mem0.client.adds == []
+        await asyncio.sleep(0.2)
+        assert len(mem0.client.adds) == 1
+        await mem0.aclose()
+
+    @pytest.mark.asyncio
+    async def test_drop_policies(self):
+        mem0 = make_mem0()
+        queue = Mem0WriteQueue(mem0, max_batch_size=100, flush_interval=60, max_pending=2, overflow="drop_oldest")
+        for i in range(3):
+            assert await queue.put(interaction(i))
+        await queue.close()
+        assert [m["content"] for m in mem0.client.adds[0][0]] == ["q1", "a1", "q2", "a2"]
+        assert queue.get_stats()["dropped"] == 1
+
+        mem0 = make_mem0()
+        queue = Mem0WriteQueue(mem0, max_batch_size=100, flush_interval=60, max_pending=2, overflow="drop_newest")
+        results = [await queue.put(interaction(i)) for i in range(3)]
+        await queue.close()
+        assert results == [True, True, False]
+        assert [m["content"] for m in mem0.client.adds[0][0]] == ["q0", "a0", "q1", "a1"]
+
+    @pytest.mark.asyncio
+    async def test_block_policy_applies_backpressure(self):
+        mem0 = make_mem0()
+        queue = Mem0WriteQueue(mem0, max_batch_size=100, flush_interval=60, max_pending=2, overflow="block")
+        mem0.client.gate.clear()
+        await queue.put(interaction(0))
+        await queue.put(interaction(1))
+
+        third = asyncio.create_task(queue.put(interaction(2)))
+        await asyncio.sleep(0.05)
+        # Space is freed as soon as the full queue is handed to the writer
+        assert third.done() and third.result() is True
+        mem0.client.gate.set()
+        await queue.close()
+        assert sum(len(messages) for messages, _ in mem0.client.adds) == 6
+
+    def test_queued_writes_survive_loop_shutdown(self):
+        mem0 = make_mem0(write_behind=True, write_batch_size=100, write_flush_interval=60)
+
+        # No aclose(): asyncio.run cancels the writer, which flushes on the way out
+        asyncio.run(mem0.aadd_memory(interaction(0)))
+
+        assert len(mem0.client.adds) == 1
+        assert mem0.write_queue.get_stats()["pending"] == 0
+
+
+class TestChatBotWriteBehind:
+    """Test that ChatBot only queues Mem0 writes when asked to."""
+
+    def make_chatbot(self):
+        manager = Mock(spec=LLMManager)
+        manager.chat_with_tools = AsyncMock(return_value=LLMResponse(
+            content="NEO is up", provider="openai", model="gpt-4.1", finish_reason="stop", native_finish_reason="stop"))
+        with patch('spoon_ai.chat.get_llm_manager', return_value=manager):
+            return ChatBot(llm_provider="openai")
+
+    def test_write_behind_is_opt_in(self):
+        chatbot = self.make_chatbot()
+        configs = []
+        with patch('spoon_ai.chat.SpoonMem0', side_effect=lambda config: configs.append(dict(config)) or Mock(write_queue=None)):
+            chatbot.update_mem0_config({"user_id": "alice"}, enable=True)
+            chatbot.update_mem0_config({"write_behind": True})
+        assert "write_behind" not in configs[0]
+        assert configs[1]["write_behind"] is True
+
+
+class TestMemorySearchCache:
+    """Test cached searches and their invalidation on writes."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_searches_hit_cache_until_a_write(self):
+        mem0 = make_mem0()
+
+        assert await mem0.asearch_memory("favourite coin?") == ["alice memory 0"]
+        assert await mem0.asearch_memory(" favourite coin? ") == ["alice memory 0"]
+        assert await mem0.asearch_memory("favourite coin?", user_id="bob") == ["bob memory 0"]
+        assert len(mem0.client.searches) == 2
+
+        # Writing for bob leaves alice's cached results alone
+        await mem0.aadd_memory(interaction(0), user_id="bob")
+        assert await mem0.asearch_memory("favourite coin?") == ["alice memory 0"]
+        assert await mem0.asearch_memory("favourite coin?", user_id="bob") == ["bob memory 1"]
+        assert len(mem0.client.searches) == 3
+        assert mem0.search_cache.get_stats()["hits"] == 2
+
+    def test_search_racing_a_write_is_not_cached(self):
+        mem0 = make_mem0()
+        original_search = mem0.client.search
+
+        def search_during_write(query, **kwargs):
+            results = original_search(query, **kwargs)
+            mem0.add_memory(interaction(0))
+            return results
+
+        mem0.client.search = search_during_write
+        mem0.search_memory("q")
+        mem0.client.search = original_search
+        assert mem0.search_memory("q") == ["alice memory 1"]
+
+    def test_cache_can_be_disabled(self):
+        mem0 = make_mem0(search_cache_size=0)
+        mem0.search_memory("q")
+        mem0.search_memory("q")
+        assert mem0.search_cache is None
+        assert len(mem0.client.searches) == 2
+
+
+class TestLongTermPrefetch:
+    """Test that ChatBot overlaps the Mem0 search with message preparation."""
+
+    @pytest.mark.asyncio
+    async def test_prefetched_context_is_inserted_and_reused(self):
+        manager = Mock(spec=LLMManager)
+        manager.chat_with_tools = AsyncMock(return_value=LLMResponse(
+            content="", provider="openai", model="gpt-4.1", finish_reason="stop", native_finish_reason="stop"))
+        with patch('spoon_ai.chat.get_llm_manager', return_value=manager):
+            chatbot = ChatBot(llm_provider="openai")
+        chatbot.mem0_config = {"prefetch": True}
+        chatbot.mem0_client = make_mem0()
+        chatbot.mem0_user_id = "alice"
+
+        messages = [{"role": "user", "content": "price of NEO?"}]
+        for _ in range(3):  # think steps of one agent run
+            await chatbot.ask_tool(messages, system_msg="agent")
+
+        sent = manager.chat_with_tools.call_args[1]["messages"]
+        assert [m.role for m in sent] == ["system", "system", "user"]
+        assert sent[1].content == "Relevant long-term memories:\n- alice memory 0"
+        assert len(chatbot.mem0_client.client.searches) == 1
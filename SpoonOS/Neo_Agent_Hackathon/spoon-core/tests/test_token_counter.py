@@ -0,0 +1,199 @@
+"""
+Tests for the token counting service.
+"""
+
+import pytest
+
+from spoon_ai.llm.token_counter import TokenCounter, heuristic_message_tokens
+from spoon_ai.memory.short_term_manager import MessageTokenCounter
+from spoon_ai.schema import Message, ToolCall, Function
+
+
+class WordTokenizer:
+    """Counts whitespace-separated words and records what it was asked to count."""
+
+    def __init__(self):
+        self.calls = []
+
+    def count(self, text: str) -> int:
+        self.calls.append(text)
+        return len(text.split())
+
+
+def conversation():
+    return [
+        Message(id="1", role="system", content="You are helpful."),
+        Message(id="2", role="user", content="What is the price of NEO today?"),
+        Message(
+            id="3",
+            role="assistant",
+            content="",
+            tool_calls=[ToolCall(id="call_1", function=Function(name="price", arguments='{"symbol": "NEO"}'))],
+        ),
+        Message(id="4", role="tool", content="12.5", tool_call_id="call_1", name="price"),
+    ]
+
+
+class TestTokenCounter:
+    """Test tokenizer resolution, caching and the heuristic fallback."""
+
+    def test_heuristic_matches_legacy_approximation(self):
+        counter = TokenCounter(allow_download=False)
+        messages = conversation()
+
+        # chars / 4 rounded up, plus 3 per message
+        expected = [
+            -(-len("You are helpful.system") // 4) + 3,
+            -(-len("What is the price of NEO today?user") // 4) + 3,
+            -(-len(repr(messages[2].tool_calls) + "assistant") // 4) + 3,
+            -(-len("12.5call_1toolprice") // 4) + 3,
+        ]
+        assert counter.count_messages(messages, "unknown-model") == expected
+        assert counter.tokenizer_name("unknown-model") == "heuristic"
+        assert [heuristic_message_tokens(m) for m in messages] == expected
+        assert counter.count_tokens([], None) == 1
+
+    def test_registered_tokenizer_is_loaded_lazily_and_counts_are_cached(self):
+        counter = TokenCounter(allow_download=False)
+        tokenizer = WordTokenizer()
+        loads = []
+        counter.register_tokenizer("claude-*", lambda: loads.append(1) or tokenizer)
+        assert loads == []
+
+        messages = conversation()[:2]
+        counts = counter.count_messages(messages, "claude-3-haiku")
+        assert loads == [1]
+        assert counts == [len("You are helpful.".split()) + 1 + 3, 7 + 1 + 3]
+
+        calls = len(tokenizer.calls)
+        messages.append(Message(id="5", role="user", content="and GAS?"))
+        counter.count_messages(messages, "claude-3-sonnet")
+        assert loads == [1]
+        assert tokenizer.calls[calls:] == ["and GAS?", "user"]
+
+        # Same id, edited content: recounted
+        messages[1].content = "What is the price of GAS?"
+        assert counter.count_messages(messages, "claude-3-haiku")[1] == 6 + 1 + 3
+        assert counter.get_stats()["hits"] == 4
+
+    def test_failed_loader_falls_back_to_heuristic(self):
+        counter = TokenCounter(allow_download=False)
+
+        def broken():
+            raise OSError("no tokenizer file")
+
+        counter.register_tokenizer("local-*", broken)
+        messages = conversation()
+        assert counter.tokenizer_name("local-model") == "heuristic"
+        assert counter.count_tokens(messages, "local-model") == MessageTokenCounter._approximate_count(messages)
+
+    @pytest.mark.asyncio
+    async def test_message_token_counter_batch_api(self):
+        counter = MessageTokenCounter(TokenCounter(allow_download=False))
+        messages = conversation()
+
+        per_message = await counter.count_message_tokens(messages)
+        assert sum(per_message) == await counter.count_tokens(messages)
+        assert await counter.count_tokens(messages) == MessageTokenCounter._approximate_count(messages)
+
+
+async def reference_trim(manager, messages, max_tokens, strategy, keep_system=True):
+    """The original quadratic trimming algorithm, recounting every candidate list."""
+    from spoon_ai.memory.short_term_manager import TrimStrategy
+
+    count = manager.token_counter.count_tokens
+    if await count(messages) <= max_tokens:
+        return messages
+    system_message = None
+    remaining = messages
+    if keep_system and strategy == TrimStrategy.FROM_END and messages[0].role == "system":
+        system_message, remaining = messages[0], messages[1:]
+    kept = []
+    if strategy == TrimStrategy.FROM_END:
+        for message in reversed(remaining):
+            trial = [message] + kept
+            if await count(([system_message] if system_message else []) + trial) <= max_tokens or not kept:
+                kept = trial
+        trimmed = ([system_message] if system_message else []) + kept
+    else:
+        for message in remaining:
+            trial = kept + [message]
+            if await count(trial) <= max_tokens or not kept:
+                kept = trial
+            else:
+                break
+        trimmed = kept
+
+    index_lookup = {id(msg): idx for idx, msg in enumerate(messages)}
+    keep = {index_lookup[id(msg)] for msg in trimmed}
+    updated = set(keep)
+    for idx in sorted(keep):
+        message = messages[idx]
+        if message.role != "tool" or not message.tool_call_id:
+            continue
+        assistant_idx = manager._find_assistant_index_for_tool(messages, idx)
+        if assistant_idx is None:
+            updated.discard(idx)
+        elif assistant_idx not in updated:
+            if await count([messages[i] for i in sorted(updated | {assistant_idx})]) <= max_tokens:
+                updated.add(assistant_idx)
+            else:
+                updated.discard(idx)
+    return [messages[i] for i in sorted(updated)]
+
+
+def random_transcript(rng, length):
+    messages = [Message(role="system", content="system prompt " * rng.randint(1, 20))]
+    open_calls = []
+    for i in range(length):
+        kind = rng.random()
+        if kind < 0.2:
+            calls = [ToolCall(id=f"call_{i}_{j}", function=Function(name="f", arguments="{}")) for j in range(rng.randint(1, 2))]
+            open_calls.extend(call.id for call in calls)
+            messages.append(Message(role="assistant", content="", tool_calls=calls))
+        elif kind < 0.45 and open_calls:
+            # occasionally answer a call that was never issued, or answer one twice
+            call_id = rng.choice(open_calls) if rng.random() < 0.9 else "orphan"
+            messages.append(Message(role="tool", content="result " * rng.randint(1, 60), tool_call_id=call_id))
+        else:
+            messages.append(Message(role=rng.choice(["user", "assistant"]), content="word " * rng.randint(1, 120)))
+    return messages
+
+
+class TestLinearTrim:
+    """Test that linear-time trimming matches the original algorithm exactly."""
+
+    @pytest.mark.asyncio
+    async def test_matches_reference_on_random_transcripts(self):
+        import random
+        from spoon_ai.memory.short_term_manager import ShortTermMemoryManager, TrimStrategy
+
+        rng = random.Random(7)
+        manager = ShortTermMemoryManager(token_counter=MessageTokenCounter(TokenCounter(allow_download=False)))
+        for _ in range(60):
+            messages = random_transcript(rng, rng.randint(1, 40))
+            total = await manager.token_counter.count_tokens(messages)
+            for strategy in (TrimStrategy.FROM_END, TrimStrategy.FROM_START):
+                for keep_system in (True, False):
+                    max_tokens = rng.randint(1, total + 10)
+                    expected = await reference_trim(manager, messages, max_tokens, strategy, keep_system)
+                    actual = await manager.trim_messages(messages, max_tokens, strategy, keep_system)
+                    assert [id(m) for m in actual] == [id(m) for m in expected]
+
+    @pytest.mark.asyncio
+    async def test_counts_each_message_once(self):
+        from spoon_ai.memory.short_term_manager import ShortTermMemoryManager
+
+        class CountingTokenizer(WordTokenizer):
+            pass
+
+        counter = TokenCounter(allow_download=False)
+        tokenizer = CountingTokenizer()
+        counter.register_tokenizer("*", lambda: tokenizer)
+        manager = ShortTermMemoryManager(token_counter=MessageTokenCounter(counter))
+        messages = [Message(role="user" if i % 2 else "assistant", content=f"message {i}") for i in range(500)]
+
+        trimmed = await manager.trim_messages(messages, max_tokens=300, model="any-model")
+
+        assert len(tokenizer.calls) == 2 * len(messages)  # content and role, once each
+        assert trimmed == messages[-50:]